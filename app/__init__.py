@@ -1,9 +1,9 @@
 from flask import Flask
 from .config import Config
-from .extensions import db, migrate, login_manager
+from .extensions import db, migrate, login_manager, analytics_cache, session_events
 from flask_wtf.csrf import CSRFProtect
 from datetime import datetime, timezone
-from app.services.study_session_services import get_active_session, get_due_scheduled_session, check_session_collision
+from app.services.study_session_services import get_session_state
 from flask_login import current_user
 
 
@@ -20,17 +20,23 @@ def create_app():
     db.init_app(app)
     migrate.init_app(app, db)
     login_manager.init_app(app)
+    analytics_cache.init_app(app)
+    session_events.init_app(app)
 
 
     from app import models
     # Import models (after db is initialized)
     from app.models.user import User
+    from app.services.weekly_rollups import register_rollup_events, backfill_rollups_command
+
+    register_rollup_events()
+    app.cli.add_command(backfill_rollups_command)
 
 
     # Tell Flask-Login how to load a user from an ID
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        return db.session.get(User, int(user_id))
         # Where to redirect if a user is not logged in
     login_manager.login_view = "auth.login"
    
@@ -48,8 +54,7 @@ def create_app():
         session_collision = None
 
         if current_user.is_authenticated:
-            active_session = get_active_session(current_user.user_id)
-            due_session = get_due_scheduled_session(current_user.user_id)
+            active_session, due_session = get_session_state(current_user.user_id)
 
             # Detect collision: due session exists but there is also an active session
             if active_session and due_session:
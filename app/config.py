@@ -7,3 +7,16 @@ class Config:
     SECRET_KEY = os.getenv("SECRET_KEY")
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Per-user chart cache (see app/services/analytics_cache.py)
+    ANALYTICS_CACHE_ENABLED = os.getenv("ANALYTICS_CACHE_ENABLED", "true").lower() == "true"
+    ANALYTICS_CACHE_MAX_BYTES = int(os.getenv("ANALYTICS_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+    ANALYTICS_CACHE_TTL_SECONDS = int(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", 300))
+
+    # Seconds to reuse a user's active/due session state across requests (0 = per request only)
+    SESSION_STATE_CACHE_TTL_SECONDS = int(os.getenv("SESSION_STATE_CACHE_TTL_SECONDS", 0))
+
+    # /study/state/stream: comment line every N seconds, reconnect after M seconds.
+    # Every open stream occupies a worker thread, so run a threaded or async server.
+    SESSION_EVENTS_KEEPALIVE_SECONDS = int(os.getenv("SESSION_EVENTS_KEEPALIVE_SECONDS", 25))
+    SESSION_EVENTS_STREAM_SECONDS = int(os.getenv("SESSION_EVENTS_STREAM_SECONDS", 300))
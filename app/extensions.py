@@ -1,11 +1,15 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_login import LoginManager
+from app.services.analytics_cache import AnalyticsCache
+from app.services.session_events import SessionEventBroker
 
 # Create instances of extensions
 db = SQLAlchemy()
 migrate = Migrate()
 login_manager = LoginManager()
+analytics_cache = AnalyticsCache()
+session_events = SessionEventBroker()
 login_manager.login_view = "main.login"  # redirect to login page if user is not logged in
 login_manager.login_message_category = "info"
 
@@ -2,3 +2,4 @@ from app.models.user import User
 from app.models.course import Class
 from app.models.assignment import Assignment
 from app.models.study_session import StudySession
+from app.models.weekly_rollup import WeeklyClassRollup
@@ -36,6 +36,17 @@ class Assignment(db.Model):
     )
     finished_at = db.Column(db.DateTime(timezone=True), nullable=True)
 
+    # Chart access paths (see database/migrations/001_chart_query_indexes.sql)
+    __table_args__ = (
+        db.Index("ix_assignments_user_due_at", "user_id", "due_at"),
+        db.Index(
+            "ix_assignments_user_graded_finished_at", "user_id", "finished_at",
+            postgresql_where=text("grade IS NOT NULL"),
+            sqlite_where=text("grade IS NOT NULL")
+        ),
+        db.Index("ix_assignments_class_id", "class_id"),
+    )
+
     # Relationships
     class_ = db.relationship("Class", back_populates="assignments")
     study_sessions = db.relationship(
@@ -124,6 +135,27 @@ class Assignment(db.Model):
         db.session.add(record)
 
 
+def study_totals_subquery(*criteria):
+    """
+    Study minutes and session count per assignment, grouped once.
+
+    LEFT JOIN it on assignment_id instead of selecting the study_minutes /
+    study_session_count hybrids, which compile to a correlated subquery per
+    row. Pass criteria (e.g. StudySession.user_id == user_id) to limit the
+    sessions grouped.
+    """
+    return (
+        select(
+            StudySession.assignment_id,
+            func.coalesce(func.sum(StudySession.duration_minutes), 0).label("study_minutes"),
+            func.count(StudySession.session_id).label("study_session_count")
+        )
+        .where(StudySession.assignment_id.isnot(None), *criteria)
+        .group_by(StudySession.assignment_id)
+        .subquery("study_totals")
+    )
+
+
 class AssignmentExpectedGrade(db.Model):
     __tablename__ = "assignment_expected_grades"
 
@@ -1,6 +1,7 @@
 from app.extensions import db
+from collections import namedtuple
 from datetime import datetime, timezone
-from sqlalchemy import func, text
+from sqlalchemy import func, select, text
 from app.models.study_session import StudySession
 from app.models.assignment import Assignment
 
@@ -28,27 +29,92 @@ class Class(db.Model):
     study_sessions = db.relationship("StudySession", back_populates="class_", cascade="all, delete-orphan")
     expected_grades = db.relationship("ClassExpectedGrade", back_populates="class_", cascade="all, delete-orphan")
 
+    # Set by load_class_stats(); the properties below query on their own without it
+    _stats = None
+
+    def _class_stats(self):
+        if self._stats is not None:
+            return self._stats
+        return _query_class_stats([self.class_id]).get(self.class_id, EMPTY_CLASS_STATS)
+
     @property
     def total_assignments(self):
-        return Assignment.query.filter_by(class_id=self.class_id).count()
+        return self._class_stats().total_assignments
 
     @property
     def completed_assignments(self):
-        return Assignment.query.filter_by(
-            class_id=self.class_id,
-            is_completed=True
-        ).count()
+        return self._class_stats().completed_assignments
 
     @property
     def total_study_sessions(self):
-        return StudySession.query.filter_by(class_id=self.class_id).count()
+        return self._class_stats().total_study_sessions
 
     @property
     def total_study_time(self):
-        total = db.session.query(
-            db.func.coalesce(db.func.sum(StudySession.duration_minutes), 0)
-        ).filter_by(class_id=self.class_id).scalar()
-        return f"{total} min"
+        return f"{self._class_stats().total_study_minutes} min"
+
+
+ClassStats = namedtuple(
+    "ClassStats",
+    ["total_assignments", "completed_assignments", "total_study_sessions", "total_study_minutes"]
+)
+
+EMPTY_CLASS_STATS = ClassStats(0, 0, 0, 0)
+
+
+def load_class_stats(classes):
+    """
+    Fetch the aggregate properties of all `classes` in one grouped query and
+    attach them, so templates reading c.total_assignments etc. issue no
+    query per class. Returns the classes.
+    """
+    stats = _query_class_stats([c.class_id for c in classes])
+    for c in classes:
+        c._stats = stats.get(c.class_id, EMPTY_CLASS_STATS)
+    return classes
+
+
+def _query_class_stats(class_ids):
+    """class_id -> ClassStats, from assignment and session counts grouped once each."""
+    if not class_ids:
+        return {}
+
+    assignment_totals = (
+        select(
+            Assignment.class_id,
+            func.count(Assignment.assignment_id).label("total"),
+            func.count(Assignment.assignment_id).filter(Assignment.is_completed == True).label("completed")
+        )
+        .where(Assignment.class_id.in_(class_ids))
+        .group_by(Assignment.class_id)
+        .subquery()
+    )
+    session_totals = (
+        select(
+            StudySession.class_id,
+            func.count(StudySession.session_id).label("total"),
+            func.sum(StudySession.duration_minutes).label("minutes")
+        )
+        .where(StudySession.class_id.in_(class_ids))
+        .group_by(StudySession.class_id)
+        .subquery()
+    )
+
+    rows = db.session.execute(
+        select(
+            Class.class_id,
+            func.coalesce(assignment_totals.c.total, 0),
+            func.coalesce(assignment_totals.c.completed, 0),
+            func.coalesce(session_totals.c.total, 0),
+            func.coalesce(session_totals.c.minutes, 0)
+        )
+        .outerjoin(assignment_totals, assignment_totals.c.class_id == Class.class_id)
+        .outerjoin(session_totals, session_totals.c.class_id == Class.class_id)
+        .where(Class.class_id.in_(class_ids))
+    ).all()
+
+    return {class_id: ClassStats(*totals) for class_id, *totals in rows}
+
 
 class ClassExpectedGrade(db.Model):
     __tablename__ = "class_expected_grades"
@@ -31,6 +31,20 @@ class StudySession(db.Model):
     session_end = db.Column(db.DateTime(timezone=True), nullable=True)
     cancelled_at = db.Column(db.DateTime(timezone=True), nullable=True)
 
+    # Chart / session-state access paths (see database/migrations/001_chart_query_indexes.sql)
+    __table_args__ = (
+        db.Index("ix_study_sessions_user_completed", "user_id", "is_completed"),
+        db.Index("ix_study_sessions_class_completed", "class_id", "is_completed"),
+        db.Index("ix_study_sessions_assignment_id", "assignment_id"),
+        db.Index("ix_study_sessions_user_active_expected", "user_id", "is_active", "expected_started_at"),
+        # At most one active session per user (see database/migrations/002_fix_one_active_session_index.sql)
+        db.Index(
+            "one_active_session_per_user", "user_id", unique=True,
+            postgresql_where=text("is_active"),
+            sqlite_where=text("is_active")
+        ),
+    )
+
     # Relationships
     class_ = db.relationship("Class", back_populates="study_sessions")
     assignment = db.relationship("Assignment", back_populates="study_sessions")
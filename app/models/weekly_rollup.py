@@ -0,0 +1,22 @@
+from app.extensions import db
+
+
+class WeeklyClassRollup(db.Model):
+    """
+    Per user / class / week totals the dashboard charts read instead of raw rows.
+    Maintained by app/services/weekly_rollups.py.
+
+    Weeks start on Monday (UTC). Study minutes count completed sessions by
+    started_at; grades and completions count assignments by finished_at.
+    """
+    __tablename__ = "weekly_class_rollups"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True)
+    class_id = db.Column(db.Integer, db.ForeignKey("classes.class_id", ondelete="CASCADE"), primary_key=True)
+    week_start = db.Column(db.Date, primary_key=True)
+
+    study_minutes = db.Column(db.Integer, nullable=False, default=0)
+    session_count = db.Column(db.Integer, nullable=False, default=0)
+    grade_sum = db.Column(db.Numeric(10, 2), nullable=False, default=0)
+    grade_count = db.Column(db.Integer, nullable=False, default=0)
+    completed_count = db.Column(db.Integer, nullable=False, default=0)
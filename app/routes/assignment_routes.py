@@ -1,8 +1,16 @@
 from flask import Blueprint, request, redirect, url_for, render_template, abort, jsonify
 from flask_login import login_required, current_user
 from app.extensions import db
-from app.models.assignment import Assignment, AssignmentExpectedGrade
+from app.models.assignment import Assignment, AssignmentExpectedGrade, study_totals_subquery
 from app.models.course import Class
+from app.models.study_session import StudySession
+from app.services.assignment_import import InvalidImport, import_assignments, read_import_rows
+from app.services.assignment_listing import (
+    DEFAULT_PAGE_SIZE,
+    InvalidListingRequest,
+    list_assignment_page,
+    resolve_listing_options
+)
 from datetime import datetime
 from dateutil import parser
 
@@ -68,9 +76,32 @@ def add_assignment():
     return redirect(url_for("main.home"))
 
 
+@assignment.route("/assignments/import", methods=["POST"])
+@login_required
+def bulk_import_assignments():
+    """
+    Create many assignments at once from a CSV/JSON upload (form field "file")
+    or a JSON body. Columns match the add-assignment form, with the class given
+    by class_id or class_code. All rows are imported, or none if any is invalid.
+    """
+    try:
+        rows = read_import_rows(
+            file=request.files.get("file"),
+            payload=None if "file" in request.files else request.get_json(silent=True)
+        )
+        result = import_assignments(current_user.user_id, rows)
+    except InvalidImport as e:
+        abort(400, str(e))
+
+    return jsonify(result), 400 if result["errors"] else 201
+
+
 @assignment.route("/assignments")
 @login_required
 def list_assignments():
+    # Study time per assignment, grouped once and joined in
+    totals = study_totals_subquery(StudySession.user_id == current_user.user_id)
+
     # Existing assignments query
     assignments = (
         db.session.query(
@@ -80,9 +111,10 @@ def list_assignments():
             Class.class_type.label('class_type'),
             Class.is_finished.label('class_is_finished'),
             Assignment.created_at.label('created_at'),
-            Assignment.study_minutes.label('study_minutes')
+            db.func.coalesce(totals.c.study_minutes, 0).label('study_minutes')
         )
         .join(Class, Assignment.class_id == Class.class_id)
+        .outerjoin(totals, totals.c.assignment_id == Assignment.assignment_id)
         .filter(Class.user_id == current_user.user_id)
         .order_by(Assignment.due_at.asc())
         .all()
@@ -125,6 +157,32 @@ def list_assignments():
 
 
 
+@assignment.route("/api/assignments", methods=["GET"])
+@login_required
+def assignments_page():
+    """
+    Keyset-paginated assignments, filtered and sorted with the saved
+    assignment view preferences. Query parameters with the preference
+    names override them; pass next_cursor back as ?cursor= for the next page.
+    """
+    try:
+        options = resolve_listing_options(current_user.user_id, request.args)
+        rows, next_cursor = list_assignment_page(
+            current_user.user_id,
+            options,
+            cursor=request.args.get("cursor"),
+            limit=request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+        )
+    except InvalidListingRequest as e:
+        abort(400, str(e))
+
+    return jsonify({
+        "assignments": rows,
+        "next_cursor": next_cursor,
+        "options": options
+    })
+
+
 @assignment.route("/assignments/<int:assignment_id>/update", methods=["PATCH"])
 @login_required
 def update_assignment(assignment_id):
@@ -307,11 +365,18 @@ def delete_assignment(assignment_id):
 @assignment.route("/assignments/<int:assignment_id>/summary", methods=["GET"])
 @login_required
 def assignment_summary(assignment_id):
-    assignment = (
-        db.session.query(Assignment)
-        .filter_by(
-            assignment_id=assignment_id,
-            user_id=current_user.user_id
+    totals = study_totals_subquery(StudySession.assignment_id == assignment_id)
+
+    assignment, study_session_count, study_minutes = (
+        db.session.query(
+            Assignment,
+            db.func.coalesce(totals.c.study_session_count, 0),
+            db.func.coalesce(totals.c.study_minutes, 0)
+        )
+        .outerjoin(totals, totals.c.assignment_id == Assignment.assignment_id)
+        .filter(
+            Assignment.assignment_id == assignment_id,
+            Assignment.user_id == current_user.user_id
         )
         .first_or_404()
     )
@@ -319,8 +384,6 @@ def assignment_summary(assignment_id):
     return jsonify({
         "assignment_id": assignment.assignment_id,
         "title": assignment.title,
-        "study_session_count": assignment.study_session_count,
-        "study_minutes": assignment.study_minutes
+        "study_session_count": study_session_count,
+        "study_minutes": study_minutes
     })
-
-
@@ -4,97 +4,110 @@ from app.routes.charts import charts
 from app.models.assignment import Assignment
 from app.models.course import Class
 from app.models.study_session import StudySession
-from app.extensions import db
-from sqlalchemy import func
-from datetime import datetime, timezone, timedelta
+from app.models.user import UserAssignmentTypeColor
+from app.extensions import db, analytics_cache
+from app.services.time_utils import bucket_index
+from sqlalchemy import and_, func, literal, select, union_all
+from datetime import datetime, time, timezone, timedelta
+import numpy as np
+
+
+DUE_TIMELINE_HORIZONS = {'days': 7, 'weeks': 4}
+MAX_DUE_TIMELINE_HORIZON = {'days': 90, 'weeks': 52}
 
 
 @charts.route('/assignments/due_timeline')
 @login_required
+@analytics_cache.cached("assignments_due_timeline")
 def assignments_due_timeline():
     """Return counts of assignments due over a window, grouped per class and total.
     Query params:
       mode=days|weeks (default days)
+      horizon=number of days/weeks (default 7 days or 4 weeks)
     """
     mode = request.args.get('mode', 'days')
+    if mode != 'weeks':
+        mode = 'days'
+    horizon = request.args.get('horizon', DUE_TIMELINE_HORIZONS[mode], type=int)
+    horizon = max(1, min(MAX_DUE_TIMELINE_HORIZON[mode], horizon))
+
+    return jsonify(build_assignments_due_timeline(current_user.user_id, mode, horizon))
 
-    now = datetime.now(timezone.utc)
+
+def build_assignments_due_timeline(user_id, mode='days', horizon=7, now=None):
+    now = now or datetime.now(timezone.utc)
+    today = datetime.combine(now.date(), time(), tzinfo=timezone.utc)
 
     if mode == 'weeks':
-        # compute next 4 weeks starting from this week's Monday
-        weekday = now.weekday()  # Monday=0
-        this_monday = (now - timedelta(days=weekday)).date()
-        weeks = []
-        ranges = []
-        for i in range(4):
-            start = this_monday + timedelta(weeks=i)
+        # Weeks from this week's Monday; everything due in them counts
+        window_start = today - timedelta(days=now.weekday())
+        bucket = timedelta(weeks=1)
+        lower_bound = window_start
+        labels = []
+        for i in range(horizon):
+            start = window_start + bucket * i
             end = start + timedelta(days=6)
-            weeks.append((start, end))
-            ranges.append(f"{start.day}-{end.day}")
-        labels = ranges
+            labels.append(f"{start.day}-{end.day}")
     else:
-        # days: today + next 6 days
-        start_date = now.date()
-        days = [start_date + timedelta(days=i) for i in range(7)]
-        labels = [d.strftime('%a') for d in days]
-
-    # load relevant assignments (future due_at only)
-    if mode == 'weeks':
-        window_end = weeks[-1][1]
-        q = db.session.query(Assignment).join(Class).filter(
-            Class.user_id == current_user.user_id,
-            Assignment.due_at != None,
-            func.date(Assignment.due_at) >= weeks[0][0],
-            func.date(Assignment.due_at) <= window_end
+        # Days from today; only assignments still ahead of now
+        window_start = today
+        bucket = timedelta(days=1)
+        lower_bound = now
+        day_format = '%a' if horizon <= 7 else '%b %d'
+        labels = [(window_start + bucket * i).strftime(day_format) for i in range(horizon)]
+
+    window_end = window_start + bucket * horizon
+
+    # One grouped query over the window: (class, bucket) -> count
+    due = (
+        db.session.query(
+            Assignment.class_id.label('class_id'),
+            bucket_index(Assignment.due_at, window_start, int(bucket.total_seconds())).label('bucket')
         )
-    else:
-        q = db.session.query(Assignment).join(Class).filter(
-            Class.user_id == current_user.user_id,
-            Assignment.due_at != None,
-            Assignment.due_at >= now
+        .filter(
+            Assignment.user_id == user_id,
+            Assignment.due_at >= lower_bound,
+            Assignment.due_at < window_end
         )
+        .subquery()
+    )
+    counts = db.session.query(due.c.class_id, due.c.bucket, func.count()).group_by(due.c.class_id, due.c.bucket).all()
+
+    classes = db.session.query(Class.class_id, Class.class_name, Class.color).filter(
+        Class.user_id == user_id
+    ).order_by(Class.class_id).all()
+    row_of = {c.class_id: i for i, c in enumerate(classes)}
+
+    matrix = np.zeros((len(classes), horizon), dtype=int)
+    for class_id, index, count in counts:
+        matrix[row_of[class_id], index] += count
+
+    datasets = [
+        {'class_id': c.class_id, 'label': c.class_name, 'color': c.color, 'data': matrix[i].tolist()}
+        for i, c in enumerate(classes)
+    ]
 
-    assignments = q.all()
-
-    # initialize per-class buckets
-    classes = db.session.query(Class).filter(Class.user_id == current_user.user_id).all()
-    class_map = {c.class_id: {'class_id': c.class_id, 'class_name': c.class_name, 'color': c.color, 'counts': [0] * (4 if mode == 'weeks' else 7)} for c in classes}
-
-    total_counts = [0] * (4 if mode == 'weeks' else 7)
+    total_ds = {'label': 'Total', 'class_id': None, 'color': '#333', 'data': matrix.sum(axis=0).tolist()}
 
-    for a in assignments:
-        if not a.due_at:
-            continue
-        adate = a.due_at.date()
-        if mode == 'weeks':
-            for idx, (s, e) in enumerate(weeks):
-                if s <= adate <= e:
-                    class_map[a.class_id]['counts'][idx] += 1
-                    total_counts[idx] += 1
-                    break
-        else:
-            for idx, d in enumerate(days):
-                if adate == d:
-                    class_map[a.class_id]['counts'][idx] += 1
-                    total_counts[idx] += 1
-                    break
+    return {'labels': labels, 'datasets': datasets, 'total': total_ds}
 
-    datasets = []
-    for c in class_map.values():
-        datasets.append({'class_id': c['class_id'], 'label': c['class_name'], 'color': c['color'], 'data': c['counts']})
 
-    total_ds = {'label': 'Total', 'class_id': None, 'color': '#333', 'data': total_counts}
+ASSIGNMENT_TYPES = [
+    'homework','project','quiz','test','writing','exam','lab_report','presentation','reading','other'
+]
 
-    return jsonify({'labels': labels, 'datasets': datasets, 'total': total_ds})
+DEFAULT_TYPE_COLOR = '#4f46e5'
 
 
 @charts.route('/assignments/type_load')
 @login_required
+@analytics_cache.cached("assignments_type_load")
 def assignments_type_load():
     """Return counts or study time per assignment type.
     Query params:
       metric=count|study_time (default=count)
       time_window=all|last_7_days|last_30_days (optional)
+    Both metrics are always included (counts, study_minutes); values is the requested one.
     """
     metric = request.args.get('metric', 'count')
     time_window = request.args.get('time_window', 'all')
@@ -105,41 +118,74 @@ def assignments_type_load():
     elif time_window == 'last_30_days':
         since = datetime.now(timezone.utc) - timedelta(days=30)
 
-    types = [
-        'homework','project','quiz','test','writing','exam','lab_report','presentation','reading','other'
-    ]
+    rows = load_type_load(current_user.user_id, since)
+
+    counts = [row.open_count for row in rows]
+    study_minutes = [row.study_minutes for row in rows]
+
+    return jsonify({
+        'types': ASSIGNMENT_TYPES,
+        'values': counts if metric == 'count' else study_minutes,
+        'counts': counts,
+        'study_minutes': study_minutes,
+        'colors': [row.color or DEFAULT_TYPE_COLOR for row in rows]
+    })
 
-    result = []
-
-    for t in types:
-        if metric == 'count':
-            q = db.session.query(func.count(Assignment.assignment_id)).join(Class).filter(
-                Class.user_id == current_user.user_id,
-                Assignment.assignment_type == t,
-                Assignment.is_completed == False
-            )
-            if since is not None:
-                q = q.filter(Assignment.created_at >= since)
-            count = q.scalar() or 0
-            result.append(count)
-        else:
-            # study_time: sum duration_minutes from study sessions for assignments of this type
-            q = db.session.query(func.coalesce(func.sum(StudySession.duration_minutes), 0)).join(Assignment, StudySession.assignment_id == Assignment.assignment_id).join(Class).filter(
-                Class.user_id == current_user.user_id,
-                Assignment.assignment_type == t
-            )
-            if since is not None:
-                q = q.filter(StudySession.created_at >= since)
-            minutes = q.scalar() or 0
-            result.append(minutes)
-
-    # colors: fetch user assignment type colors
-    colors = {}
-    rows = db.session.query(func.coalesce(db.func.jsonb_build_object('assignment_type', db.func.coalesce(db.text("''"), '')), '{}'))
-    from app.models.user import UserAssignmentTypeColor
-    color_rows = UserAssignmentTypeColor.query.filter_by(user_id=current_user.user_id).all()
-    color_map = {r.assignment_type: r.color for r in color_rows}
-
-    colors_list = [color_map.get(t, '#4f46e5') for t in types]
-
-    return jsonify({'types': types, 'values': result, 'colors': colors_list})
+
+def load_type_load(user_id, since=None):
+    """
+    One row per ASSIGNMENT_TYPES entry (in order) with open_count (open
+    assignments, created since `since`), study_minutes (session minutes on
+    assignments of that type, sessions created since `since`) and the user's color.
+    """
+    # Session minutes per assignment
+    session_filters = [StudySession.user_id == user_id, StudySession.assignment_id.isnot(None)]
+    if since is not None:
+        session_filters.append(StudySession.created_at >= since)
+    minutes = (
+        select(
+            StudySession.assignment_id,
+            func.sum(StudySession.duration_minutes).label('minutes')
+        )
+        .where(*session_filters)
+        .group_by(StudySession.assignment_id)
+        .subquery()
+    )
+
+    is_counted = Assignment.is_completed == False
+    if since is not None:
+        is_counted = and_(is_counted, Assignment.created_at >= since)
+
+    per_type = (
+        select(
+            Assignment.assignment_type,
+            func.count(Assignment.assignment_id).filter(is_counted).label('open_count'),
+            func.sum(minutes.c.minutes).label('study_minutes')
+        )
+        .outerjoin(minutes, minutes.c.assignment_id == Assignment.assignment_id)
+        .where(Assignment.user_id == user_id)
+        .group_by(Assignment.assignment_type)
+        .subquery()
+    )
+
+    # Every type, with its order, even without assignments
+    types = union_all(*[
+        select(literal(t).label('assignment_type'), literal(i).label('position'))
+        for i, t in enumerate(ASSIGNMENT_TYPES)
+    ]).subquery()
+
+    return db.session.execute(
+        select(
+            types.c.assignment_type,
+            func.coalesce(per_type.c.open_count, 0).label('open_count'),
+            func.coalesce(per_type.c.study_minutes, 0).label('study_minutes'),
+            UserAssignmentTypeColor.color
+        )
+        .select_from(types)
+        .outerjoin(per_type, per_type.c.assignment_type == types.c.assignment_type)
+        .outerjoin(UserAssignmentTypeColor, and_(
+            UserAssignmentTypeColor.user_id == user_id,
+            UserAssignmentTypeColor.assignment_type == types.c.assignment_type
+        ))
+        .order_by(types.c.position)
+    ).all()
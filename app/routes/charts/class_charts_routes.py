@@ -1,15 +1,16 @@
-from flask import jsonify, request
+from flask import abort, jsonify, request
 from flask_login import login_required, current_user
 from app.routes.charts import charts
 from app.models.course import Class
 from app.models.study_session import StudySession
-from app.extensions import db
-from sqlalchemy import func
+from app.extensions import db, analytics_cache
+from sqlalchemy import func, select, and_
 from datetime import datetime, timezone, timedelta
 
 
 @charts.route("/classes/grade_vs_study_time")
 @login_required
+@analytics_cache.cached("grade_vs_study_time")
 def grade_vs_study_time():
     """
     Scatter plot:
@@ -66,6 +67,7 @@ def grade_vs_study_time():
 
 @charts.route("/classes/list")
 @login_required
+@analytics_cache.cached("classes_list")
 def classes_list():
     classes = db.session.query(Class).filter(Class.user_id == current_user.user_id).all()
     return jsonify([{"class_id": c.class_id, "class_name": c.class_name} for c in classes])
@@ -76,8 +78,54 @@ def classes_list():
 from app.models.assignment import Assignment
 
 
+def _time_window_start(time_window):
+    """Lower bound on Assignment.created_at for all | last_7_days | last_30_days."""
+    if time_window == 'last_7_days':
+        return datetime.now(timezone.utc) - timedelta(days=7)
+    if time_window == 'last_30_days':
+        return datetime.now(timezone.utc) - timedelta(days=30)
+    return None
+
+
+def _class_health_query(user_id, since=None):
+    """
+    One row per class with assignment counts split into
+    completed / in progress (has a study session) / not started.
+    Classes without assignments in the window come back with total = 0.
+    """
+    has_session = (
+        select(StudySession.session_id)
+        .where(StudySession.assignment_id == Assignment.assignment_id)
+        .exists()
+    )
+
+    join_on = Assignment.class_id == Class.class_id
+    if since is not None:
+        join_on = and_(join_on, Assignment.created_at >= since)
+
+    return (
+        db.session.query(
+            Class.class_id,
+            Class.class_name,
+            Class.color,
+            func.count(Assignment.assignment_id).label("total"),
+            func.count(Assignment.assignment_id)
+                .filter(Assignment.is_completed == True)
+                .label("completed"),
+            func.count(Assignment.assignment_id)
+                .filter(and_(Assignment.is_completed == False, has_session))
+                .label("in_progress")
+        )
+        .outerjoin(Assignment, join_on)
+        .filter(Class.user_id == user_id)
+        .group_by(Class.class_id)
+        .order_by(Class.class_id)
+    )
+
+
 @charts.route("/classes/class_health")
 @login_required
+@analytics_cache.cached("class_health_breakdown")
 def class_health_breakdown():
     """
     100% stacked bar or pie per class:
@@ -87,47 +135,24 @@ def class_health_breakdown():
     Supports optional query param `time_window` = all | last_7_days | last_30_days (filters by Assignment.created_at)
     """
 
-    time_window = request.args.get('time_window', 'all')
-    since = None
-    from datetime import timedelta
-    if time_window == 'last_7_days':
-        since = datetime.now(timezone.utc) - timedelta(days=7)
-    elif time_window == 'last_30_days':
-        since = datetime.now(timezone.utc) - timedelta(days=30)
-
-    classes = (
-        db.session.query(Class)
-        .filter(Class.user_id == current_user.user_id)
-        .all()
-    )
+    since = _time_window_start(request.args.get('time_window', 'all'))
 
     payload = []
 
-    for c in classes:
-        base_q = db.session.query(Assignment).filter(Assignment.class_id == c.class_id)
-        if since is not None:
-            base_q = base_q.filter(Assignment.created_at >= since)
-
-        total_assignments = base_q.count()
+    for row in _class_health_query(current_user.user_id, since):
+        total_assignments = row.total
 
         if total_assignments == 0:
             continue
 
-        completed = base_q.filter(Assignment.is_completed == True).count()
-
-        in_progress = (
-            base_q.join(StudySession, StudySession.assignment_id == Assignment.assignment_id)
-            .filter(Assignment.is_completed == False)
-            .distinct()
-            .count()
-        )
-
+        completed = row.completed
+        in_progress = row.in_progress
         not_started = total_assignments - completed - in_progress
 
         payload.append({
-            "class_id": c.class_id,
-            "class_name": c.class_name,
-            "color": c.color,
+            "class_id": row.class_id,
+            "class_name": row.class_name,
+            "color": row.color,
             "completed": round((completed / total_assignments) * 100, 1),
             "in_progress": round((in_progress / total_assignments) * 100, 1),
             "not_started": round((not_started / total_assignments) * 100, 1),
@@ -143,59 +168,40 @@ def class_health_breakdown():
 
 @charts.route("/classes/class_health_summary")
 @login_required
+@analytics_cache.cached("class_health_summary")
 def class_health_summary():
     class_id = request.args.get("class_id", "all")
-    time_window = request.args.get('time_window', 'all')
+    since = _time_window_start(request.args.get('time_window', 'all'))
 
-    since = None
-    if time_window == 'last_7_days':
-        since = datetime.now(timezone.utc) - timedelta(days=7)
-    elif time_window == 'last_30_days':
-        since = datetime.now(timezone.utc) - timedelta(days=30)
-
-    query = db.session.query(Assignment).join(Class).filter(
-        Class.user_id == current_user.user_id
-    )
+    query = _class_health_query(current_user.user_id, since)
 
+    class_name = "All classes"
     if class_id != "all":
-        query = query.filter(Assignment.class_id == class_id)
+        class_id = request.args.get("class_id", type=int)
+        if class_id is None:
+            abort(400, "class_id must be a class id or 'all'")
+        query = query.filter(Class.class_id == class_id)
 
-    if since is not None:
-        query = query.filter(Assignment.created_at >= since)
+    rows = query.all()
 
-    total = query.count()
-    class_name = "All classes"
-    if class_id != "all":
-        cl = Class.query.get(class_id)
-        if cl:
-            class_name = cl.class_name
+    if class_id != "all" and rows:
+        class_name = rows[0].class_name
+
+    total = sum(r.total for r in rows)
     if total == 0:
         return jsonify({
             "empty": True,
             "class_name": class_name,
             })
 
-    completed = query.filter(Assignment.is_completed == True).count()
-
-    in_progress = (
-        query.join(StudySession, StudySession.assignment_id == Assignment.assignment_id)
-        .filter(Assignment.is_completed == False)
-        .distinct()
-        .count()
-    )
-
+    completed = sum(r.completed for r in rows)
+    in_progress = sum(r.in_progress for r in rows)
     not_started = total - completed - in_progress
 
     # ✅ percent calculation ALWAYS here
     def pct(n): 
         return round((n / total) * 100, 1)
 
-    class_name = "All classes"
-    if class_id != "all":
-        cl = Class.query.get(class_id)
-        if cl:
-            class_name = cl.class_name
-
     return jsonify({
         "empty": False,
         "class_name": class_name,
@@ -211,4 +217,3 @@ def class_health_summary():
         "in_progress_count": in_progress,
         "not_started_count": not_started
     })
-
@@ -0,0 +1,64 @@
+from flask import jsonify, request
+from flask_login import login_required, current_user
+from app.routes.charts import charts
+from app.extensions import analytics_cache
+from app.services.dashboard_frames import load_dashboard_frames
+
+from app.routes.charts.effort_routes import (
+    build_spent_vs_expected_time,
+    build_marginal_returns_curve,
+    build_effort_allocation,
+    build_outcome_contribution
+)
+from app.routes.charts.performance_routes import (
+    build_rolling_grade_trend,
+    build_performance_stability_index,
+    build_effort_outcome_timeline,
+    build_lag_correlation_heatmap,
+    DEFAULT_MAX_LAG
+)
+from app.routes.charts.risk_routes import (
+    build_deadline_proximity_distribution,
+    build_risk_composition_evolution,
+    build_assignment_risk_breakdown,
+    build_urgency_risk_matrix
+)
+
+
+# =================== DASHBOARD BUNDLE ===================
+@charts.route("/dashboard/bundle")
+@login_required
+@analytics_cache.cached("dashboard_bundle")
+def dashboard_bundle():
+    """
+    Every /charts/dashboard/* payload in one response.
+    Classes, assignments and study sessions are loaded once and shared.
+    Query params:
+      mode=riskiest|latest, limit=N (forwarded to assignment_risk_breakdown)
+      max_lag=N (forwarded to lag_correlation_heatmap)
+    """
+    mode = request.args.get('mode', 'riskiest')
+    limit = request.args.get('limit', 10, type=int)
+    max_lag = request.args.get('max_lag', DEFAULT_MAX_LAG, type=int)
+
+    frames = load_dashboard_frames(current_user.user_id)
+
+    return jsonify({
+        # Effort
+        "spent_vs_expected_time": build_spent_vs_expected_time(frames),
+        "marginal_returns_curve": build_marginal_returns_curve(frames),
+        "effort_allocation": build_effort_allocation(frames),
+        "outcome_contribution": build_outcome_contribution(frames),
+
+        # Performance
+        "rolling_grade_trend": build_rolling_grade_trend(frames),
+        "performance_stability_index": build_performance_stability_index(frames),
+        "effort_outcome_timeline": build_effort_outcome_timeline(frames),
+        "lag_correlation_heatmap": build_lag_correlation_heatmap(frames, max_lag=max_lag),
+
+        # Risk
+        "deadline_proximity_distribution": build_deadline_proximity_distribution(frames),
+        "risk_composition_evolution": build_risk_composition_evolution(frames),
+        "assignment_risk_breakdown": build_assignment_risk_breakdown(frames, mode=mode, limit=limit),
+        "urgency_risk_matrix": build_urgency_risk_matrix(frames)
+    })
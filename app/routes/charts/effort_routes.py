@@ -1,22 +1,19 @@
 from flask import jsonify, request
 from flask_login import login_required, current_user
 from app.routes.charts import charts
-from app.models.course import Class
-from app.models.study_session import StudySession
-from app.models.assignment import Assignment
-from app.extensions import db
+from app.extensions import analytics_cache
 import pandas as pd
 import numpy as np
 
+from app.services.dashboard_frames import load_dashboard_frames
 from app.services.expected_utils import (
     has_enough_data,
-    estimate_expected_minutes
+    estimate_expected_minutes_batch
 )
 from app.services.effort_utils import (
     effort_ratio,
     compute_effort_score,
-    cumulative_effort_outcome,
-    smooth_marginal_returns,
+    marginal_returns_arrays,
     effort_allocation_by_class,
     outcome_contribution_by_class
 )
@@ -29,355 +26,234 @@ MIN_ASSIGNMENTS_WITH_GRADES = 5
 # =================== GRAPH 1: Time Spent vs Expected Time ===================
 @charts.route("/dashboard/spent_vs_expected_time")
 @login_required
+@analytics_cache.cached("spent_vs_expected_time")
 def spent_vs_expected_time():
     """
     Bar chart comparing actual study time vs expected time per class.
     """
-    
+    return jsonify(build_spent_vs_expected_time(load_dashboard_frames(current_user.user_id)))
+
+
+def build_spent_vs_expected_time(frames):
+    sessions = frames.sessions
+    assignments = frames.assignments
+
     # Check data sufficiency
-    session_count = db.session.query(StudySession).filter(
-        StudySession.user_id == current_user.user_id,
-        StudySession.is_completed == True
-    ).count()
-    
-    grade_count = db.session.query(Assignment).filter(
-        Assignment.user_id == current_user.user_id,
-        Assignment.grade.isnot(None)
-    ).count()
-    
+    session_count = len(sessions)
+    grade_count = int(assignments['grade'].notna().sum())
+
     if session_count < MIN_STUDY_SESSIONS or grade_count < MIN_ASSIGNMENTS_WITH_GRADES:
-        return jsonify({
+        return {
             "empty": True,
             "message": f"Need at least {MIN_STUDY_SESSIONS} study sessions and {MIN_ASSIGNMENTS_WITH_GRADES} graded assignments"
-        })
-    
-    # Get all classes
-    classes = db.session.query(Class).filter(
-        Class.user_id == current_user.user_id
-    ).all()
-    
-    if not classes:
-        return jsonify({"empty": True, "message": "No classes found"})
-    
-    # Get completed study sessions
-    sessions = db.session.query(
-        StudySession.class_id,
-        StudySession.duration_minutes
-    ).filter(
-        StudySession.user_id == current_user.user_id,
-        StudySession.is_completed == True,
-        StudySession.duration_minutes.isnot(None)
-    ).all()
-    
-
-    
-    # Get historical data for estimation
-    completed_assignments = (
-        db.session.query(Assignment)
-        .join(Class, Class.class_id == Assignment.class_id)
-        .join(StudySession, StudySession.assignment_id == Assignment.assignment_id)
-        .filter(
-            Assignment.user_id == current_user.user_id,
-            Assignment.is_completed == True,
-            StudySession.duration_minutes.isnot(None)
-        )
-        .all()
-    )
+        }
+
+    if frames.classes.empty:
+        return {"empty": True, "message": "No classes found"}
+
+    # Completed assignments that have logged study time
+    completed_assignments = assignments[
+        assignments['is_completed'] &
+        assignments['assignment_id'].isin(sessions['assignment_id'].dropna())
+    ]
 
-    
     # Aggregate actual time per class
-    actual_by_class = {}
-    for s in sessions:
-        actual_by_class[s.class_id] = actual_by_class.get(s.class_id, 0) + s.duration_minutes
-    
+    actual_by_class = sessions.groupby('class_id')['duration_minutes'].sum().to_dict()
 
-    
     # Build past assignments for estimation
-    past_assignments = []
-    study_times = dict(
-        db.session.query(
-            StudySession.assignment_id,
-            db.func.sum(StudySession.duration_minutes)
-        )
-        .filter(
-            StudySession.user_id == current_user.user_id,
-            StudySession.is_completed == True
-        )
-        .group_by(StudySession.assignment_id)
-        .all()
+    study_times = frames.study_minutes_by_assignment()
+    past_assignments = completed_assignments[['class_type', 'assignment_type', 'class_id']].assign(
+        actual_minutes=completed_assignments['assignment_id'].map(study_times)
     )
+    past_assignments = past_assignments[past_assignments['actual_minutes'] > 0]
+
+    # Expected time: the user's estimate, else a similarity-weighted estimate from history
+    expected_minutes = completed_assignments['estimated_minutes'].astype(float)
+    missing = expected_minutes.isna()
 
-    # Aggregate expected time per class
-    expected_by_class = {}
-
-    #Compute the past_assignments to be used by estimate_expected_minutes
-    for ca in completed_assignments:
-        actual_time = study_times.get(ca.assignment_id)
-
-        if actual_time:
-            past_assignments.append({
-                'class_type': ca.class_.class_type,
-                'assignment_type': ca.assignment_type,
-                'class_id': ca.class_id,
-                'actual_minutes': actual_time
-            })
-
-    for ca in completed_assignments:
-        # 1. Determine expected time
-        if ca.estimated_minutes:
-            expected_minutes = ca.estimated_minutes
-        else:
-            if not has_enough_data(past_assignments):
-                continue
-
-            expected_minutes = estimate_expected_minutes(
-                ca.class_.class_type,
-                ca.assignment_type,
-                ca.class_id,
-                past_assignments
-            )
-
-        # 2. Aggregate by class
-        expected_by_class[ca.class_id] = (
-            expected_by_class.get(ca.class_id, 0) + expected_minutes
+    if missing.any() and has_enough_data(past_assignments):
+        expected_minutes[missing] = estimate_expected_minutes_batch(
+            completed_assignments[missing], past_assignments
         )
 
-    
+    # Aggregate expected time per class (skipping assignments that could not be estimated)
+    expected_by_class = (
+        expected_minutes.dropna().astype(int)
+        .groupby(completed_assignments['class_id']).sum()
+        .to_dict()
+    )
+
     # Build response
     labels = []
     actual = []
     expected = []
-    
-    for cls in classes:
+
+    for cls in frames.classes.itertuples():
         if cls.class_id in actual_by_class or cls.class_id in expected_by_class:
             labels.append(cls.class_name)
             actual.append(actual_by_class.get(cls.class_id, 0))
             expected.append(expected_by_class.get(cls.class_id, 0))
 
-    
     if not labels:
-        return jsonify({"empty": True, "message": "No data available"})
-    
-    return jsonify({
+        return {"empty": True, "message": "No data available"}
+
+    return {
         "empty": False,
         "labels": labels,
         "actual": actual,
         "expected": expected
-    })
+    }
 
 
 # =================== GRAPH 2: Marginal Returns Curve ===================
 @charts.route("/dashboard/marginal_returns_curve")
 @login_required
+@analytics_cache.cached("marginal_returns_curve")
 def marginal_returns_curve():
     """
     Line chart showing cumulative effort vs outcome.
     """
-    
+    return jsonify(build_marginal_returns_curve(load_dashboard_frames(current_user.user_id)))
+
+
+def build_marginal_returns_curve(frames):
+    assignments = frames.assignments
+
     # Check data sufficiency
-    grade_count = db.session.query(Assignment).filter(
-        Assignment.user_id == current_user.user_id,
-        Assignment.grade.isnot(None)
-    ).count()
-    
+    grade_count = int(assignments['grade'].notna().sum())
+
     if grade_count < MIN_ASSIGNMENTS_WITH_GRADES:
-        return jsonify({
+        return {
             "empty": True,
             "message": f"Need at least {MIN_ASSIGNMENTS_WITH_GRADES} graded assignments"
-        })
-    
-    # Get completed assignments with grades and study time
-    results = db.session.query(
-        Assignment.assignment_id,
-        Assignment.finished_at,
-        Assignment.grade
-    ).filter(
-        Assignment.user_id == current_user.user_id,
-        Assignment.is_completed == True,
-        Assignment.grade.isnot(None),
-        Assignment.finished_at.isnot(None)
-    ).order_by(Assignment.finished_at).all()
-    
-    if not results:
-        return jsonify({"empty": True, "message": "No graded assignments"})
-    
-    # Build assignment data with study time
-    assignments = []
-    for r in results:
-        # Get total study time for this assignment
-        study_time = db.session.query(
-            db.func.sum(StudySession.duration_minutes)
-        ).filter(
-            StudySession.assignment_id == r.assignment_id,
-            StudySession.is_completed == True
-        ).scalar() or 0
-        
-        if study_time > 0:
-            assignments.append({
-                'finished_at': r.finished_at,
-                'actual_minutes': study_time,
-                'grade': float(r.grade)
-            })
-    
-    if len(assignments) < 3:
-        return jsonify({"empty": True, "message": "Insufficient data for curve"})
-    
-    # Compute cumulative data
-    cumulative_data = cumulative_effort_outcome(assignments)
-    
-    # Smooth the curve
-    smoothed = smooth_marginal_returns(cumulative_data, window=3)
-    
-    return jsonify({
+        }
+
+    # Completed assignments with grades
+    results = frames.graded[frames.graded['is_completed']].sort_values('finished_at', kind='stable')
+
+    if results.empty:
+        return {"empty": True, "message": "No graded assignments"}
+
+    # Attach total study time per assignment (one groupby over the session frame)
+    study_time = results['assignment_id'].map(frames.study_minutes_by_assignment()).fillna(0)
+    studied = (study_time > 0).to_numpy()
+
+    if studied.sum() < 3:
+        return {"empty": True, "message": "Insufficient data for curve"}
+
+    # Cumulative effort and smoothed outcome
+    effort, outcome = marginal_returns_arrays(
+        study_time.to_numpy()[studied],
+        results['grade'].to_numpy()[studied],
+        window=3
+    )
+
+    return {
         "empty": False,
-        "points": smoothed
-    })
+        "points": [
+            {"effort": e, "outcome": o}
+            for e, o in zip(effort.tolist(), outcome.tolist())
+        ]
+    }
 
 
 # =================== GRAPH 3: Effort Allocation ===================
 @charts.route("/dashboard/effort_allocation")
 @login_required
+@analytics_cache.cached("effort_allocation")
 def effort_allocation():
     """
     Pie/donut chart showing effort allocation by class.
     """
-    
+    return jsonify(build_effort_allocation(load_dashboard_frames(current_user.user_id)))
+
+
+def build_effort_allocation(frames):
+    sessions = frames.sessions
+
     # Check data sufficiency
-    session_count = db.session.query(StudySession).filter(
-        StudySession.user_id == current_user.user_id,
-        StudySession.is_completed == True
-    ).count()
-    
-    if session_count < MIN_STUDY_SESSIONS:
-        return jsonify({
+    if len(sessions) < MIN_STUDY_SESSIONS:
+        return {
             "empty": True,
             "message": f"Need at least {MIN_STUDY_SESSIONS} study sessions"
-        })
-    
-    # Get all study sessions
-    sessions = db.session.query(
-        StudySession.class_id,
-        StudySession.duration_minutes,
-        Class.class_name,
-        Class.color
-    ).join(
-        Class, Class.class_id == StudySession.class_id
-    ).filter(
-        StudySession.user_id == current_user.user_id,
-        StudySession.is_completed == True,
-        StudySession.duration_minutes.isnot(None)
-    ).all()
-    
-    if not sessions:
-        return jsonify({"empty": True, "message": "No completed study sessions"})
-    
-    # Convert to dict format
-    session_data = [
-        {
-            'class_id': s.class_id,
-            'duration_minutes': s.duration_minutes,
-            'class_name': s.class_name,
-            'color': s.color
         }
-        for s in sessions
-    ]
-    
+
+    # Convert to dict format
+    session_data = sessions[['class_id', 'duration_minutes', 'class_name', 'color']].to_dict('records')
+
     # Compute allocation
     allocation = effort_allocation_by_class(session_data)
-    
+
     if not allocation:
-        return jsonify({"empty": True, "message": "No data available"})
-    
+        return {"empty": True, "message": "No data available"}
+
     # Build response
-    class_map = {s.class_id: (s.class_name, s.color) for s in sessions}
-    
+    class_map = {s['class_id']: (s['class_name'], s['color']) for s in session_data}
+
     labels = []
     values = []
     colors = []
-    
+
     for class_id, percentage in sorted(allocation.items(), key=lambda x: x[1], reverse=True):
         if class_id in class_map:
             labels.append(class_map[class_id][0])
             values.append(percentage)
             colors.append(class_map[class_id][1])
-    
-    return jsonify({
+
+    return {
         "empty": False,
         "labels": labels,
         "values": values,
         "colors": colors
-    })
+    }
 
 
 # =================== GRAPH 4: Outcome Contribution ===================
 @charts.route("/dashboard/outcome_contribution")
 @login_required
+@analytics_cache.cached("outcome_contribution")
 def outcome_contribution():
     """
     Pie/donut chart showing outcome contribution by class.
     """
-    
+    return jsonify(build_outcome_contribution(load_dashboard_frames(current_user.user_id)))
+
+
+def build_outcome_contribution(frames):
+    graded = frames.assignments[frames.assignments['grade'].notna()]
+
     # Check data sufficiency
-    grade_count = db.session.query(Assignment).filter(
-        Assignment.user_id == current_user.user_id,
-        Assignment.grade.isnot(None)
-    ).count()
-    
-    if grade_count < MIN_ASSIGNMENTS_WITH_GRADES:
-        return jsonify({
+    if len(graded) < MIN_ASSIGNMENTS_WITH_GRADES:
+        return {
             "empty": True,
             "message": f"Need at least {MIN_ASSIGNMENTS_WITH_GRADES} graded assignments"
-        })
-    
-    # Get graded assignments
-    assignments = db.session.query(
-        Assignment.class_id,
-        Assignment.grade,
-        Class.class_name,
-        Class.color
-    ).join(
-        Class, Class.class_id == Assignment.class_id
-    ).filter(
-        Assignment.user_id == current_user.user_id,
-        Assignment.grade.isnot(None)
-    ).all()
-    
-    if not assignments:
-        return jsonify({"empty": True, "message": "No graded assignments"})
-    
-    # Convert to dict format
-    assignment_data = [
-        {
-            'class_id': a.class_id,
-            'grade': float(a.grade),
-            'class_name': a.class_name,
-            'color': a.color
         }
-        for a in assignments
-    ]
-    
+
+    # Convert to dict format
+    assignment_data = graded[['class_id', 'grade', 'class_name', 'color']].to_dict('records')
+
     # Compute contribution
     contribution = outcome_contribution_by_class(assignment_data)
-    
+
     if not contribution:
-        return jsonify({"empty": True, "message": "No data available"})
-    
+        return {"empty": True, "message": "No data available"}
+
     # Build response
-    class_map = {a.class_id: (a.class_name, a.color) for a in assignments}
-    
+    class_map = {a['class_id']: (a['class_name'], a['color']) for a in assignment_data}
+
     labels = []
     values = []
     colors = []
-    
+
     for class_id, percentage in sorted(contribution.items(), key=lambda x: x[1], reverse=True):
         if class_id in class_map:
             labels.append(class_map[class_id][0])
             values.append(percentage)
             colors.append(class_map[class_id][1])
-    
-    return jsonify({
+
+    return {
         "empty": False,
         "labels": labels,
         "values": values,
         "colors": colors
-    })
\ No newline at end of file
+    }
@@ -1,16 +1,22 @@
-from flask import jsonify
+from flask import jsonify, request
 from flask_login import login_required, current_user
 from app.routes.charts import charts
 from app.models.study_session import StudySession
 from app.models.course import Class
-from app.extensions import db
-from datetime import datetime, timedelta, timezone
+from app.extensions import db, analytics_cache
+from app.services.time_utils import bucket_index
+from datetime import datetime, time, timedelta, timezone
 from sqlalchemy import func, cast, Date
 from app.models.assignment import Assignment
 
 
+DEFAULT_LOAD_WEEKS = 4
+MAX_LOAD_WEEKS = 52
+
+
 @charts.route("/home/time_per_class")
 @login_required
+@analytics_cache.cached("time_per_class_chart")
 def time_per_class_chart():
     """
     Returns aggregated study time per class for the logged-in user.
@@ -47,6 +53,7 @@ def time_per_class_chart():
 
 @charts.route("/home/weekly_study_time")
 @login_required
+@analytics_cache.cached("weekly_study_time_chart")
 def weekly_study_time_chart():
     """
     Returns total study minutes per day for the last 7 days (including today).
@@ -94,6 +101,7 @@ def weekly_study_time_chart():
 
 @charts.route("/home/assignment_load_daily")
 @login_required
+@analytics_cache.cached("assignment_load_daily")
 def assignment_load_daily():
     today = datetime.now(timezone.utc).date()
     end_date = today + timedelta(days=6)
@@ -134,32 +142,45 @@ def assignment_load_daily():
 
 @charts.route("/home/assignment_load_weekly")
 @login_required
+@analytics_cache.cached("assignment_load_weekly")
 def assignment_load_weekly():
-    today = datetime.now(timezone.utc).date()
+    """
+    Assignments due per week, starting this week (Monday, UTC).
+    Query params:
+      weeks=N (default 4, at most 52)
+    """
+    weeks = request.args.get("weeks", DEFAULT_LOAD_WEEKS, type=int)
+    weeks = max(1, min(MAX_LOAD_WEEKS, weeks))
+
+    now = datetime.now(timezone.utc)
+    today = datetime.combine(now.date(), time(), tzinfo=timezone.utc)
 
-    # Start of this week (Monday)
+    # Start of this week (Monday); half-open [start, end) keeps due_at indexable
     start_of_week = today - timedelta(days=today.weekday())
+    window_end = start_of_week + timedelta(weeks=weeks)
+
+    due = (
+        db.session.query(
+            bucket_index(Assignment.due_at, start_of_week, int(timedelta(weeks=1).total_seconds())).label("week")
+        )
+        .filter(
+            Assignment.user_id == current_user.user_id,
+            Assignment.due_at >= start_of_week,
+            Assignment.due_at < window_end
+        )
+        .subquery()
+    )
+    counts = dict(db.session.query(due.c.week, func.count()).group_by(due.c.week).all())
 
     labels = []
     data = []
 
-    for i in range(4):
+    for i in range(weeks):
         week_start = start_of_week + timedelta(weeks=i)
         week_end = week_start + timedelta(days=6)
 
-        count = (
-            db.session.query(func.count(Assignment.assignment_id))
-            .filter(
-                Assignment.user_id == current_user.user_id,
-                Assignment.due_at.isnot(None),
-                cast(Assignment.due_at, Date) >= week_start,
-                cast(Assignment.due_at, Date) <= week_end
-            )
-            .scalar()
-        )
-
         labels.append(f"Week {week_start.day}–{week_end.day}")
-        data.append(count)
+        data.append(counts.get(i, 0))
 
     return jsonify({
         "labels": labels,
@@ -171,14 +192,34 @@ def assignment_load_weekly():
 
 @charts.route("/home/study_efficiency_by_class")
 @login_required
+@analytics_cache.cached("study_efficiency_by_class")
 def study_efficiency_by_class():
     """
     Radar chart data: study efficiency per class.
     """
 
+    # ---------- Grades and completion per class ----------
     classes = (
-        db.session.query(Class)
+        db.session.query(
+            Class.class_id,
+            Class.class_name,
+            Class.color,
+            Class.importance,
+            Class.difficulty,
+            func.avg(Assignment.grade).label("avg_grade"),
+            func.count(Assignment.assignment_id).label("total_assignments"),
+            func.count(Assignment.assignment_id)
+                .filter(Assignment.is_completed == True)
+                .label("completed_assignments")
+        )
+        .outerjoin(
+            Assignment,
+            (Assignment.class_id == Class.class_id)
+            & (Assignment.user_id == current_user.user_id)
+        )
         .filter(Class.user_id == current_user.user_id)
+        .group_by(Class.class_id)
+        .order_by(Class.class_id)
         .all()
     )
 
@@ -211,40 +252,12 @@ def study_efficiency_by_class():
         )
 
         # ---------- Average grade ----------
-        avg_grade = (
-            db.session.query(func.avg(Assignment.grade))
-            .filter(
-                Assignment.class_id == cls.class_id,
-                Assignment.user_id == current_user.user_id,
-                Assignment.grade.isnot(None)
-            )
-            .scalar()
-        )
-        avg_grade = float(avg_grade) if avg_grade else 0
+        avg_grade = float(cls.avg_grade) if cls.avg_grade else 0
 
         # ---------- Completion rate ----------
-        total_assignments = (
-            db.session.query(func.count(Assignment.assignment_id))
-            .filter(
-                Assignment.class_id == cls.class_id,
-                Assignment.user_id == current_user.user_id
-            )
-            .scalar()
-        )
-
-        completed_assignments = (
-            db.session.query(func.count(Assignment.assignment_id))
-            .filter(
-                Assignment.class_id == cls.class_id,
-                Assignment.user_id == current_user.user_id,
-                Assignment.is_completed == True
-            )
-            .scalar()
-        )
-
         completion_rate = (
-            (completed_assignments / total_assignments) * 100
-            if total_assignments > 0 else 0
+            (cls.completed_assignments / cls.total_assignments) * 100
+            if cls.total_assignments > 0 else 0
         )
 
         # ---------- Importance ----------
@@ -1,69 +1,43 @@
 from flask import jsonify, request
 from flask_login import login_required, current_user
 from app.routes.charts import charts
-from app.models.course import Class
-from app.models.study_session import StudySession
-from app.models.assignment import Assignment
-from app.extensions import db
+from app.extensions import analytics_cache
+from app.services.dashboard_frames import load_dashboard_frames
+from app.services.time_utils import week_start
+from app.services.effort_utils import lagged_correlations
 import pandas as pd
+import numpy as np
+
+# Lag heatmap range, in weeks
+DEFAULT_MAX_LAG = 3
+MAX_LAG_WEEKS = 12
 
 
 # =================== GRAPH 1: Rolling Grade Trend ===================
 @charts.route("/dashboard/rolling_grade_trend")
 @login_required
+@analytics_cache.cached("rolling_grade_trend")
 def rolling_grade_trend():
     """
     Rolling average of grades over time (weekly buckets).
     Smooths out performance trajectory per class.
     """
-   
-    # Query all graded assignments
-    results = db.session.query(
-        Assignment.class_id,
-        Assignment.finished_at,
-        Assignment.grade,
-        Class.class_name,
-        Class.color
-    ).join(
-        Class, Class.class_id == Assignment.class_id
-    ).filter(
-        Assignment.user_id == current_user.user_id,
-        Assignment.grade.isnot(None),
-        Assignment.finished_at.isnot(None)
-    ).order_by(Assignment.finished_at).all()
-   
-    if not results:
-        return jsonify({"empty": True, "message": "No graded assignments yet"})
-   
-    # Convert to DataFrame
-    df = pd.DataFrame([{
-        'class_id': r.class_id,
-        'class_name': r.class_name,
-        'color': r.color,
-        'finished_at': r.finished_at,
-        'grade': float(r.grade)
-    } for r in results])
-   
+    return jsonify(build_rolling_grade_trend(load_dashboard_frames(current_user.user_id)))
 
 
-    # ✅ Normalize timezone
-    df['finished_at'] = pd.to_datetime(df['finished_at'], utc=True)
+def build_rolling_grade_trend(frames):
+    weekly = frames.weekly
+    weekly = weekly[weekly['grade_count'] > 0]
 
-    # ✅ Weekly buckets
-    df['week'] = (
-        df['finished_at']
-        .dt.tz_localize(None)
-        .dt.to_period('W')
-        .apply(lambda p: p.start_time)
-    )
+    if weekly.empty:
+        return {"empty": True, "message": "No graded assignments yet"}
 
-    # Weekly average
+    # Weekly average (from the weekly rollups)
     weekly = (
-        df
-        .groupby(['class_id', 'class_name', 'color', 'week'])['grade']
-        .mean()
-        .reset_index()
+        weekly[['class_id', 'class_name', 'color', 'week', 'grade_mean']]
+        .rename(columns={'grade_mean': 'grade'})
         .sort_values(['class_id', 'week'])
+        .reset_index(drop=True)
     )
 
     # Rolling average
@@ -151,14 +125,14 @@ def rolling_grade_trend():
     else:
         y_min, y_max = 0, 100
 
-    return jsonify({
+    return {
         "empty": False,
         "datasets": datasets,
         "y_bounds": {
             "min": y_min,
             "max": y_max
         }
-    })
+    }
 
 
 
@@ -166,6 +140,7 @@ def rolling_grade_trend():
 # =================== GRAPH 2: Performance Stability Index ===================
 @charts.route("/dashboard/performance_stability_index")
 @login_required
+@analytics_cache.cached("performance_stability_index")
 def performance_stability_index():
     """
     Composite metric combining:
@@ -173,104 +148,95 @@ def performance_stability_index():
     - Late submission rate (lower is better)
     - Incomplete ratio (lower is better)
     Higher PSI = more stable performance
+    Query params:
+      by_class=true (adds a PSI series per class)
     """
-    
-    # Get all assignments
-    results = db.session.query(
-        Assignment.assignment_id,
-        Assignment.class_id,
-        Assignment.grade,
-        Assignment.due_at,
-        Assignment.finished_at,
-        Assignment.created_at,
-        Assignment.is_completed,
-        Class.class_name
-    ).join(
-        Class, Class.class_id == Assignment.class_id
-    ).filter(
-        Assignment.user_id == current_user.user_id
-    ).all()
-    
-    if not results:
-        return jsonify({"empty": True, "message": "No assignments yet"})
-    
-    df = pd.DataFrame([{
-        'assignment_id': r.assignment_id,
-        'class_id': r.class_id,
-        'class_name': r.class_name,
-        'grade': float(r.grade) if r.grade else None,
-        'due_at': r.due_at,
-        'finished_at': r.finished_at,
-        'created_at': r.created_at,
-        'is_completed': r.is_completed
-    } for r in results])
-    
+    by_class = request.args.get('by_class', 'false').lower() == 'true'
+    return jsonify(build_performance_stability_index(
+        load_dashboard_frames(current_user.user_id), by_class=by_class
+    ))
+
+
+def build_performance_stability_index(frames, by_class=False):
+    if frames.assignments.empty:
+        return {"empty": True, "message": "No assignments yet"}
+
+    df = frames.assignments[[
+        'assignment_id', 'class_id', 'class_name', 'grade',
+        'due_at', 'finished_at', 'created_at', 'is_completed'
+    ]].copy()
+
     # Bucket by week using created_at
-        # ✅ Normalize timezone
-    df['created_at'] = pd.to_datetime(df['created_at'], utc=True)
-    df['due_at'] = pd.to_datetime(df['due_at'], utc=True)
-
-    df['week'] = (
-        df['created_at']
-        .dt.tz_localize(None)
-        .dt.to_period('W')
-        .apply(lambda p: p.start_time)
+    df['week'] = week_start(df['created_at'])
+
+    # Per-row indicators, aggregated per week (and per class/week) below
+    df['is_late'] = (
+        df['is_completed'] &
+        df['finished_at'].notna() &
+        df['due_at'].notna() &
+        (df['finished_at'] > df['due_at'])
     )
+    df['is_incomplete'] = ~df['is_completed']
+
+    psi_df = _weekly_psi(df, ['week'])
 
-    
-    weekly_psi = []
-    
-    for week in sorted(df['week'].unique()):
-        week_data = df[df['week'] == week]
-        
-        # 1. Grade Volatility (std dev of grades)
-        graded = week_data[week_data['grade'].notna()]
-        if len(graded) >= 2:
-            grade_std = graded['grade'].std()
-        else:
-            grade_std = 0
-        
-        # 2. Late Submission Rate
-        completed = week_data[week_data['is_completed'] == True]
-        if len(completed) > 0:
-            late_count = len(completed[
-                (completed['finished_at'].notna()) &
-                (completed['due_at'].notna()) &
-                (completed['finished_at'] > completed['due_at'])
-            ])
-            late_rate = late_count / len(completed)
-        else:
-            late_rate = 0
-        
-        # 3. Incomplete Ratio
-        total_assignments = len(week_data)
-        incomplete_count = len(week_data[week_data['is_completed'] == False])
-        incomplete_ratio = incomplete_count / total_assignments if total_assignments > 0 else 0
-        
-        weekly_psi.append({
-            'week': week,
-            'grade_std': grade_std,
-            'late_rate': late_rate,
-            'incomplete_ratio': incomplete_ratio
-        })
-    
-    psi_df = pd.DataFrame(weekly_psi)
-    
     if len(psi_df) == 0:
-        return jsonify({"empty": True, "message": "Insufficient data"})
-    
+        return {"empty": True, "message": "Insufficient data"}
+
+    result = {
+        "empty": False,
+        "data": _psi_points(psi_df)
+    }
+
+    if by_class:
+        class_psi = _weekly_psi(df, ['class_id', 'class_name', 'week'])
+        result["by_class"] = [
+            {
+                "class_id": class_id,
+                "class_name": class_name,
+                "data": _psi_points(group)
+            }
+            for (class_id, class_name), group in class_psi.groupby(['class_id', 'class_name'], sort=True)
+        ]
+
+    return result
+
+
+def _weekly_psi(df, keys):
+    """
+    Stability components and PSI per group of `keys` (the last key is the week).
+    Components are min-max normalized within each series (all keys but the week).
+    """
+    psi_df = df.groupby(keys, sort=True).agg(
+        grade_std=('grade', 'std'),
+        grade_count=('grade', 'count'),
+        completed=('is_completed', 'sum'),
+        late=('is_late', 'sum'),
+        incomplete=('is_incomplete', 'sum'),
+        total=('assignment_id', 'size')
+    ).reset_index()
+
+    # 1. Grade Volatility (std dev of grades, 0 with fewer than 2 grades)
+    psi_df['grade_std'] = psi_df['grade_std'].where(psi_df['grade_count'] >= 2, 0.0)
+
+    # 2. Late Submission Rate
+    psi_df['late_rate'] = (psi_df['late'] / psi_df['completed']).where(psi_df['completed'] > 0, 0.0)
+
+    # 3. Incomplete Ratio
+    psi_df['incomplete_ratio'] = psi_df['incomplete'] / psi_df['total']
+
     # Normalize each component (min-max normalization)
+    series_keys = [psi_df[k] for k in keys[:-1]] or [np.zeros(len(psi_df))]
+
     def normalize(series):
-        min_val = series.min()
-        max_val = series.max()
-        if max_val == min_val:
-            return pd.Series([0.5] * len(series))
-        return (series - min_val) / (max_val - min_val)
-    
+        grouped = series.groupby(series_keys)
+        min_val, max_val = grouped.transform('min'), grouped.transform('max')
+        return ((series - min_val) / (max_val - min_val)).where(max_val != min_val, 0.5)
+
     psi_df['grade_std_norm'] = normalize(psi_df['grade_std'])
     psi_df['late_rate_norm'] = normalize(psi_df['late_rate'])
     psi_df['incomplete_ratio_norm'] = normalize(psi_df['incomplete_ratio'])
-    
+
     # Compute PSI (weighted penalty, then invert)
     psi_df['penalty'] = (
         0.5 * psi_df['grade_std_norm'] +
@@ -278,111 +244,53 @@ def performance_stability_index():
         0.2 * psi_df['incomplete_ratio_norm']
     )
     psi_df['psi'] = 100 * (1 - psi_df['penalty'])
-    
-    # Sort by week
-    psi_df = psi_df.sort_values('week')
-    
-    data = [
-        {'x': row['week'].isoformat(), 'y': round(row['psi'], 1)}
-        for _, row in psi_df.iterrows()
+
+    return psi_df
+
+
+def _psi_points(psi_df):
+    return [
+        {'x': week.isoformat(), 'y': round(psi, 1)}
+        for week, psi in zip(psi_df['week'], psi_df['psi'].tolist())
     ]
-    
-    return jsonify({
-        "empty": False,
-        "data": data
-    })
 
 
 # =================== GRAPH 3: Effort → Outcome Timeline ===================
 @charts.route("/dashboard/effort_outcome_timeline")
 @login_required
+@analytics_cache.cached("effort_outcome_timeline")
 def effort_outcome_timeline():
     """
     Dual-axis chart showing:
     - Study effort (minutes per week)
     - Grade outcomes (weekly average)
     """
-    
-    # Get study sessions
-    study_results = db.session.query(
-        StudySession.class_id,
-        StudySession.started_at,
-        StudySession.duration_minutes,
-        Class.class_name
-    ).join(
-        Class, Class.class_id == StudySession.class_id
-    ).filter(
-        StudySession.user_id == current_user.user_id,
-        StudySession.is_completed == True,
-        StudySession.started_at.isnot(None),
-        StudySession.duration_minutes.isnot(None)
-    ).all()
-    
-    # Get graded assignments
-    grade_results = db.session.query(
-        Assignment.class_id,
-        Assignment.finished_at,
-        Assignment.grade,
-        Class.class_name
-    ).join(
-        Class, Class.class_id == Assignment.class_id
-    ).filter(
-        Assignment.user_id == current_user.user_id,
-        Assignment.grade.isnot(None),
-        Assignment.finished_at.isnot(None)
-    ).all()
-    
-    if not study_results and not grade_results:
-        return jsonify({"empty": True, "message": "No study sessions or grades yet"})
-    
-    # Process study effort
-    study_df = pd.DataFrame([{
-        'class_id': r.class_id,
-        'class_name': r.class_name,
-        'started_at': r.started_at,
-        'duration_minutes': r.duration_minutes
-    } for r in study_results]) if study_results else pd.DataFrame()
-    
-    # Process grades
-    grade_df = pd.DataFrame([{
-        'class_id': r.class_id,
-        'class_name': r.class_name,
-        'finished_at': r.finished_at,
-        'grade': float(r.grade)
-    } for r in grade_results]) if grade_results else pd.DataFrame()
-    
-    
+    return jsonify(build_effort_outcome_timeline(load_dashboard_frames(current_user.user_id)))
 
-    # Bucket by week
-    if not study_df.empty:
-        study_df['started_at'] = pd.to_datetime(study_df['started_at'], utc=True)
-        study_df['week'] = (
-            study_df['started_at']
-            .dt.tz_localize(None)
-            .dt.to_period('W')
-            .apply(lambda p: p.start_time)
-        )
+
+def build_effort_outcome_timeline(frames):
+    weekly = frames.weekly
+    effort_rows = weekly[weekly['session_count'] > 0]
+    grade_rows = weekly[weekly['grade_count'] > 0]
+
+    if effort_rows.empty and grade_rows.empty:
+        return {"empty": True, "message": "No study sessions or grades yet"}
+
+    # Weekly buckets come from the rollups: mean minutes per studied class, mean grade
+    if not effort_rows.empty:
         effort_weekly = (
-            study_df
-            .groupby(['week', 'class_id'])['duration_minutes']
-            .sum()
-            .groupby('week')
+            effort_rows
+            .groupby('week')['study_minutes']
             .mean()
+            .rename('duration_minutes')
             .reset_index()
         )
-
     else:
         effort_weekly = pd.DataFrame(columns=['week', 'duration_minutes'])
-    
-    if not grade_df.empty:
-        grade_df['finished_at'] = pd.to_datetime(grade_df['finished_at'], utc=True)
-        grade_df['week'] = (
-            grade_df['finished_at']
-            .dt.tz_localize(None)
-            .dt.to_period('W')
-            .apply(lambda p: p.start_time)
-        )
-        grade_weekly = grade_df.groupby('week')['grade'].mean().reset_index()
+
+    if not grade_rows.empty:
+        grade_totals = grade_rows.groupby('week')[['grade_sum', 'grade_count']].sum()
+        grade_weekly = (grade_totals['grade_sum'] / grade_totals['grade_count']).rename('grade').reset_index()
     else:
         grade_weekly = pd.DataFrame(columns=['week', 'grade'])
     
@@ -396,7 +304,7 @@ def effort_outcome_timeline():
         merged = grade_weekly.sort_values('week')
         merged['duration_minutes'] = None
     else:
-        return jsonify({"empty": True, "message": "Insufficient data"})
+        return {"empty": True, "message": "Insufficient data"}
     
     effort_data = [
         {'x': row['week'].isoformat(), 'y': int(row['duration_minutes']) if pd.notna(row.get('duration_minutes')) else None}
@@ -408,121 +316,80 @@ def effort_outcome_timeline():
         for _, row in merged.iterrows()
     ]
     
-    return jsonify({
+    return {
         "empty": False,
         "effort_data": effort_data,
         "grade_data": grade_data
-    })
+    }
 
 
 # =================== GRAPH 4: Lag Correlation Heatmap ===================
 @charts.route("/dashboard/lag_correlation_heatmap")
 @login_required
+@analytics_cache.cached("lag_correlation_heatmap")
 def lag_correlation_heatmap():
     """
     Heatmap showing correlation between study effort and grades
-    at different time lags (0-3 weeks) for each class.
+    at different time lags (0-3 weeks by default) for each class.
+    Query params:
+      max_lag=N (0-12 weeks)
     """
-    
-    # Get all classes
-    classes = db.session.query(Class).filter(
-        Class.user_id == current_user.user_id
-    ).all()
-    
-    if not classes:
-        return jsonify({"empty": True, "message": "No classes yet"})
-    
-    heatmap_data = []
-    class_labels = []
-    
-    for cls in classes:
-        # Get study sessions for this class
-        study_results = db.session.query(
-            StudySession.started_at,
-            StudySession.duration_minutes
-        ).filter(
-            StudySession.class_id == cls.class_id,
-            StudySession.is_completed == True,
-            StudySession.started_at.isnot(None),
-            StudySession.duration_minutes.isnot(None)
-        ).all()
-        
-        # Get grades for this class
-        grade_results = db.session.query(
-            Assignment.finished_at,
-            Assignment.grade
-        ).filter(
-            Assignment.class_id == cls.class_id,
-            Assignment.grade.isnot(None),
-            Assignment.finished_at.isnot(None)
-        ).all()
-        
-        if len(study_results) < 4 or len(grade_results) < 4:
-            # Need minimum data points
-            continue
-        
-        # Convert to weekly series
-        study_df = pd.DataFrame([{
-            'started_at': r.started_at,
-            'duration_minutes': r.duration_minutes
-        } for r in study_results])
-        study_df['started_at'] = pd.to_datetime(study_df['started_at'], utc=True)
-        study_df['week'] = (
-            study_df['started_at']
-            .dt.tz_localize(None)
-            .dt.to_period('W')
-            .apply(lambda x: x.start_time)
-        )
-        effort_series = study_df.groupby('week')['duration_minutes'].sum()
-        
-        grade_df = pd.DataFrame([{
-            'finished_at': r.finished_at,
-            'grade': float(r.grade)
-        } for r in grade_results])
-
-
-        grade_df['finished_at'] = pd.to_datetime(grade_df['finished_at'], utc=True)
-        grade_df['week'] = (
-            grade_df['finished_at']
-            .dt.tz_localize(None)
-            .dt.to_period('W')
-            .apply(lambda x: x.start_time)
-        )
-        grade_series = grade_df.groupby('week')['grade'].mean()
-        
-        # Compute correlations at different lags (0-3 weeks)
-        correlations = []
-        max_lag = 3
-        
-        for lag in range(max_lag + 1):
-            # Shift effort series by lag
-            effort_shifted = effort_series.shift(lag)
-            
-            # Align both series
-            aligned = pd.DataFrame({
-                'effort': effort_shifted,
-                'grade': grade_series
-            }).dropna()
-            
-            if len(aligned) < 4:
-                correlations.append(None)  # Not enough data
-                continue
-            
-            # Compute correlation
-            corr = aligned['effort'].corr(aligned['grade'])
-            correlations.append(corr if not pd.isna(corr) else None)
-        
-        # Only include if we have at least one valid correlation
-        if any(c is not None for c in correlations):
-            class_labels.append(cls.class_name)
-            heatmap_data.append(correlations)
-    
-    if not heatmap_data:
-        return jsonify({"empty": True, "message": "Insufficient data for correlation analysis"})
-    
-    return jsonify({
+    max_lag = request.args.get('max_lag', DEFAULT_MAX_LAG, type=int)
+    return jsonify(build_lag_correlation_heatmap(load_dashboard_frames(current_user.user_id), max_lag=max_lag))
+
+
+def build_lag_correlation_heatmap(frames, max_lag=DEFAULT_MAX_LAG):
+    if frames.classes.empty:
+        return {"empty": True, "message": "No classes yet"}
+
+    max_lag = max(0, min(MAX_LAG_WEEKS, max_lag))
+
+    weekly = frames.weekly
+
+    # Need minimum data points per class
+    totals = weekly.groupby('class_id')[['session_count', 'grade_count']].sum()
+    classes = frames.classes[
+        frames.classes['class_id'].map(totals['session_count']).ge(4) &
+        frames.classes['class_id'].map(totals['grade_count']).ge(4)
+    ]
+    if classes.empty:
+        return {"empty": True, "message": "Insufficient data for correlation analysis"}
+
+    # Weekly (week x class) matrices from the rollups
+    effort = weekly[weekly['session_count'] > 0].pivot(
+        index='week', columns='class_id', values='study_minutes'
+    )
+    grades = weekly[weekly['grade_count'] > 0].pivot(
+        index='week', columns='class_id', values='grade_mean'
+    )
+
+    # Contiguous weeks so a lag of N rows is N calendar weeks
+    weeks = pd.date_range(
+        min(effort.index.min(), grades.index.min()),
+        max(effort.index.max(), grades.index.max()),
+        freq='7D'
+    )
+    class_ids = classes['class_id']
+
+    correlations = lagged_correlations(
+        effort.reindex(index=weeks, columns=class_ids).to_numpy(dtype=float, na_value=np.nan),
+        grades.reindex(index=weeks, columns=class_ids).to_numpy(dtype=float, na_value=np.nan),
+        max_lag=max_lag
+    )
+
+    # Only include classes with at least one valid correlation
+    has_value = ~np.isnan(correlations).all(axis=1)
+    if not has_value.any():
+        return {"empty": True, "message": "Insufficient data for correlation analysis"}
+
+    heatmap_data = [
+        [None if np.isnan(c) else float(c) for c in row]
+        for row in correlations[has_value]
+    ]
+
+    return {
         "empty": False,
-        "class_labels": class_labels,
-        "lag_labels": ["Lag 0", "Lag 1", "Lag 2", "Lag 3"],
+        "class_labels": classes['class_name'][has_value].tolist(),
+        "lag_labels": [f"Lag {lag}" for lag in range(max_lag + 1)],
         "data": heatmap_data
-    })
\ No newline at end of file
+    }
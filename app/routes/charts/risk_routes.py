@@ -1,290 +1,298 @@
 from flask import jsonify, request
 from flask_login import login_required, current_user
 from app.routes.charts import charts
-from app.models.course import Class
-from app.models.study_session import StudySession
+from app.extensions import db, analytics_cache
 from app.models.assignment import Assignment
-from app.extensions import db
-from sqlalchemy import func
+from app.services.dashboard_frames import load_dashboard_frames
+from app.services.time_utils import week_start
 import pandas as pd
 import numpy as np
 from datetime import datetime, timezone, timedelta
+from sqlalchemy import case, func
 
 from app.services.risk_utils import (
-    compute_days_until_due,
-    urgency_score,
-    deadline_proximity_bucket,
+    DEADLINE_BUCKET_EDGES,
+    deadline_bucket_labels,
+    deadline_bucket_array,
     min_max_normalize,
-    time_pressure_score,
     compute_workload_overlap,
     historical_risk,
-    compute_assignment_risk,
-    aggregate_weekly_risk_components
+    compute_days_until_due_array,
+    urgency_score_array,
+    time_pressure_score_array,
+    historical_risk_array,
+    compute_assignment_risk_array
 )
 
 
 # =================== GRAPH 1: Deadline Proximity Distribution ===================
+MAX_DEADLINE_BUCKET_EDGES = 10
+
+
 @charts.route("/dashboard/deadline_proximity_distribution")
 @login_required
+@analytics_cache.cached("deadline_proximity_distribution")
 def deadline_proximity_distribution():
     """
     Shows how compressed upcoming deadlines are.
     Pure urgency, no risk modeling.
+    Query params:
+      edges=comma-separated bucket ends in days (default 2,5,10)
     """
-    
+    edges = _deadline_edges(request.args.get('edges'))
+    counts, minutes = load_deadline_proximity(current_user.user_id, edges)
+    return jsonify(_deadline_proximity_result(edges, counts, minutes))
+
+
+def _deadline_edges(raw):
+    """Increasing whole-day edges from the query string; the defaults when missing or invalid."""
+    try:
+        edges = sorted({int(edge) for edge in raw.split(',')})
+    except (AttributeError, ValueError):
+        return DEADLINE_BUCKET_EDGES
+    if not edges or edges[0] < 0 or len(edges) > MAX_DEADLINE_BUCKET_EDGES:
+        return DEADLINE_BUCKET_EDGES
+    return tuple(edges)
+
+
+def load_deadline_proximity(user_id, edges=DEADLINE_BUCKET_EDGES, now=None):
+    """
+    (counts, minutes) per deadline bucket for the user's open assignments,
+    bucketed and summed in one grouped query.
+    """
+    now = now or datetime.now(timezone.utc)
+
+    # due_at - now <= edge, compared as due_at <= now + edge so due_at stays indexable
+    bucket = case(
+        (Assignment.due_at < now, 0),
+        *[(Assignment.due_at <= now + timedelta(days=edge), i + 1) for i, edge in enumerate(edges)],
+        else_=len(edges) + 1
+    )
+    due = (
+        db.session.query(
+            bucket.label('bucket'),
+            func.coalesce(Assignment.estimated_minutes, 60).label('minutes')  # Default 60 min
+        )
+        .filter(
+            Assignment.user_id == user_id,
+            Assignment.is_completed == False,
+            Assignment.due_at.isnot(None)
+        )
+        .subquery()
+    )
+    rows = db.session.query(due.c.bucket, func.count(), func.sum(due.c.minutes)).group_by(due.c.bucket).all()
+
+    counts = np.zeros(len(edges) + 2, dtype=int)
+    minutes = np.zeros(len(edges) + 2, dtype=int)
+    for index, count, total in rows:
+        counts[index] = count
+        minutes[index] = total
+    return counts, minutes
+
+
+def build_deadline_proximity_distribution(frames, edges=DEADLINE_BUCKET_EDGES):
     now = datetime.now(timezone.utc)
-    
-    # Get incomplete assignments with due dates
-    results = db.session.query(
-        Assignment.assignment_id,
-        Assignment.title,
-        Assignment.due_at,
-        Assignment.estimated_minutes,
-        Class.class_name
-    ).join(
-        Class, Class.class_id == Assignment.class_id
-    ).filter(
-        Assignment.user_id == current_user.user_id,
-        Assignment.is_completed == False,
-        Assignment.due_at.isnot(None)
-    ).all()
-    
-    if not results:
-        return jsonify({"empty": True, "message": "No upcoming assignments with deadlines"})
-    
-    # Compute days until due and bucket
-    buckets = {
-        "Overdue": {"count": 0, "minutes": 0},
-        "0-2 days": {"count": 0, "minutes": 0},
-        "3-5 days": {"count": 0, "minutes": 0},
-        "6-10 days": {"count": 0, "minutes": 0},
-        "10+ days": {"count": 0, "minutes": 0}
-    }
-    
-    for r in results:
-        days_until = compute_days_until_due(r.due_at, now)
-        bucket = deadline_proximity_bucket(days_until)
-        
-        if bucket:
-            buckets[bucket]["count"] += 1
-            buckets[bucket]["minutes"] += r.estimated_minutes or 60  # Default 60 min
-    
-    # Prepare data in fixed order
-    bucket_order = ["Overdue", "0-2 days", "3-5 days", "6-10 days", "10+ days"]
-    
-    labels = bucket_order
-    counts = [buckets[b]["count"] for b in bucket_order]
-    minutes = [buckets[b]["minutes"] for b in bucket_order]
-    
-    return jsonify({
+
+    # Incomplete assignments with due dates
+    results = frames.open_assignments
+    results = results[results['due_at'].notna()]
+
+    bucket = deadline_bucket_array(compute_days_until_due_array(results['due_at'], now), edges)
+    estimated = results['estimated_minutes'].fillna(60).astype(int).to_numpy()  # Default 60 min
+
+    counts = np.bincount(bucket, minlength=len(edges) + 2)
+    minutes = np.bincount(bucket, weights=estimated, minlength=len(edges) + 2).astype(int)
+    return _deadline_proximity_result(edges, counts, minutes)
+
+
+def _deadline_proximity_result(edges, counts, minutes):
+    if not counts.any():
+        return {"empty": True, "message": "No upcoming assignments with deadlines"}
+
+    return {
         "empty": False,
-        "labels": labels,
-        "counts": counts,
-        "minutes": minutes
-    })
+        "labels": deadline_bucket_labels(edges),
+        "counts": counts.tolist(),
+        "minutes": minutes.tolist()
+    }
 
 
 # =================== GRAPH 2: Risk Composition Evolution ===================
 @charts.route("/dashboard/risk_composition_evolution")
 @login_required
+@analytics_cache.cached("risk_composition_evolution")
 def risk_composition_evolution():
     """
     Stacked area chart showing why risk is rising over time.
     Components: time_pressure, difficulty, overlap, history
+    Query params:
+      by_class=true (adds the same stacked series per class)
     """
-    
+    by_class = request.args.get('by_class', 'false').lower() == 'true'
+    return jsonify(build_risk_composition_evolution(
+        load_dashboard_frames(current_user.user_id), by_class=by_class
+    ))
+
+
+# Weights applied post-aggregation to preserve interpretability
+COMPOSITION_WEIGHTS = {
+    'time_pressure': 0.35,
+    'difficulty': 0.25,
+    'overlap': 0.20,
+    'history': 0.20
+}
+
+COMPOSITION_COLORS = {
+    'time_pressure': 'rgba(239, 68, 68, 0.7)',   # Red
+    'difficulty': 'rgba(245, 158, 11, 0.7)',     # Orange
+    'overlap': 'rgba(59, 130, 246, 0.7)',         # Blue
+    'history': 'rgba(139, 92, 246, 0.7)'          # Purple
+}
+
+COMPOSITION_LABELS = {
+    'time_pressure': 'Time Pressure',
+    'difficulty': 'Difficulty',
+    'overlap': 'Workload Overlap',
+    'history': 'Historical Risk'
+}
+
+COMPOSITION_STACK_ORDER = ['history', 'overlap', 'difficulty', 'time_pressure']  # Bottom to top
+
+
+def build_risk_composition_evolution(frames, by_class=False):
     now = datetime.now(timezone.utc)
-    
-    # Get all assignments (for historical context)
-    results = db.session.query(
-        Assignment.assignment_id,
-        Assignment.title,
-        Assignment.class_id,
-        Assignment.created_at,
-        Assignment.due_at,
-        Assignment.difficulty,
-        Assignment.estimated_minutes,
-        Assignment.is_completed,
-        Assignment.grade,
-        Class.class_name
-    ).join(
-        Class, Class.class_id == Assignment.class_id
-    ).filter(
-        Assignment.user_id == current_user.user_id
-    ).order_by(Assignment.created_at).all()
-    
-    if not results:
-        return jsonify({"empty": True, "message": "No assignments yet"})
-    
-    df = pd.DataFrame([{
-        'assignment_id': r.assignment_id,
-        'title': r.title,
-        'class_id': r.class_id,
-        'created_at': r.created_at,
-        'due_at': r.due_at,
-        'difficulty': r.difficulty or 3,  # Default medium
-        'estimated_minutes': r.estimated_minutes or 60,
-        'is_completed': r.is_completed,
-        'grade': float(r.grade) if r.grade else None
-    } for r in results])
-    
-    # Normalize timezone
-    df['created_at'] = pd.to_datetime(df['created_at'], utc=True)
-    df['due_at'] = pd.to_datetime(df['due_at'], utc=True)
-    
-    # Bucket by week (using created_at for temporal alignment)
-    df['week'] = df['created_at'].dt.tz_localize(None).dt.to_period('W').apply(lambda x: x.start_time)
-    
-    # Compute components per assignment
-    df['days_until_due'] = df['due_at'].apply(lambda x: compute_days_until_due(x, now))
-    df['time_pressure'] = df['days_until_due'].apply(lambda x: time_pressure_score(x, tau=7))
-    
-    # Difficulty (normalize)
-    df['difficulty_norm'] = min_max_normalize(df['difficulty'])
-    
-    # Overlap: count active assignments per day
-    # For simplicity, use weekly active count
-    weekly_active = []
-    for week in sorted(df['week'].unique()):
-        week_data = df[df['week'] == week]
-        active_count = len(week_data[week_data['is_completed'] == False])
-        weekly_active.append({'week': week, 'active_count': active_count})
-    
-    active_df = pd.DataFrame(weekly_active)
-    max_active = active_df['active_count'].max() if not active_df.empty else 1
-    
-    df = df.merge(active_df, on='week', how='left')
-    df['overlap'] = df['active_count'].apply(lambda x: compute_workload_overlap(x, max_active))
-    
-    # History: use rolling grade average (if available)
-    # Compute rolling average grade per week
-    graded = df[df['grade'].notna()].copy()
-    if not graded.empty:
-        weekly_grades = graded.groupby('week')['grade'].mean()
-        df = df.merge(
-            weekly_grades.to_frame('avg_grade').reset_index(),
-            on='week',
-            how='left'
-        )
-        df['history'] = df['avg_grade'].apply(lambda x: historical_risk(x))
-    else:
-        df['history'] = 0.0
-    
-    # Aggregate by week
-    weekly_risk = aggregate_weekly_risk_components(
-        df[['week', 'time_pressure', 'difficulty_norm', 'overlap', 'history']].rename(
-            columns={'difficulty_norm': 'difficulty'}
-        )
+
+    # All assignments (for historical context)
+    if frames.assignments.empty:
+        return {"empty": True, "message": "No assignments yet"}
+
+    df = frames.assignments.sort_values('created_at', kind='stable')
+
+    # Components per assignment, bucketed by week (created_at for temporal alignment)
+    days_until_due = compute_days_until_due_array(df['due_at'], now)
+    parts = pd.DataFrame({
+        'class_id': df['class_id'],
+        'class_name': df['class_name'],
+        'week': week_start(df['created_at']),
+        # Assignments without a due date carry no time pressure signal (NaN, left out of the mean)
+        'time_pressure': np.where(
+            np.isnan(days_until_due), np.nan, time_pressure_score_array(days_until_due, tau=7)
+        ),
+        'difficulty': min_max_normalize(df['difficulty'].fillna(3).astype(int)),  # Default medium
+        'is_active': ~df['is_completed'].astype(bool),
+        'grade': df['grade']
+    }, index=df.index)
+
+    # One pass: sums and counts per class/week; the overall series adds up the classes
+    class_weeks = parts.groupby(['class_id', 'class_name', 'week'], sort=True).agg(
+        count=('difficulty', 'size'),
+        due_count=('time_pressure', 'count'),
+        time_pressure=('time_pressure', 'sum'),
+        difficulty=('difficulty', 'sum'),
+        active_count=('is_active', 'sum'),
+        grade_sum=('grade', 'sum'),
+        grade_count=('grade', 'count')
     )
-    
-    if weekly_risk.empty:
-        return jsonify({"empty": True, "message": "Insufficient data"})
-    
-    weekly_risk = weekly_risk.sort_values('week')
-    
-    # Apply weights for stacking
-    weights = {
-        'time_pressure': 0.35,
-        'difficulty': 0.25,
-        'overlap': 0.20,
-        'history': 0.20
-    }
-    # Apply weights post-aggregation to preserve interpretability
-    for component, weight in weights.items():
-        if component in weekly_risk.columns:
-            weekly_risk[component] *= weight
 
+    if class_weeks.empty:
+        return {"empty": True, "message": "Insufficient data"}
 
-    
-    # Prepare datasets
-    weeks = [w.isoformat() for w in weekly_risk['week']]
-    
-    datasets = []
-    colors = {
-        'time_pressure': 'rgba(239, 68, 68, 0.7)',   # Red
-        'difficulty': 'rgba(245, 158, 11, 0.7)',     # Orange
-        'overlap': 'rgba(59, 130, 246, 0.7)',         # Blue
-        'history': 'rgba(139, 92, 246, 0.7)'          # Purple
-    }
-    
-    labels = {
-        'time_pressure': 'Time Pressure',
-        'difficulty': 'Difficulty',
-        'overlap': 'Workload Overlap',
-        'history': 'Historical Risk'
+    weekly = _composition_components(class_weeks.groupby(level='week', sort=True).sum())
+
+    result = {
+        "empty": False,
+        **_composition_series(weekly)
     }
-    
-    for component in ['history', 'overlap', 'difficulty', 'time_pressure']:  # Bottom to top
-        if component in weekly_risk.columns:
-            datasets.append({
-                'label': labels[component],
-                'data': [
-                    {'x': weeks[i], 'y': round(weekly_risk[component].iloc[i], 3)}
-                    for i in range(len(weeks))
-                ],
-                'backgroundColor': colors[component],
-                'borderColor': colors[component].replace('0.7', '1.0'),
+
+    if by_class:
+        result["by_class"] = [
+            {
+                "class_id": class_id,
+                "class_name": class_name,
+                **_composition_series(_composition_components(group.droplevel(['class_id', 'class_name'])))
+            }
+            for (class_id, class_name), group in class_weeks.groupby(level=['class_id', 'class_name'], sort=True)
+        ]
+
+    return result
+
+
+def _composition_components(totals):
+    """
+    Weighted weekly components from per-week sums/counts (indexed by week).
+    Overlap is the week's active count relative to the busiest week of the series.
+    """
+    components = pd.DataFrame(index=totals.index)
+    components['time_pressure'] = (totals['time_pressure'] / totals['due_count']).fillna(0.0)
+    components['difficulty'] = totals['difficulty'] / totals['count']
+
+    max_active = totals['active_count'].max()
+    components['overlap'] = (
+        np.minimum(1.0, totals['active_count'] / max_active) if max_active > 0 else 0.0
+    )
+
+    # Weeks without grades have no history risk
+    avg_grade = totals['grade_sum'].where(totals['grade_count'] > 0) / totals['grade_count']
+    components['history'] = historical_risk_array(avg_grade)
+
+    for component, weight in COMPOSITION_WEIGHTS.items():
+        components[component] *= weight
+
+    return components
+
+
+def _composition_series(components):
+    """Stacked datasets as column arrays sharing one list of weeks."""
+    return {
+        "weeks": [w.isoformat() for w in components.index],
+        "datasets": [
+            {
+                'label': COMPOSITION_LABELS[component],
+                'data': [round(v, 3) for v in components[component].tolist()],
+                'backgroundColor': COMPOSITION_COLORS[component],
+                'borderColor': COMPOSITION_COLORS[component].replace('0.7', '1.0'),
                 'borderWidth': 1
-            })
-    
-    return jsonify({
-        "empty": False,
-        "datasets": datasets
-    })
+            }
+            for component in COMPOSITION_STACK_ORDER
+        ]
+    }
 
 
 # =================== GRAPH 3: Assignment Risk Breakdown ===================
 @charts.route("/dashboard/assignment_risk_breakdown")
 @login_required
+@analytics_cache.cached("assignment_risk_breakdown")
 def assignment_risk_breakdown():
     """
     Horizontal stacked bars showing risk breakdown per assignment.
     Allows filtering by top N riskiest or latest N.
     """
-    
     mode = request.args.get('mode', 'riskiest')  # 'riskiest' or 'latest'
-    limit = int(request.args.get('limit', 10))
-    
+    limit = request.args.get('limit', 10, type=int)
+
+    return jsonify(build_assignment_risk_breakdown(
+        load_dashboard_frames(current_user.user_id), mode=mode, limit=limit
+    ))
+
+
+def build_assignment_risk_breakdown(frames, mode='riskiest', limit=10):
     now = datetime.now(timezone.utc)
-    
-    # Get incomplete assignments
-    results = db.session.query(
-        Assignment.assignment_id,
-        Assignment.title,
-        Assignment.class_id,
-        Assignment.created_at,
-        Assignment.due_at,
-        Assignment.difficulty,
-        Assignment.estimated_minutes,
-        Assignment.grade,
-        Class.class_name,
-        Class.color
-    ).join(
-        Class, Class.class_id == Assignment.class_id
-    ).filter(
-        Assignment.user_id == current_user.user_id,
-        Assignment.is_completed == False
-    ).all()
-    
-    if not results:
-        return jsonify({"empty": True, "message": "No incomplete assignments"})
-    
-    df = pd.DataFrame([{
-        'assignment_id': r.assignment_id,
-        'title': r.title,
-        'class_name': r.class_name,
-        'color': r.color,
-        'created_at': r.created_at,
-        'due_at': r.due_at,
-        'difficulty': r.difficulty or 3,
-        'estimated_minutes': r.estimated_minutes or 60,
-        'grade': float(r.grade) if r.grade else None
-    } for r in results])
+
+    # Incomplete assignments
+    if frames.open_assignments.empty:
+        return {"empty": True, "message": "No incomplete assignments"}
+
+    df = frames.open_assignments[[
+        'assignment_id', 'title', 'class_name', 'color', 'created_at',
+        'due_at', 'difficulty', 'estimated_minutes', 'grade'
+    ]].copy()
+    df['difficulty'] = df['difficulty'].fillna(3).astype(int)
+    df['estimated_minutes'] = df['estimated_minutes'].fillna(60).astype(int)
     
     # Compute risk components
-    df['days_until_due'] = df['due_at'].apply(lambda x: compute_days_until_due(x, now))
-    df['time_pressure'] = df['days_until_due'].apply(lambda x: time_pressure_score(x, tau=7))
-    df['deadline_proximity'] = df['days_until_due'].apply(lambda x: urgency_score(x, tau=7))
+    df['days_until_due'] = compute_days_until_due_array(df['due_at'], now)
+    df['time_pressure'] = time_pressure_score_array(df['days_until_due'], tau=7)
+    df['deadline_proximity'] = urgency_score_array(df['days_until_due'], tau=7)
     df['difficulty_norm'] = min_max_normalize(df['difficulty'].astype(float))
 
     
@@ -293,29 +301,18 @@ def assignment_risk_breakdown():
     df['overlap'] = df['overlap'].clip(0, 1)
 
     
-    # History (use previous grades if available)
-    # For simplicity, use global average or 0
-    if df['grade'].notna().any():
-        df['history'] = df['grade'].apply(lambda g: historical_risk(g) if pd.notna(g) else 0.0)
-    else:
-        df['history'] = 0.0
+    # History (use previous grades if available, else 0)
+    df['history'] = historical_risk_array(df['grade'])
     
     # Compute total risk
-    df['risk_components'] = df.apply(lambda row: {
-        'time_pressure': row['time_pressure'],
-        'deadline_proximity': row['deadline_proximity'],
-        'difficulty': row['difficulty_norm'],
-        'overlap': row['overlap'],
-        'history': row['history']
-    }, axis=1)
-    
-    df['risk_result'] = df['risk_components'].apply(compute_assignment_risk)
-    df['total_risk'] = df['risk_result'].apply(lambda x: x['total_risk'])
-    df['breakdown'] = df['risk_result'].apply(lambda x: x['breakdown'])
+    breakdown, df['total_risk'] = compute_assignment_risk_array(
+        df[['time_pressure', 'deadline_proximity', 'difficulty_norm', 'overlap', 'history']]
+        .rename(columns={'difficulty_norm': 'difficulty'})
+    )
     
     # Sort and filter
     if mode == 'riskiest':
-        df = df.sort_values('total_risk', ascending=False).head(limit)
+        df = df.sort_values('total_risk', ascending=False, kind='stable').head(limit)
     else:  # latest
         df = df.sort_values('created_at', ascending=False).head(limit)
     
@@ -345,67 +342,49 @@ def assignment_risk_breakdown():
     for key in component_keys:
         datasets.append({
             'label': component_labels[key],
-            'data': [row['breakdown'][key] for _, row in df.iterrows()],
+            'data': breakdown.loc[df.index, key].tolist(),
             'backgroundColor': component_colors[key]
         })
     
-    return jsonify({
+    return {
         "empty": False,
         "labels": labels,
         "datasets": datasets,
         "assignment_colors": colors_list
-    })
+    }
 
 
 # =================== GRAPH 4: Urgency vs Risk Matrix ===================
 @charts.route("/dashboard/urgency_risk_matrix")
 @login_required
+@analytics_cache.cached("urgency_risk_matrix")
 def urgency_risk_matrix():
     """
     Scatter plot: X = urgency, Y = risk, bubble size = workload
     """
-    
+    return jsonify(build_urgency_risk_matrix(load_dashboard_frames(current_user.user_id)))
+
+
+def build_urgency_risk_matrix(frames):
     now = datetime.now(timezone.utc)
-    
-    # Get incomplete assignments
-    results = db.session.query(
-        Assignment.assignment_id,
-        Assignment.title,
-        Assignment.class_id,
-        Assignment.created_at,
-        Assignment.due_at,
-        Assignment.difficulty,
-        Assignment.estimated_minutes,
-        Assignment.grade,
-        Class.class_name,
-        Class.color
-    ).join(
-        Class, Class.class_id == Assignment.class_id
-    ).filter(
-        Assignment.user_id == current_user.user_id,
-        Assignment.is_completed == False
-    ).all()
-    
-    if not results:
-        return jsonify({"empty": True, "message": "No incomplete assignments"})
-    
-    df = pd.DataFrame([{
-        'assignment_id': r.assignment_id,
-        'title': r.title,
-        'class_name': r.class_name,
-        'color': r.color,
-        'due_at': r.due_at,
-        'difficulty': r.difficulty or 3,
-        'estimated_minutes': r.estimated_minutes or 60,
-        'grade': float(r.grade) if r.grade else None
-    } for r in results])
+
+    # Incomplete assignments
+    if frames.open_assignments.empty:
+        return {"empty": True, "message": "No incomplete assignments"}
+
+    df = frames.open_assignments[[
+        'assignment_id', 'title', 'class_name', 'color',
+        'due_at', 'difficulty', 'estimated_minutes', 'grade'
+    ]].copy()
+    df['difficulty'] = df['difficulty'].fillna(3).astype(int)
+    df['estimated_minutes'] = df['estimated_minutes'].fillna(60).astype(int)
     
     # Compute urgency and risk
-    df['days_until_due'] = df['due_at'].apply(lambda x: compute_days_until_due(x, now))
-    df['urgency'] = df['days_until_due'].apply(lambda x: urgency_score(x, tau=7))
+    df['days_until_due'] = compute_days_until_due_array(df['due_at'], now)
+    df['urgency'] = urgency_score_array(df['days_until_due'], tau=7)
     
     # Risk components
-    df['time_pressure'] = df['days_until_due'].apply(lambda x: time_pressure_score(x, tau=7))
+    df['time_pressure'] = time_pressure_score_array(df['days_until_due'], tau=7)
     df['deadline_proximity'] = df['urgency']
     df['difficulty_norm'] = min_max_normalize(df['difficulty'])
     
@@ -419,34 +398,37 @@ def urgency_risk_matrix():
     else:
         df['history'] = 0.0
     
-    df['risk_components'] = df.apply(lambda row: {
-        'time_pressure': row['time_pressure'],
-        'deadline_proximity': row['deadline_proximity'],
-        'difficulty': row['difficulty_norm'],
-        'overlap': row['overlap'],
-        'history': row['history']
-    }, axis=1)
-    
-    df['risk_result'] = df['risk_components'].apply(compute_assignment_risk)
-    df['total_risk'] = df['risk_result'].apply(lambda x: x['total_risk'])
+    _, df['total_risk'] = compute_assignment_risk_array(
+        df[['time_pressure', 'deadline_proximity', 'difficulty_norm', 'overlap', 'history']]
+        .rename(columns={'difficulty_norm': 'difficulty'})
+    )
     
     # Bubble size (remaining work)
-    df['bubble_size'] = df['estimated_minutes'].apply(lambda x: max(5, min(20, x / 10)))
+    df['bubble_size'] = (df['estimated_minutes'] / 10).clip(5, 20)
     
     # Prepare scatter data
-    data = []
-    for _, row in df.iterrows():
-        data.append({
-            'x': round(row['urgency'], 3),
-            'y': round(row['total_risk'], 3),
-            'r': row['bubble_size'],
-            'label': row['title'],
-            'class_name': row['class_name'],
-            'backgroundColor': row['color'],
-            'estimated_minutes': row['estimated_minutes']
-        })
+    data = [
+        {
+            'x': x,
+            'y': y,
+            'r': r,
+            'label': title,
+            'class_name': class_name,
+            'backgroundColor': color,
+            'estimated_minutes': minutes
+        }
+        for x, y, r, title, class_name, color, minutes in zip(
+            df['urgency'].round(3).tolist(),
+            df['total_risk'].tolist(),
+            df['bubble_size'].tolist(),
+            df['title'].tolist(),
+            df['class_name'].tolist(),
+            df['color'].tolist(),
+            df['estimated_minutes'].tolist()
+        )
+    ]
     
-    return jsonify({
+    return {
         "empty": False,
         "data": data
-    })
\ No newline at end of file
+    }
\ No newline at end of file
@@ -1,7 +1,7 @@
 from flask import Blueprint, render_template, request, redirect, url_for, current_app, jsonify
 from flask_login import login_required, current_user
 from app.extensions import db
-from app.models.course import Class
+from app.models.course import Class, load_class_stats
 from app.models.assignment import Assignment
 from sqlalchemy import and_
 from datetime import datetime, timezone
@@ -11,7 +11,7 @@ classes = Blueprint("classes", __name__)
 @classes.route("/classes")
 @login_required
 def list_classes():
-    classes = Class.query.filter_by(user_id=current_user.user_id).all()
+    classes = load_class_stats(Class.query.filter_by(user_id=current_user.user_id).all())
     return render_template("classes.html", classes=classes, user=current_user.user_id)
 
 
@@ -1,10 +1,15 @@
-from flask import Blueprint, request, redirect, url_for, render_template
+import json
+import time
+
+from flask import Blueprint, request, redirect, url_for, render_template, current_app, Response, stream_with_context
 from flask_login import login_required, current_user
 from app.extensions import db
 from app.models.study_session import StudySession
 from app.models.course import Class
 from app.models.assignment import Assignment
+from app.services.study_session_services import session_state_payload, is_active_session_conflict
 from datetime import datetime, timezone
+from sqlalchemy.exc import IntegrityError
 study = Blueprint("study", __name__)
 
 @study.route("/study")
@@ -16,14 +21,6 @@ def study_sessions():
 @login_required
 def add_session():
     if request.method == "POST":
-        existing_active = StudySession.query.filter_by(
-            user_id=current_user.user_id,
-            is_active=True
-        ).first()
-
-        if existing_active:
-            return "You already have an active study session", 400
-  
         class_id = request.form.get("class_id")
         assignment_id = request.form.get("assignment_id") or None
         session_type = request.form.get("session_type")
@@ -70,7 +67,15 @@ def add_session():
         )
 
         db.session.add(session)
-        db.session.commit()
+
+        # One active session per user is enforced by the one_active_session_per_user index
+        try:
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            if not is_active_session_conflict(e):
+                raise
+            return "You already have an active study session", 400
 
         # Redirect back to home page
         return redirect(url_for("main.home"))
@@ -154,6 +159,80 @@ def active_session():
     }
 
 
+@study.route("/study/state", methods=["GET"])
+@login_required
+def session_state():
+    """Current active / due / collision state (same data as the stream)."""
+    return session_state_payload(current_user.user_id)
+
+
+@study.route("/study/state/stream", methods=["GET"])
+@login_required
+def session_state_stream():
+    """
+    Server-sent events with the session state: once on connect, then again
+    whenever it changes (a StudySession write for this user, or a scheduled
+    session becoming due). Replaces polling; the stream closes after
+    SESSION_EVENTS_STREAM_SECONDS and EventSource reconnects on its own.
+
+    Each open stream holds a worker thread while it waits, so this needs a
+    threaded or async server (the dev server is threaded; e.g. gunicorn
+    --worker-class gthread or gevent in production). Only pages that set
+    live_session_state open it.
+    """
+    user_id = current_user.user_id
+    broker = current_app.extensions["session_events"]
+    keepalive = current_app.config.get("SESSION_EVENTS_KEEPALIVE_SECONDS", 25)
+    lifetime = current_app.config.get("SESSION_EVENTS_STREAM_SECONDS", 300)
+
+    def stream():
+        subscription = broker.subscribe(user_id)
+        deadline = time.monotonic() + lifetime
+
+        try:
+            payload = _fresh_state_payload(user_id)
+            yield f"event: session_state\ndata: {json.dumps(payload)}\n\n"
+
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+
+                timeout = min(keepalive, remaining)
+                next_due = datetime.fromisoformat(payload["next_due_at"]) if payload["next_due_at"] else None
+                if next_due is not None:
+                    until_due = (next_due - datetime.now(timezone.utc)).total_seconds()
+                    timeout = min(timeout, max(until_due, 0) + 1)
+
+                changed = subscription.wait(timeout)
+                due_reached = next_due is not None and datetime.now(timezone.utc) >= next_due
+
+                # Only a write for this user or a session becoming due can change the state
+                if changed or due_reached:
+                    latest = _fresh_state_payload(user_id)
+                    if latest != payload:
+                        payload = latest
+                        yield f"event: session_state\ndata: {json.dumps(payload)}\n\n"
+                        continue
+
+                yield ": keepalive\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _fresh_state_payload(user_id):
+    payload = session_state_payload(user_id)
+    # Don't hold a connection (or a stale snapshot) while the stream waits
+    db.session.close()
+    return payload
+
+
 @study.route("/study/<int:session_id>/cancel", methods=["POST"])
 @login_required
 def cancel_session(session_id):
@@ -186,23 +265,20 @@ def start_scheduled_session(session_id):
         StudySession.cancelled_at.is_(None)
     ).first_or_404()
 
-    # 2️⃣ Safety: ensure no other active session
-    existing_active = StudySession.query.filter(
-        StudySession.user_id == current_user.user_id,
-        StudySession.is_active == True
-    ).first()
-
-    if existing_active:
-        return {"success": False, "error": "Active session already exists"}, 400
-
     if session.expected_started_at and session.expected_started_at > now:
         return {"success": False, "error": "Session is not due yet"}, 400
 
-    # 3️⃣ Start the session
+    # 2️⃣ Start the session (the one_active_session_per_user index rejects a second active one)
     session.started_at = now
     session.is_active = True
 
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if not is_active_session_conflict(e):
+            raise
+        return {"success": False, "error": "Active session already exists"}, 400
 
     return {"success": True}
 
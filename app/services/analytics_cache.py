@@ -0,0 +1,194 @@
+# app/services/analytics_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, request
+from flask_login import current_user
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+# Tables whose writes change what the charts show
+TRACKED_TABLES = {
+    "classes",
+    "assignments",
+    "study_sessions",
+    "user_class_type_colors",
+    "user_assignment_type_colors",
+}
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 300
+
+_PENDING_KEY = "analytics_cache_dirty_users"
+
+
+class AnalyticsCache:
+    """
+    Per-user LRU cache of computed chart responses.
+
+    Entries are keyed by (user_id, chart name, query params) and tagged with
+    the user's data version. The version is bumped after any commit that
+    writes a tracked row for that user, which drops the user's entries.
+    Entries also expire after ttl_seconds, since some charts depend on "now".
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.enabled = True
+
+        self._entries = OrderedDict()  # key -> (version, stored_at, body, mimetype)
+        self._user_keys = {}
+        self._versions = {}
+        self._lock = threading.Lock()
+        self._listening = False
+
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def init_app(self, app):
+        self.max_bytes = app.config.get("ANALYTICS_CACHE_MAX_BYTES", self.max_bytes)
+        self.ttl_seconds = app.config.get("ANALYTICS_CACHE_TTL_SECONDS", self.ttl_seconds)
+        self.enabled = app.config.get("ANALYTICS_CACHE_ENABLED", True)
+
+        if not self._listening:
+            event.listen(Session, "after_flush", _collect_dirty_users)
+            event.listen(Session, "after_commit", self._after_commit)
+            event.listen(Session, "after_rollback", _discard_dirty_users)
+            self._listening = True
+
+    # =================== VERSIONS ===================
+
+    def version(self, user_id):
+        return self._versions.get(user_id, 0)
+
+    def bump(self, user_id):
+        """Invalidate everything cached for a user."""
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            for key in self._user_keys.pop(user_id, set()):
+                self._drop(key)
+            self.invalidations += 1
+
+    def _after_commit(self, session):
+        for user_id in session.info.pop(_PENDING_KEY, set()):
+            self.bump(user_id)
+
+    # =================== ENTRIES ===================
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            entry_version, stored_at, body, mimetype = entry
+            if entry_version != version or time.monotonic() - stored_at > self.ttl_seconds:
+                self._drop(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body, mimetype
+
+    def put(self, key, version, body, mimetype):
+        size = len(body)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            # Data changed while the response was being computed
+            if version != self._versions.get(key[0], 0):
+                return
+
+            self._drop(key)
+            self._entries[key] = (version, time.monotonic(), body, mimetype)
+            self._user_keys.setdefault(key[0], set()).add(key)
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.current_bytes -= len(entry[2])
+        user_keys = self._user_keys.get(key[0])
+        if user_keys is not None:
+            user_keys.discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    # =================== ROUTE DECORATOR ===================
+
+    def cached(self, name):
+        """
+        Cache a chart view's 200 response per user and query string.
+        Apply below @login_required.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapped(*args, **kwargs):
+                if not self.enabled:
+                    return view(*args, **kwargs)
+
+                user_id = current_user.user_id
+                key = (user_id, name, tuple(sorted(request.args.items(multi=True))))
+                version = self.version(user_id)
+
+                hit = self.get(key, version)
+                if hit is not None:
+                    body, mimetype = hit
+                    return current_app.response_class(body, mimetype=mimetype)
+
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code == 200:
+                    self.put(key, version, response.get_data(), response.mimetype)
+                return response
+
+            return wrapped
+        return decorator
+
+
+# =================== SESSION EVENTS ===================
+
+def _collect_dirty_users(session, flush_context):
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if getattr(obj, "__tablename__", None) in TRACKED_TABLES:
+            user_id = getattr(obj, "user_id", None)
+            if user_id is not None:
+                pending.add(user_id)
+
+
+def _discard_dirty_users(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,239 @@
+# app/services/assignment_import.py
+
+import csv
+import io
+import json
+import math
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from dateutil import parser
+from sqlalchemy import insert
+
+from app.extensions import db, analytics_cache
+from app.models.assignment import Assignment
+from app.models.course import Class
+from app.services.weekly_rollups import refresh_rollup, week_of
+
+
+MAX_IMPORT_ROWS = 10_000
+
+ASSIGNMENT_TYPES = {
+    "homework", "quiz", "project", "writing", "test",
+    "exam", "lab_report", "presentation", "reading", "other"
+}
+
+TRUE_VALUES = {"true", "1", "yes", "y", "x"}
+FALSE_VALUES = {"false", "0", "no", "n", ""}
+
+# Assignment's @validates hooks; they read is_graded / is_completed / finished_at off the row
+MODEL_VALIDATORS = [
+    ("finished_at", Assignment.validate_finished_at),
+    ("grade", Assignment.validate_grade),
+    ("expected_grade", Assignment.validate_expected_grade),
+]
+
+class InvalidImport(ValueError):
+    """The upload itself cannot be read (as opposed to errors in single rows)."""
+
+
+# =================== PARSING ===================
+
+def read_import_rows(file=None, payload=None):
+    """
+    Rows from an uploaded CSV/JSON file or a JSON body
+    (a list of objects, or {"assignments": [...]}).
+    """
+    if file is not None:
+        content = _decode(file.read())
+        if file.filename.lower().endswith(".json") or file.mimetype == "application/json":
+            payload = _load_json(content)
+        else:
+            return list(csv.DictReader(io.StringIO(content)))
+
+    if isinstance(payload, dict):
+        payload = payload.get("assignments")
+    if not isinstance(payload, list) or not all(isinstance(row, dict) for row in payload):
+        raise InvalidImport("Expected a CSV file or a JSON list of assignments")
+    return payload
+
+
+def _decode(raw):
+    try:
+        return raw.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise InvalidImport("File is not UTF-8 encoded")
+
+
+def _load_json(content):
+    try:
+        return json.loads(content)
+    except ValueError:
+        raise InvalidImport("File is not valid JSON")
+
+
+def _text(value):
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+def _optional(value, convert):
+    text = _text(value)
+    return convert(text) if text else None
+
+
+def _flag(value):
+    if isinstance(value, bool):
+        return value
+    text = _text(value).lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f"not a yes/no value: {value!r}")
+
+
+def _number(value):
+    # float() accepts "nan" and "inf", which slip past range checks
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f"not a finite number: {value!r}")
+    return number
+
+
+def _date(value):
+    # Same as the add-assignment form: due dates are days
+    return datetime.fromisoformat(value).date()
+
+
+def _in_range(name, value, low, high):
+    if value is not None and not low <= value <= high:
+        raise ValueError(f"{name} must be between {low} and {high}")
+    return value
+
+
+# =================== VALIDATION ===================
+
+def validate_row(row, user_id, classes_by_id, classes_by_code, now):
+    """
+    Column values for one import row, or raise ValueError with every problem found.
+
+    Rows run through the same Assignment validators as single edits, plus the
+    table's CHECK constraints that would otherwise only fail at insert time.
+    """
+    errors = []
+    values = {"user_id": user_id}
+
+    def field(name, parse):
+        try:
+            values[name] = parse(row.get(name))
+        except (ValueError, TypeError, OverflowError) as e:
+            errors.append(f"{name}: {e}")
+            values[name] = None
+
+    values["title"] = _text(row.get("title") or row.get("assignment_title"))
+    if not values["title"]:
+        errors.append("title is required")
+
+    values["assignment_type"] = _text(row.get("assignment_type")).lower()
+    if values["assignment_type"] not in ASSIGNMENT_TYPES:
+        errors.append(f"assignment_type must be one of {', '.join(sorted(ASSIGNMENT_TYPES))}")
+
+    class_id, class_code = _text(row.get("class_id")), _text(row.get("class_code"))
+    course = classes_by_id.get(class_id) if class_id else classes_by_code.get(class_code)
+    if course is None:
+        errors.append("class_id or class_code must name one of your classes")
+    values["class_id"] = course.class_id if course is not None else None
+
+    field("due_at", lambda v: _optional(v, _date))
+    field("estimated_minutes", lambda v: _in_range("estimated_minutes", _optional(v, int), 1, 10**6))
+    field("difficulty", lambda v: _in_range("difficulty", _optional(v, int), 1, 10))
+    field("pass_grade", lambda v: _in_range("pass_grade", _optional(v, _number), 0, 100))
+    field("is_graded", _flag)
+    field("ponderation", lambda v: _in_range("ponderation", _optional(v, int), 1, 5))
+    field("is_completed", _flag)
+    field("finished_at", lambda v: _optional(v, parser.isoparse))
+    field("grade", lambda v: _optional(v, _number))
+    field("expected_grade", lambda v: _optional(v, _number))
+
+    if values["ponderation"] is not None and not values["is_graded"]:
+        errors.append("ponderation is only allowed on graded assignments")
+    if values["is_completed"] and values["finished_at"] is None:
+        errors.append("finished_at is required for completed assignments")
+
+    finished_at = values["finished_at"]
+    if finished_at is not None and finished_at.tzinfo is None:
+        values["finished_at"] = finished_at = finished_at.replace(tzinfo=timezone.utc)
+
+    # finished_at >= created_at: completed work from the past counts as created when it finished
+    values["created_at"] = min(now, finished_at) if finished_at is not None else now
+
+    if not errors:
+        # Run the model's @validates hooks against the row without building an ORM object
+        row_state = SimpleNamespace(**values)
+        for name, validator in MODEL_VALIDATORS:
+            try:
+                validator(row_state, name, values[name])
+            except ValueError as e:
+                errors.append(str(e))
+
+    if errors:
+        raise ValueError(errors)
+    return values
+
+
+# =================== IMPORT ===================
+
+def import_assignments(user_id, rows):
+    """
+    Validate every row, then insert them all in one transaction with a single
+    executemany. Nothing is inserted if any row is invalid.
+
+    Returns a dict with imported, errors ([{"row": n, "errors": [...]}],
+    rows numbered from 1), elapsed_ms and rows_per_second.
+    """
+    if len(rows) > MAX_IMPORT_ROWS:
+        raise InvalidImport(f"At most {MAX_IMPORT_ROWS} assignments per import")
+
+    started = time.perf_counter()
+    now = datetime.now(timezone.utc)
+
+    classes = Class.query.filter_by(user_id=user_id).all()
+    classes_by_id = {str(c.class_id): c for c in classes}
+    classes_by_code = {c.class_code: c for c in classes}
+
+    records, errors = [], []
+    for number, row in enumerate(rows, start=1):
+        try:
+            records.append(validate_row(row, user_id, classes_by_id, classes_by_code, now))
+        except ValueError as e:
+            errors.append({"row": number, "errors": e.args[0]})
+
+    if errors or not records:
+        return _result(0, errors, started)
+
+    db.session.execute(insert(Assignment.__table__), records)
+
+    # Bulk inserts skip the flush events; refresh the affected weekly rollups here
+    for user, class_id, week in sorted({
+        (r["user_id"], r["class_id"], week_of(r["finished_at"]))
+        for r in records if r["finished_at"] is not None
+    }):
+        refresh_rollup(db.session, user, class_id, week)
+
+    db.session.commit()
+    analytics_cache.bump(user_id)
+
+    return _result(len(records), errors, started)
+
+
+def _result(imported, errors, started):
+    elapsed = time.perf_counter() - started
+    return {
+        "imported": imported,
+        "errors": errors,
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "rows_per_second": round(imported / elapsed) if imported and elapsed > 0 else 0
+    }
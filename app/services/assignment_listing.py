@@ -0,0 +1,273 @@
+# app/services/assignment_listing.py
+
+import base64
+import binascii
+import json
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import and_, case, func, or_, select
+
+from app.extensions import db
+from app.models.assignment import Assignment, study_totals_subquery
+from app.models.course import Class
+from app.models.study_session import StudySession
+from app.models.user import AssignmentViewPreferences
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+FILTER_CHOICES = {
+    "due_status_filter": ("all", "overdue", "not_due"),
+    "completion_filter": ("all", "completed", "uncompleted"),
+    "graded_filter": ("all", "graded", "ungraded"),
+    "created_filter": ("all", "last_7_days", "last_30_days"),
+}
+
+CREATED_WINDOW_DAYS = {"last_7_days": 7, "last_30_days": 30}
+
+SortKey = namedtuple("SortKey", ["expression", "descending", "nulls_last"])
+
+# Mirrors sortRows() in assignments_selector.js: missing numbers sort as -Infinity,
+# missing due dates always go last. nulls_last is None for columns that are never null.
+SORT_KEYS = {
+    "name_asc": SortKey(func.lower(Assignment.title, type_=Assignment.title.type), False, None),
+    "name_desc": SortKey(func.lower(Assignment.title, type_=Assignment.title.type), True, None),
+    "difficulty_high_low": SortKey(Assignment.difficulty, True, True),
+    "difficulty_low_high": SortKey(Assignment.difficulty, False, False),
+    "grade_high_low": SortKey(Assignment.grade, True, True),
+    "grade_low_high": SortKey(Assignment.grade, False, False),
+    "due_date_soonest": SortKey(Assignment.due_at, False, True),
+    "due_date_latest": SortKey(Assignment.due_at, True, True),
+    "created_newest": SortKey(Assignment.created_at, True, True),
+    "created_oldest": SortKey(Assignment.created_at, False, False),
+    "ponderation_high_low": SortKey(Assignment.ponderation, True, True),
+    "ponderation_low_high": SortKey(Assignment.ponderation, False, False),
+    "estimated_minutes_high_low": SortKey(Assignment.estimated_minutes, True, True),
+    "estimated_minutes_low_high": SortKey(Assignment.estimated_minutes, False, False),
+}
+
+
+class InvalidListingRequest(ValueError):
+    """A filter, sort or cursor value the listing does not understand."""
+
+
+# =================== PREFERENCES ===================
+
+def resolve_listing_options(user_id, overrides):
+    """
+    Filters and sort for the listing: the user's saved AssignmentViewPreferences,
+    with any of the same keys in `overrides` (e.g. request.args) taking precedence.
+    """
+    pref = AssignmentViewPreferences.query.filter_by(user_id=user_id).first()
+
+    options = {key: getattr(pref, key) if pref else "all" for key in FILTER_CHOICES}
+    options["sort_by"] = pref.sort_by if pref else "name_asc"
+    options["filter_assignment_types"] = _type_list(pref.filter_assignment_types if pref else None)
+
+    for key in (*FILTER_CHOICES, "sort_by"):
+        if overrides.get(key):
+            options[key] = overrides.get(key)
+    if "filter_assignment_types" in overrides:
+        options["filter_assignment_types"] = [
+            t for t in overrides.get("filter_assignment_types").split(",") if t
+        ]
+
+    for key, choices in FILTER_CHOICES.items():
+        if options[key] not in choices:
+            raise InvalidListingRequest(f"Unknown {key}: {options[key]}")
+    if options["sort_by"] not in SORT_KEYS:
+        raise InvalidListingRequest(f"Unknown sort_by: {options['sort_by']}")
+
+    return options
+
+
+def _type_list(saved):
+    """filter_assignment_types is saved as a list by the page, but defaults to {}."""
+    if isinstance(saved, dict):
+        return [t for t, enabled in saved.items() if enabled]
+    return list(saved or [])
+
+
+# =================== QUERY ===================
+
+def apply_listing_filters(query, options, now=None):
+    now = now or datetime.now(timezone.utc)
+
+    if options["due_status_filter"] == "overdue":
+        query = query.filter(Assignment.due_at.isnot(None), Assignment.due_at < now)
+    elif options["due_status_filter"] == "not_due":
+        query = query.filter(or_(Assignment.due_at.is_(None), Assignment.due_at >= now))
+
+    if options["completion_filter"] != "all":
+        query = query.filter(Assignment.is_completed == (options["completion_filter"] == "completed"))
+
+    if options["graded_filter"] != "all":
+        query = query.filter(Assignment.is_graded == (options["graded_filter"] == "graded"))
+
+    days = CREATED_WINDOW_DAYS.get(options["created_filter"])
+    if days:
+        query = query.filter(Assignment.created_at >= now - timedelta(days=days))
+
+    if options["filter_assignment_types"]:
+        types = [t.lower() for t in options["filter_assignment_types"]]
+        query = query.filter(func.lower(Assignment.assignment_type).in_(types))
+
+    return query
+
+
+def _sort_columns(sort_key):
+    """(null rank or None, value, tiebreak) expressions, all ordered the same way as the key."""
+    expression = sort_key.expression
+
+    null_rank = None
+    if sort_key.nulls_last is not None:
+        # Rank 0 sorts first; nulls take rank 1 when they go last
+        null_rank = case(
+            (expression.is_(None), _null_rank(sort_key, None)),
+            else_=_null_rank(sort_key, 0)
+        )
+
+    return null_rank, expression, Assignment.assignment_id
+
+
+def _null_rank(sort_key, value):
+    if sort_key.nulls_last is None:
+        return 0
+    return int(sort_key.nulls_last) if value is None else int(not sort_key.nulls_last)
+
+
+def _after_cursor(sort_key, cursor):
+    """WHERE clause selecting rows that sort strictly after the cursor row."""
+    null_rank, expression, tiebreak = _sort_columns(sort_key)
+    rank, value, last_id = cursor
+
+    def after(column, bound):
+        return column < bound if sort_key.descending else column > bound
+
+    if value is None:
+        within_rank = after(tiebreak, last_id)
+    else:
+        within_rank = or_(after(expression, value), and_(expression == value, after(tiebreak, last_id)))
+
+    if null_rank is None:
+        return within_rank
+    return or_(null_rank > rank, and_(null_rank == rank, within_rank))
+
+
+def _order_by(sort_key):
+    null_rank, expression, tiebreak = _sort_columns(sort_key)
+    columns = [expression.desc(), tiebreak.desc()] if sort_key.descending else [expression.asc(), tiebreak.asc()]
+    return ([null_rank.asc()] if null_rank is not None else []) + columns
+
+
+def list_assignment_page(user_id, options, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    One page of the user's assignments, filtered and sorted in SQL.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    sort_key = SORT_KEYS[options["sort_by"]]
+    limit = max(1, min(MAX_PAGE_SIZE, limit))
+
+    query = (
+        db.session.query(
+            Assignment,
+            Class.class_name,
+            Class.importance.label("class_importance"),
+            Class.class_type.label("class_type"),
+            Class.is_finished.label("class_is_finished"),
+            sort_key.expression.label("sort_value")
+        )
+        .join(Class, Assignment.class_id == Class.class_id)
+        .filter(Assignment.user_id == user_id)
+    )
+    query = apply_listing_filters(query, options)
+
+    if cursor is not None:
+        query = query.filter(_after_cursor(sort_key, decode_cursor(cursor, sort_key)))
+
+    # One extra row tells whether another page exists
+    results = query.order_by(*_order_by(sort_key)).limit(limit + 1).all()
+    has_more = len(results) > limit
+    results = results[:limit]
+
+    study_minutes = _study_minutes_by_assignment([a.assignment_id for a, *_ in results])
+    rows = [
+        _serialize_row(a, class_name, class_importance, class_type, class_is_finished,
+                       study_minutes.get(a.assignment_id, 0))
+        for a, class_name, class_importance, class_type, class_is_finished, _ in results
+    ]
+
+    next_cursor = None
+    if has_more:
+        last = results[-1]
+        next_cursor = encode_cursor(sort_key, last.sort_value, last[0].assignment_id)
+    return rows, next_cursor
+
+
+def _study_minutes_by_assignment(assignment_ids):
+    """Study minutes for the page's assignments in one grouped query."""
+    if not assignment_ids:
+        return {}
+    totals = study_totals_subquery(StudySession.assignment_id.in_(assignment_ids))
+    return dict(db.session.execute(select(totals.c.assignment_id, totals.c.study_minutes)).all())
+
+
+def _serialize_row(a, class_name, class_importance, class_type, class_is_finished, study_minutes):
+    def number(value):
+        return float(value) if value is not None else None
+
+    def timestamp(value):
+        return value.isoformat() if value is not None else None
+
+    return {
+        "assignment_id": a.assignment_id,
+        "title": a.title,
+        "assignment_type": a.assignment_type,
+        "due_at": timestamp(a.due_at),
+        "is_completed": a.is_completed,
+        "grade": number(a.grade),
+        "is_graded": a.is_graded,
+        "ponderation": a.ponderation,
+        "class_id": a.class_id,
+        "expected_grade": number(a.expected_grade),
+        "estimated_minutes": a.estimated_minutes,
+        "difficulty": a.difficulty,
+        "finished_at": timestamp(a.finished_at),
+        "pass_grade": number(a.pass_grade),
+        "class_name": class_name,
+        "class_importance": class_importance,
+        "class_type": class_type,
+        "class_is_finished": class_is_finished,
+        "created_at": timestamp(a.created_at),
+        "study_minutes": study_minutes
+    }
+
+
+# =================== CURSORS ===================
+
+def encode_cursor(sort_key, value, assignment_id):
+    """Opaque cursor holding the sort position of the last row on a page."""
+    rank = _null_rank(sort_key, value)
+
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    elif isinstance(value, Decimal):
+        value = str(value)
+
+    raw = json.dumps([rank, value, assignment_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, sort_key):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        rank, value, last_id = json.loads(raw)
+        if value is not None:
+            python_type = sort_key.expression.type.python_type
+            value = datetime.fromisoformat(value) if python_type is datetime else python_type(value)
+        return int(rank), value, int(last_id)
+    except (binascii.Error, ValueError, TypeError, InvalidOperation):
+        raise InvalidListingRequest("Invalid cursor")
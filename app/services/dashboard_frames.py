@@ -0,0 +1,153 @@
+# app/services/dashboard_frames.py
+
+from functools import cached_property
+
+import pandas as pd
+
+from app.extensions import db
+from app.models.course import Class
+from app.models.assignment import Assignment
+from app.models.study_session import StudySession
+from app.models.weekly_rollup import WeeklyClassRollup
+
+
+CLASS_COLUMNS = ['class_id', 'class_name', 'class_type', 'color']
+
+ASSIGNMENT_COLUMNS = [
+    'assignment_id', 'class_id', 'title', 'assignment_type',
+    'created_at', 'due_at', 'finished_at',
+    'difficulty', 'estimated_minutes', 'is_completed', 'grade'
+]
+
+SESSION_COLUMNS = ['session_id', 'class_id', 'assignment_id', 'started_at', 'duration_minutes']
+
+ROLLUP_COLUMNS = [
+    'class_id', 'week_start', 'study_minutes', 'session_count',
+    'grade_sum', 'grade_count', 'completed_count'
+]
+
+
+# =================== FRAME SET ===================
+
+class DashboardFrames:
+    """
+    In-memory snapshot of one user's classes, assignments and
+    completed study sessions, shared by every dashboard chart.
+
+    - classes: class_id, class_name, class_type, color
+    - assignments: one row per assignment, with the class columns joined in
+    - sessions: completed study sessions, with the class columns joined in
+    - weekly: weekly_class_rollups rows, with the class columns joined in
+
+    Classes are loaded up front; the other frames on first use (one query
+    each), so charts that only need weekly totals never read raw rows.
+    Datetime columns are UTC-aware, grades are floats (NaN when missing).
+    """
+
+    def __init__(self, user_id, classes):
+        self.user_id = user_id
+        self.classes = classes
+
+    @cached_property
+    def assignments(self):
+        return _load_assignments(self.user_id, self.classes)
+
+    @cached_property
+    def sessions(self):
+        return _load_sessions(self.user_id, self.classes)
+
+    @cached_property
+    def weekly(self):
+        return _load_weekly(self.user_id, self.classes)
+
+    @property
+    def graded(self):
+        """Assignments with a grade and a finished_at date."""
+        a = self.assignments
+        return a[a['grade'].notna() & a['finished_at'].notna()]
+
+    @property
+    def open_assignments(self):
+        """Assignments that are not completed yet."""
+        a = self.assignments
+        return a[~a['is_completed']]
+
+    def study_minutes_by_assignment(self):
+        """Total completed study minutes per assignment_id."""
+        s = self.sessions[self.sessions['assignment_id'].notna()]
+        return s.groupby('assignment_id')['duration_minutes'].sum()
+
+
+# =================== LOADER ===================
+
+def _frame(rows, columns):
+    return pd.DataFrame.from_records(rows, columns=columns)
+
+
+def load_dashboard_frames(user_id):
+    """
+    Frame set for one user. Each frame costs one query, on first use.
+    """
+    class_rows = db.session.query(
+        Class.class_id,
+        Class.class_name,
+        Class.class_type,
+        Class.color
+    ).filter(
+        Class.user_id == user_id
+    ).order_by(Class.class_id).all()
+
+    return DashboardFrames(user_id, _frame(class_rows, CLASS_COLUMNS))
+
+
+def _load_assignments(user_id, classes):
+    assignment_rows = db.session.query(
+        *[getattr(Assignment, col) for col in ASSIGNMENT_COLUMNS]
+    ).filter(
+        Assignment.user_id == user_id
+    ).order_by(Assignment.assignment_id).all()
+
+    assignments = _frame(assignment_rows, ASSIGNMENT_COLUMNS)
+    for col in ('created_at', 'due_at', 'finished_at'):
+        assignments[col] = pd.to_datetime(assignments[col], utc=True)
+    assignments['grade'] = assignments['grade'].astype(float)
+    assignments['difficulty'] = assignments['difficulty'].astype('Int64')
+    assignments['estimated_minutes'] = assignments['estimated_minutes'].astype('Int64')
+    assignments['is_completed'] = assignments['is_completed'].astype(bool)
+    return assignments.merge(classes, on='class_id', how='inner')
+
+
+def _load_sessions(user_id, classes):
+    session_rows = db.session.query(
+        *[getattr(StudySession, col) for col in SESSION_COLUMNS]
+    ).filter(
+        StudySession.user_id == user_id,
+        StudySession.is_completed == True,
+        StudySession.duration_minutes.isnot(None)
+    ).order_by(StudySession.session_id).all()
+
+    sessions = _frame(session_rows, SESSION_COLUMNS)
+    sessions['started_at'] = pd.to_datetime(sessions['started_at'], utc=True)
+    sessions['assignment_id'] = sessions['assignment_id'].astype('Int64')
+    sessions['duration_minutes'] = sessions['duration_minutes'].astype(int)
+    return sessions.merge(classes, on='class_id', how='inner')
+
+
+def _load_weekly(user_id, classes):
+    """
+    Weekly rollups; `week` is a naive Monday datetime like time_utils.week_start,
+    `grade_mean` is NaN for weeks without grades.
+    """
+    rollup_rows = db.session.query(
+        *[getattr(WeeklyClassRollup, col) for col in ROLLUP_COLUMNS]
+    ).filter(
+        WeeklyClassRollup.user_id == user_id
+    ).order_by(WeeklyClassRollup.class_id, WeeklyClassRollup.week_start).all()
+
+    weekly = _frame(rollup_rows, ROLLUP_COLUMNS)
+    weekly['week'] = pd.to_datetime(weekly['week_start']).astype('datetime64[us]')
+    weekly['grade_sum'] = weekly['grade_sum'].astype(float)
+    for col in ('study_minutes', 'session_count', 'grade_count', 'completed_count'):
+        weekly[col] = weekly[col].astype(int)
+    weekly['grade_mean'] = (weekly['grade_sum'] / weekly['grade_count']).where(weekly['grade_count'] > 0)
+    return weekly.drop(columns='week_start').merge(classes, on='class_id', how='inner')
@@ -32,6 +32,38 @@ def compute_effort_score(actual, expected):
 
 # =================== MARGINAL RETURNS ===================
 
+def trailing_mean(values, window=3):
+    """
+    Trailing moving average over a 1-D array.
+    The first window-1 points average what is available (min_periods=1).
+    """
+    values = np.asarray(values, dtype=float)
+    if values.size == 0:
+        return values
+
+    sums = np.convolve(values, np.ones(window), mode='full')[:values.size]
+    counts = np.minimum(np.arange(1, values.size + 1), window)
+    return sums / counts
+
+
+def marginal_returns_arrays(minutes, grades, window=3):
+    """
+    Cumulative effort vs smoothed outcome.
+
+    minutes, grades: arrays aligned per assignment, already sorted by finished_at.
+
+    Returns (effort, outcome) arrays. Outcome is left unsmoothed when there
+    are fewer points than the window.
+    """
+    effort = np.cumsum(np.asarray(minutes, dtype=float))
+    outcome = np.asarray(grades, dtype=float)
+
+    if outcome.size >= window:
+        outcome = np.round(trailing_mean(outcome, window), 1)
+
+    return effort, outcome
+
+
 def cumulative_effort_outcome(assignments):
     """
     Compute cumulative effort vs outcome points.
@@ -54,18 +86,14 @@ def cumulative_effort_outcome(assignments):
         ],
         key=lambda x: x['finished_at']
     )
-    
-    effort = 0
-    data = []
-    
-    for a in sorted_assignments:
-        effort += a['actual_minutes']
-        data.append({
-            "effort": effort,
-            "outcome": float(a['grade'])
-        })
-    
-    return data
+
+    effort = np.cumsum([a['actual_minutes'] for a in sorted_assignments]).tolist()
+    outcome = [float(a['grade']) for a in sorted_assignments]
+
+    return [
+        {"effort": e, "outcome": o}
+        for e, o in zip(effort, outcome)
+    ]
 
 
 def smooth_marginal_returns(data, window=3):
@@ -74,13 +102,12 @@ def smooth_marginal_returns(data, window=3):
     """
     if len(data) < window:
         return data
-    
-    df = pd.DataFrame(data)
-    df['outcome_smooth'] = df['outcome'].rolling(window=window, min_periods=1).mean()
-    
+
+    smoothed = trailing_mean([d['outcome'] for d in data], window)
+
     return [
-        {"effort": row['effort'], "outcome": round(row['outcome_smooth'], 1)}
-        for _, row in df.iterrows()
+        {"effort": d['effort'], "outcome": round(o, 1)}
+        for d, o in zip(data, smoothed.tolist())
     ]
 
 
@@ -138,4 +165,42 @@ def outcome_contribution_by_class(assignments):
     return {
         k: round(v / total_grade, 3)
         for k, v in totals.items()
-    }
\ No newline at end of file
+    }
+
+# =================== EFFORT / OUTCOME LAG ===================
+
+def lagged_correlations(effort, outcome, max_lag=3, min_periods=4):
+    """
+    Pearson correlation between effort shifted by 0..max_lag rows and outcome,
+    for every column at once.
+
+    effort, outcome: (weeks x classes) arrays on the same contiguous week
+    index, NaN where a week has no data.
+
+    Returns a (classes x max_lag+1) array, NaN where fewer than min_periods
+    weeks overlap or either side is constant.
+    """
+    effort = np.asarray(effort, dtype=float)
+    outcome = np.asarray(outcome, dtype=float)
+    n_weeks = effort.shape[0]
+
+    # shifted[lag] = effort moved down by `lag` weeks
+    padded = np.vstack([np.full((max_lag, effort.shape[1]), np.nan), effort])
+    shifted = np.stack([padded[max_lag - lag:max_lag - lag + n_weeks] for lag in range(max_lag + 1)])
+    target = np.broadcast_to(outcome, shifted.shape)
+
+    mask = ~np.isnan(shifted) & ~np.isnan(target)
+    count = mask.sum(axis=1)
+
+    x = np.where(mask, shifted, 0.0)
+    y = np.where(mask, target, 0.0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_dev = np.where(mask, x - x.sum(axis=1, keepdims=True) / count[:, None], 0.0)
+        y_dev = np.where(mask, y - y.sum(axis=1, keepdims=True) / count[:, None], 0.0)
+
+        cov = (x_dev * y_dev).sum(axis=1)
+        denom = np.sqrt((x_dev ** 2).sum(axis=1) * (y_dev ** 2).sum(axis=1))
+        corr = np.where((count >= min_periods) & (denom > 0), cov / denom, np.nan)
+
+    return corr.T
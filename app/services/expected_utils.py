@@ -1,5 +1,7 @@
 # app/services/expected_utils.py
 
+from functools import lru_cache
+
 import pandas as pd
 import numpy as np
 
@@ -73,6 +75,12 @@ GROUP_SIMILARITY = {
 
 OTHER_SCORE = 0.3
 
+GROUP_BY_ASSIGNMENT_TYPE = {
+    assignment_type: group
+    for group, items in GROUPS.items()
+    for assignment_type in items
+}
+
 
 # =================== DATA SUFFICIENCY ===================
 
@@ -97,10 +105,7 @@ def class_type_similarity(type_a, type_b):
 
 def get_group(assignment_type):
     """Get the group for an assignment type."""
-    for group, items in GROUPS.items():
-        if assignment_type in items:
-            return group
-    return None
+    return GROUP_BY_ASSIGNMENT_TYPE.get(assignment_type)
 
 
 def assignment_type_similarity(type_a, type_b):
@@ -229,4 +234,129 @@ def estimate_expected_difficulty(target_class_type, target_assignment_type, targ
     alpha = 0.4
     final = alpha * base + (1 - alpha) * estimate
     
-    return int(round(min(10, max(1, final))))
\ No newline at end of file
+    return int(round(min(10, max(1, final))))
+
+
+# =================== BATCH ESTIMATION ===================
+# Score many targets against the whole history at once. Results are identical
+# to calling the scalar estimators above once per target.
+
+def _round_like_python(values, digits):
+    """Elementwise round() with Python's semantics (np.round can differ by 1 ulp)."""
+    uniques, inverse = np.unique(values, return_inverse=True)
+    rounded = np.array([round(float(v), digits) for v in uniques])
+    return rounded[inverse].reshape(values.shape)
+
+
+@lru_cache(maxsize=32)
+def composite_similarity_table(class_types, assignment_types):
+    """
+    composite_assignment_similarity for every combination of the given
+    class types and assignment types (tuples).
+
+    Indexed as table[target_class_type, target_assignment_type,
+                     past_class_type, past_assignment_type, same_class].
+    """
+    class_sim = np.array([[class_type_similarity(a, b) for b in class_types] for a in class_types])
+    type_sim = np.array([[assignment_type_similarity(a, b) for b in assignment_types] for a in assignment_types])
+    same_class_bonus = np.array([0.6, 1.0])
+
+    raw = (
+        0.5 * class_sim[:, None, :, None, None] +
+        0.3 * type_sim[None, :, None, :, None] +
+        0.2 * same_class_bonus
+    )
+    return _round_like_python(raw, 3)
+
+
+def similarity_matrix(targets, past):
+    """
+    Composite similarity of every target (rows) to every past assignment (columns).
+    Both are DataFrames with class_type, assignment_type and class_id columns.
+    """
+    class_types = tuple(sorted(set(targets['class_type']) | set(past['class_type'])))
+    assignment_types = tuple(sorted(set(targets['assignment_type']) | set(past['assignment_type'])))
+    table = composite_similarity_table(class_types, assignment_types)
+
+    ct_index = {t: i for i, t in enumerate(class_types)}
+    at_index = {t: i for i, t in enumerate(assignment_types)}
+
+    target_ct = targets['class_type'].map(ct_index).to_numpy()
+    target_at = targets['assignment_type'].map(at_index).to_numpy()
+    past_ct = past['class_type'].map(ct_index).to_numpy()
+    past_at = past['assignment_type'].map(at_index).to_numpy()
+    same_class = (
+        targets['class_id'].to_numpy()[:, None] == past['class_id'].to_numpy()[None, :]
+    ).astype(int)
+
+    return table[
+        target_ct[:, None], target_at[:, None],
+        past_ct[None, :], past_at[None, :],
+        same_class
+    ]
+
+
+def _historical_estimates(targets, past, value_column):
+    """
+    Similarity-weighted mean of past[value_column] per target.
+    NaN where no past value carries any weight.
+    """
+    past = past[past[value_column].notna()]
+    if past.empty:
+        return np.full(len(targets), np.nan)
+
+    weights = similarity_matrix(targets, past)
+    values = past[value_column].to_numpy(dtype=float)
+
+    # cumsum adds left to right, matching the scalar loop's float results
+    weighted_sum = np.cumsum(weights * values, axis=1)[:, -1]
+    weight_total = np.cumsum(weights, axis=1)[:, -1]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(weight_total == 0, np.nan, weighted_sum / weight_total)
+
+
+def estimate_expected_minutes_batch(targets, past_assignments):
+    """
+    estimate_expected_minutes for every row of targets.
+
+    targets: DataFrame with class_type, assignment_type, class_id
+    past_assignments: DataFrame (or list of dicts) with class_type,
+        assignment_type, class_id, actual_minutes
+
+    Returns an int ndarray aligned with targets.
+    """
+    past = pd.DataFrame(past_assignments, columns=['class_type', 'assignment_type', 'class_id', 'actual_minutes'])
+    base = targets['assignment_type'].map(BASE_TIME_BY_ASSIGNMENT_TYPE).fillna(120).to_numpy(dtype=float)
+
+    if targets.empty or not has_enough_data(past):
+        return base.astype(int)
+
+    historical = _historical_estimates(targets, past, 'actual_minutes')
+
+    alpha = 0.35
+    estimate = np.rint(alpha * base + (1 - alpha) * historical)
+    return np.where(np.isnan(historical), base, estimate).astype(int)
+
+
+def estimate_expected_difficulty_batch(targets, past_assignments):
+    """
+    estimate_expected_difficulty for every row of targets.
+
+    targets: DataFrame with class_type, assignment_type, class_id
+    past_assignments: DataFrame (or list of dicts) with class_type,
+        assignment_type, class_id, difficulty
+
+    Returns an int ndarray aligned with targets.
+    """
+    past = pd.DataFrame(past_assignments, columns=['class_type', 'assignment_type', 'class_id', 'difficulty'])
+    base = targets['assignment_type'].map(BASE_DIFFICULTY_BY_ASSIGNMENT_TYPE).fillna(5).to_numpy(dtype=float)
+
+    if targets.empty or not has_enough_data(past):
+        return base.astype(int)
+
+    historical = _historical_estimates(targets, past, 'difficulty')
+
+    alpha = 0.4
+    estimate = np.rint(np.clip(alpha * base + (1 - alpha) * historical, 1, 10))
+    return np.where(np.isnan(historical), base, estimate).astype(int)
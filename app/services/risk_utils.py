@@ -5,6 +5,18 @@ import numpy as np
 import pandas as pd
 
 
+DEFAULT_RISK_WEIGHTS = {
+    "time_pressure": 0.30,
+    "deadline_proximity": 0.20,
+    "difficulty": 0.20,
+    "history": 0.20,
+    "overlap": 0.10
+}
+
+# Upper ends (in days, inclusive) of the deadline proximity buckets after "Overdue"
+DEADLINE_BUCKET_EDGES = (2, 5, 10)
+
+
 # =================== TIME & URGENCY ===================
 
 def compute_days_until_due(due_at, now=None):
@@ -57,6 +69,20 @@ def deadline_proximity_bucket(days_until_due):
         return "10+ days"
 
 
+def deadline_bucket_labels(edges=DEADLINE_BUCKET_EDGES):
+    """
+    Labels for deadline buckets with the given edges:
+    Overdue, 0-e1 days, (e1+1)-e2 days, ..., en+ days.
+    """
+    labels = ["Overdue"]
+    lower = 0
+    for edge in edges:
+        labels.append(f"{lower}-{edge} days")
+        lower = edge + 1
+    labels.append(f"{edges[-1]}+ days")
+    return labels
+
+
 # =================== NORMALIZATION ===================
 
 def min_max_normalize(series):
@@ -131,13 +157,7 @@ def compute_assignment_risk(components, weights=None):
     """
 
     if weights is None:
-        weights = {
-            "time_pressure": 0.30,
-            "deadline_proximity": 0.20,
-            "difficulty": 0.20,
-            "history": 0.20,
-            "overlap": 0.10
-        }
+        weights = DEFAULT_RISK_WEIGHTS
 
     risk_breakdown = {}
     total_risk = 0.0
@@ -156,6 +176,87 @@ def compute_assignment_risk(components, weights=None):
     }
 
 
+# =================== VECTORIZED SCORING ===================
+# Array versions of the functions above for scoring many assignments at once.
+# Missing values (NaT / NaN) behave like None in the scalar versions.
+
+def compute_days_until_due_array(due_at, now=None):
+    """
+    Days until deadline for an array / Series of datetimes.
+    NaN where due_at is missing.
+    """
+    if now is None:
+        now = datetime.now(timezone.utc)
+
+    due = pd.to_datetime(pd.Series(due_at), utc=True)
+    delta = due - pd.Timestamp(now)
+    return (delta.dt.total_seconds() / 86400).to_numpy()
+
+
+def urgency_score_array(days_until_due, tau=7):
+    """
+    Exponential urgency curve over an array of days.
+    Overdue = 1, missing = 0.
+    """
+    days = np.asarray(days_until_due, dtype=float)
+    score = np.exp(-np.clip(days, 0, None) / tau)
+    return np.where(np.isnan(days), 0.0, score)
+
+
+def time_pressure_score_array(days_until_due, tau=7):
+    return urgency_score_array(days_until_due, tau)
+
+
+def deadline_bucket_array(days_until_due, edges=DEADLINE_BUCKET_EDGES):
+    """
+    Vectorized deadline_proximity_bucket, as indexes into deadline_bucket_labels(edges).
+    0 = overdue, then one bucket up to (and including) each edge, last = past
+    the last edge. Missing = -1.
+    """
+    days = np.asarray(days_until_due, dtype=float)
+    index = np.where(days < 0, 0, np.digitize(days, edges, right=True) + 1)
+    return np.where(np.isnan(days), -1, index)
+
+
+def historical_risk_array(rolling_grade, min_grade=50, max_grade=100):
+    """
+    Historical risk over an array of grades. Missing grades = 0 risk.
+    """
+    grades = np.asarray(rolling_grade, dtype=float)
+    norm = np.clip((grades - min_grade) / (max_grade - min_grade), 0, 1)
+    return np.where(np.isnan(grades), 0.0, 1 - norm)
+
+
+def compute_assignment_risk_array(components, weights=None):
+    """
+    Vectorized compute_assignment_risk.
+
+    components: DataFrame (or dict of equal-length arrays) with one
+    column per component, values in [0,1]. Missing values count as 0.
+
+    Returns (breakdown, total_risk):
+    - breakdown: DataFrame of weighted contributions, one column per component
+    - total_risk: Series of summed risk
+    Both rounded to 3 decimals.
+    """
+    if weights is None:
+        weights = DEFAULT_RISK_WEIGHTS
+
+    names = list(components.keys())
+    index = components.index if isinstance(components, pd.DataFrame) else None
+
+    matrix = np.column_stack([
+        np.nan_to_num(np.asarray(components[name], dtype=float), nan=0.0)
+        for name in names
+    ])
+    weighted = matrix * np.array([weights.get(name, 0) for name in names])
+
+    breakdown = pd.DataFrame(np.round(weighted, 3), columns=names, index=index)
+    total_risk = pd.Series(np.round(weighted.sum(axis=1), 3), index=index)
+
+    return breakdown, total_risk
+
+
 # =================== WEEKLY RISK AGGREGATION ===================
 
 def aggregate_weekly_risk_components(df, week_col='week'):
@@ -0,0 +1,110 @@
+# app/services/session_events.py
+
+import threading
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+_PENDING_KEY = "session_events_changed_users"
+
+
+class Subscription:
+    """One listener (e.g. an open event stream) waiting for a user's session changes."""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self._changed = threading.Event()
+
+    def notify(self):
+        self._changed.set()
+
+    def wait(self, timeout=None):
+        """Block until notified or timeout. Returns True if something changed."""
+        changed = self._changed.wait(timeout)
+        # Clearing after a timeout could drop a notify that landed just after it
+        if changed:
+            self._changed.clear()
+        return changed
+
+
+class SessionEventBroker:
+    """
+    In-process pub/sub for study session changes.
+
+    After any commit that writes a StudySession row, every subscription of
+    that row's user is notified. Subscribers re-read the state themselves, so
+    notifications carry no payload and several commits may collapse into one.
+
+    Only listeners in the same process are notified; a multi-process deployment
+    needs a shared broker (e.g. Redis pub/sub) with the same interface.
+    The broker is looked up through app.extensions["session_events"], so tests
+    can install a stand-in.
+    """
+
+    def __init__(self):
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+        self._listening = False
+
+    def init_app(self, app):
+        app.extensions["session_events"] = self
+
+        if not self._listening:
+            event.listen(Session, "after_flush", _collect_changed_users)
+            event.listen(Session, "after_commit", _publish_changed_users)
+            event.listen(Session, "after_rollback", _discard_changed_users)
+            self._listening = True
+
+    def subscribe(self, user_id):
+        subscription = Subscription(user_id)
+        with self._lock:
+            self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def publish(self, user_id):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.notify()
+
+    def subscriber_count(self, user_id=None):
+        with self._lock:
+            if user_id is not None:
+                return len(self._subscriptions.get(user_id, ()))
+            return sum(len(s) for s in self._subscriptions.values())
+
+
+# =================== SESSION EVENTS ===================
+
+def _collect_changed_users(session, flush_context):
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if getattr(obj, "__tablename__", None) == "study_sessions":
+            pending.add(obj.user_id)
+
+
+def _publish_changed_users(session):
+    user_ids = session.info.pop(_PENDING_KEY, set())
+    if not user_ids or not has_app_context():
+        return
+
+    broker = current_app.extensions.get("session_events")
+    if broker is None:
+        return
+
+    for user_id in user_ids:
+        broker.publish(user_id)
+
+
+def _discard_changed_users(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -1,7 +1,19 @@
 # app/services/study_session_service.py
+import time
+from collections import namedtuple
+
+from flask import current_app, g
+from app.extensions import db, analytics_cache
 from app.models.study_session import StudySession
 from datetime import datetime, timezone
-from sqlalchemy import and_
+from sqlalchemy import and_, or_, func
+from sqlalchemy.orm import joinedload
+
+
+SessionState = namedtuple("SessionState", ["active_session", "due_session"])
+
+# user_id -> (data version, stored_at, SessionState); see get_session_state
+_state_cache = {}
 
 
 def get_active_session(user_id: int) -> StudySession | None:
@@ -34,6 +46,21 @@ def get_due_scheduled_session(user_id: int) -> StudySession | None:
     ).order_by(StudySession.expected_started_at.asc()).first()
 
 
+def is_active_session_conflict(error) -> bool:
+    """
+    True if an IntegrityError comes from the one_active_session_per_user
+    index, i.e. the user already has an active session.
+    """
+    diag = getattr(error.orig, "diag", None)
+    constraint = getattr(diag, "constraint_name", None)
+    if constraint is not None:
+        return constraint == "one_active_session_per_user"
+
+    # SQLite only reports the columns
+    message = str(error.orig)
+    return "one_active_session_per_user" in message or "study_sessions.user_id" in message
+
+
 def has_active_session(user_id: int) -> bool:
     """
     Returns True if the user currently has an active session.
@@ -57,8 +84,7 @@ def check_session_collision(user_id: int) -> dict | None:
             "due_scheduled_session": StudySession
         }
     """
-    active_session = get_active_session(user_id)
-    due_scheduled_session = get_due_scheduled_session(user_id)
+    active_session, due_scheduled_session = get_session_state(user_id)
 
     if active_session and due_scheduled_session:
         return {
@@ -67,3 +93,127 @@ def check_session_collision(user_id: int) -> dict | None:
         }
 
     return None
+
+
+# =================== REQUEST SESSION STATE ===================
+
+def load_session_state(user_id: int) -> SessionState:
+    """
+    Active and due scheduled session (same rules as get_active_session and
+    get_due_scheduled_session) in a single query, with their class loaded.
+    """
+    now = datetime.now(timezone.utc)
+
+    is_due = and_(
+        StudySession.is_active.is_(False),
+        StudySession.is_completed.is_(False),
+        StudySession.expected_started_at <= now
+    )
+
+    # First row of each kind: the active session, and the earliest due one
+    ranked = db.session.query(
+        StudySession.session_id,
+        func.row_number().over(
+            partition_by=StudySession.is_active,
+            order_by=(StudySession.expected_started_at.asc(), StudySession.session_id.asc())
+        ).label("rank")
+    ).filter(
+        StudySession.user_id == user_id,
+        StudySession.cancelled_at.is_(None),
+        or_(StudySession.is_active.is_(True), is_due)
+    ).subquery()
+
+    sessions = StudySession.query.options(
+        joinedload(StudySession.class_)
+    ).join(
+        ranked, ranked.c.session_id == StudySession.session_id
+    ).filter(ranked.c.rank == 1).all()
+
+    active_session = next((s for s in sessions if s.is_active), None)
+    due_session = next((s for s in sessions if not s.is_active), None)
+
+    return SessionState(active_session, due_session)
+
+
+def get_session_state(user_id: int) -> SessionState:
+    """
+    Session state for the current request, loaded at most once per request.
+
+    With SESSION_STATE_CACHE_TTL_SECONDS > 0 the state is also kept per user
+    for that long across requests. Any commit touching the user's study
+    sessions or classes drops it (via the analytics cache data version); a
+    scheduled session can show up as due up to TTL seconds late.
+    """
+    state = g.get("session_state")
+    if state is not None and g.session_state_user_id == user_id:
+        return state
+
+    ttl = current_app.config.get("SESSION_STATE_CACHE_TTL_SECONDS", 0)
+    version = analytics_cache.version(user_id)
+
+    cached = _state_cache.get(user_id) if ttl > 0 else None
+    if cached is not None and cached[0] == version and time.monotonic() - cached[1] <= ttl:
+        state = cached[2]
+    else:
+        state = load_session_state(user_id)
+        if ttl > 0:
+            # Detach so the objects can outlive this request's db session
+            loaded = [s for s in state if s is not None]
+            for obj in {*loaded, *(s.class_ for s in loaded)}:
+                if obj in db.session:
+                    db.session.expunge(obj)
+            _state_cache[user_id] = (version, time.monotonic(), state)
+
+    g.session_state = state
+    g.session_state_user_id = user_id
+    return state
+
+
+def get_next_scheduled_start(user_id: int) -> datetime | None:
+    """
+    When the user's next not-yet-due scheduled session starts, or None.
+    """
+    now = datetime.now(timezone.utc)
+
+    return db.session.query(func.min(StudySession.expected_started_at)).filter(
+        StudySession.user_id == user_id,
+        StudySession.is_active.is_(False),
+        StudySession.is_completed.is_(False),
+        StudySession.cancelled_at.is_(None),
+        StudySession.expected_started_at > now
+    ).scalar()
+
+
+def session_state_payload(user_id: int) -> dict:
+    """
+    JSON-ready active / due / collision state, as shown by the base template,
+    plus when the next scheduled session becomes due.
+    """
+    active_session, due_session = load_session_state(user_id)
+    next_start = get_next_scheduled_start(user_id)
+
+    def describe(session):
+        if session is None:
+            return None
+        return {
+            "session_id": session.session_id,
+            "title": session.title,
+            "class_name": session.class_.class_name,
+            "started_at": session.started_at.isoformat() if session.started_at else None,
+            "expected_started_at": session.expected_started_at.isoformat() if session.expected_started_at else None
+        }
+
+    collision = None
+    if active_session and due_session:
+        collision = {
+            "active_session_id": active_session.session_id,
+            "scheduled_session_id": due_session.session_id,
+            "scheduled_session_title": due_session.title
+        }
+
+    return {
+        "active_session": describe(active_session),
+        "due_session": describe(due_session),
+        "session_collision": collision,
+        "next_due_at": next_start.isoformat() if next_start else None
+    }
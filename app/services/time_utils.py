@@ -0,0 +1,65 @@
+# app/services/time_utils.py
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import DateTime, Integer, bindparam, literal
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+
+# =================== WEEK BUCKETS ===================
+
+def week_start(timestamps):
+    """
+    Monday 00:00 of each timestamp's week, as naive datetimes.
+
+    Same buckets as .dt.tz_localize(None).dt.to_period('W').apply(lambda p: p.start_time)
+    (weeks ending Sunday, wall-clock time kept), computed with datetime64
+    arithmetic instead of one Python call per row. Missing values stay NaT.
+    """
+    timestamps = pd.Series(timestamps)
+    if timestamps.dt.tz is not None:
+        timestamps = timestamps.dt.tz_localize(None)
+
+    values = timestamps.to_numpy()
+    days = values.astype('datetime64[D]')
+
+    # 1970-01-01 was a Thursday, so day 0 is 3 days after a Monday
+    weekday = (days.astype('int64') + 3) % 7
+    monday = days - weekday.astype('timedelta64[D]')
+    monday[np.isnat(values)] = np.datetime64('NaT')
+
+    return pd.Series(monday.astype(values.dtype), index=timestamps.index, name=timestamps.name)
+
+
+# =================== SQL BUCKETS ===================
+
+class bucket_index(FunctionElement):
+    """
+    Zero-based index of the fixed-length bucket a timestamp column falls in,
+    counting from `start`: floor((column - start) / bucket_seconds).
+
+    Compiled per dialect; only meant for rows at or after `start`.
+    """
+    type = Integer()
+    inherit_cache = True
+
+    def __init__(self, column, start, bucket_seconds):
+        super().__init__(
+            column,
+            bindparam(None, start, type_=DateTime(timezone=True)),
+            literal(bucket_seconds, Integer())
+        )
+
+
+@compiles(bucket_index)
+def _bucket_index_default(element, compiler, **kw):
+    column, start, seconds = (compiler.process(c, **kw) for c in element.clauses)
+    return f"CAST(FLOOR(EXTRACT(EPOCH FROM ({column} - {start})) / {seconds}) AS INTEGER)"
+
+
+@compiles(bucket_index, "sqlite")
+def _bucket_index_sqlite(element, compiler, **kw):
+    column, start, seconds = (compiler.process(c, **kw) for c in element.clauses)
+    # Whole seconds, so the division is exact integer division (and non-negative, so it floors)
+    return f"((CAST(strftime('%s', {column}) AS INTEGER) - CAST(strftime('%s', {start}) AS INTEGER)) / {seconds})"
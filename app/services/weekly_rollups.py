@@ -0,0 +1,229 @@
+# app/services/weekly_rollups.py
+
+from datetime import datetime, time, timedelta, timezone
+from itertools import product
+
+import click
+import pandas as pd
+from flask.cli import with_appcontext
+from sqlalchemy import delete, event, func, inspect, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models.assignment import Assignment
+from app.models.study_session import StudySession
+from app.models.weekly_rollup import WeeklyClassRollup
+from app.services.time_utils import week_start
+
+
+_PENDING_KEY = "weekly_rollup_keys"
+
+# INSERT ... ON CONFLICT DO UPDATE per dialect, for refresh_rollup
+_UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+_ROLLUP_COUNTS = ("study_minutes", "session_count", "grade_sum", "grade_count", "completed_count")
+
+# Columns whose old and new values decide which weeks a row counts in
+_KEY_ATTRIBUTES = {
+    "study_sessions": "started_at",
+    "assignments": "finished_at",
+}
+
+
+# =================== WEEKS ===================
+
+def week_of(value):
+    """Monday (UTC) of the week a datetime falls in. Naive values are taken as UTC."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    day = value.astimezone(timezone.utc).date()
+    return day - timedelta(days=day.weekday())
+
+
+# =================== INCREMENTAL MAINTENANCE ===================
+
+def register_rollup_events():
+    """Keep weekly_class_rollups in step with every commit that touches sessions or assignments."""
+    if not event.contains(Session, "before_flush", _collect_rollup_keys):
+        event.listen(Session, "before_flush", _collect_rollup_keys)
+        event.listen(Session, "before_commit", _refresh_pending_rollups)
+        event.listen(Session, "after_rollback", _discard_rollup_keys)
+
+
+def _history_values(obj, attr):
+    """Old and new values of an attribute in this flush (None dropped)."""
+    history = inspect(obj).attrs[attr].history
+    return {v for v in (*history.added, *history.unchanged, *history.deleted) if v is not None}
+
+
+def _collect_rollup_keys(session, flush_context, instances):
+    pending = session.info.setdefault(_PENDING_KEY, set())
+
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        time_attr = _KEY_ATTRIBUTES.get(getattr(obj, "__tablename__", None))
+        if time_attr is None:
+            continue
+
+        weeks = {week_of(v) for v in _history_values(obj, time_attr)}
+        pending.update(product(
+            _history_values(obj, "user_id"),
+            _history_values(obj, "class_id"),
+            weeks
+        ))
+
+
+def _refresh_pending_rollups(session):
+    # Flush first so the last changes are collected and visible to the refresh
+    session.flush()
+
+    keys = session.info.pop(_PENDING_KEY, set())
+    for user_id, class_id, week in sorted(keys):
+        refresh_rollup(session, user_id, class_id, week)
+
+
+def _discard_rollup_keys(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def refresh_rollup(session, user_id, class_id, week):
+    """Recompute one (user, class, week) rollup row from the raw rows."""
+    start = datetime.combine(week, time(), tzinfo=timezone.utc)
+    end = start + timedelta(days=7)
+
+    study_minutes, session_count = session.execute(
+        db.select(
+            func.coalesce(func.sum(StudySession.duration_minutes), 0),
+            func.count(StudySession.session_id)
+        ).where(
+            StudySession.user_id == user_id,
+            StudySession.class_id == class_id,
+            StudySession.is_completed == True,
+            StudySession.duration_minutes.isnot(None),
+            StudySession.started_at >= start,
+            StudySession.started_at < end
+        )
+    ).one()
+
+    grade_sum, grade_count, completed_count = session.execute(
+        db.select(
+            func.coalesce(func.sum(Assignment.grade), 0),
+            func.count(Assignment.grade),
+            func.count(Assignment.assignment_id).filter(Assignment.is_completed == True)
+        ).where(
+            Assignment.user_id == user_id,
+            Assignment.class_id == class_id,
+            Assignment.finished_at >= start,
+            Assignment.finished_at < end
+        )
+    ).one()
+
+    table = WeeklyClassRollup.__table__
+
+    if not (session_count or grade_count or completed_count):
+        session.execute(delete(table).where(
+            table.c.user_id == user_id,
+            table.c.class_id == class_id,
+            table.c.week_start == week
+        ))
+        return
+
+    # Upsert, so two commits refreshing the same week can't collide on the primary key
+    upsert = _UPSERT_INSERTS[session.get_bind().dialect.name](table).values(
+        user_id=user_id,
+        class_id=class_id,
+        week_start=week,
+        study_minutes=study_minutes,
+        session_count=session_count,
+        grade_sum=grade_sum,
+        grade_count=grade_count,
+        completed_count=completed_count
+    )
+    session.execute(upsert.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.class_id, table.c.week_start],
+        set_={name: upsert.excluded[name] for name in _ROLLUP_COUNTS}
+    ))
+
+
+# =================== BACKFILL ===================
+
+def backfill_rollups(user_id=None):
+    """
+    Rebuild weekly_class_rollups from the raw rows, for one user or everyone.
+    Returns the number of rollup rows written.
+    """
+    session_query = db.session.query(
+        StudySession.user_id,
+        StudySession.class_id,
+        StudySession.started_at,
+        StudySession.duration_minutes
+    ).filter(
+        StudySession.is_completed == True,
+        StudySession.duration_minutes.isnot(None),
+        StudySession.started_at.isnot(None)
+    )
+    assignment_query = db.session.query(
+        Assignment.user_id,
+        Assignment.class_id,
+        Assignment.finished_at,
+        Assignment.grade,
+        Assignment.is_completed
+    ).filter(Assignment.finished_at.isnot(None))
+
+    if user_id is not None:
+        session_query = session_query.filter(StudySession.user_id == user_id)
+        assignment_query = assignment_query.filter(Assignment.user_id == user_id)
+
+    keys = ['user_id', 'class_id', 'week_start']
+
+    sessions = pd.DataFrame.from_records(
+        session_query.all(), columns=['user_id', 'class_id', 'started_at', 'duration_minutes']
+    )
+    sessions['week_start'] = week_start(pd.to_datetime(sessions['started_at'], utc=True)).dt.date
+    effort = sessions.groupby(keys).agg(
+        study_minutes=('duration_minutes', 'sum'),
+        session_count=('duration_minutes', 'size')
+    )
+
+    assignments = pd.DataFrame.from_records(
+        assignment_query.all(), columns=['user_id', 'class_id', 'finished_at', 'grade', 'is_completed']
+    )
+    assignments['week_start'] = week_start(pd.to_datetime(assignments['finished_at'], utc=True)).dt.date
+    assignments['grade'] = assignments['grade'].astype(float)
+    outcome = assignments.groupby(keys).agg(
+        grade_sum=('grade', 'sum'),
+        grade_count=('grade', 'count'),
+        completed_count=('is_completed', 'sum')
+    )
+
+    rollups = effort.join(outcome, how='outer').fillna(0).reset_index()
+    rollups['grade_sum'] = rollups['grade_sum'].round(2)
+    for col in ('study_minutes', 'session_count', 'grade_count', 'completed_count'):
+        rollups[col] = rollups[col].astype(int)
+
+    table = WeeklyClassRollup.__table__
+    clear = delete(table)
+    if user_id is not None:
+        clear = clear.where(table.c.user_id == user_id)
+    db.session.execute(clear)
+
+    records = rollups.to_dict('records')
+    if records:
+        db.session.execute(insert(table), records)
+    db.session.commit()
+
+    return len(records)
+
+
+@click.command("backfill-rollups")
+@click.option("--user-id", type=int, default=None, help="Only rebuild this user's rollups.")
+@with_appcontext
+def backfill_rollups_command(user_id):
+    """Rebuild weekly_class_rollups from study sessions and assignments."""
+    count = backfill_rollups(user_id)
+    click.echo(f"Wrote {count} weekly rollup rows")
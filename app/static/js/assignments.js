@@ -426,6 +426,9 @@ document.addEventListener("DOMContentLoaded", () => {
             return;
         }
 
+        // The assignment charts on this page don't reload with it
+        document.dispatchEvent(new CustomEvent("data-updated"));
+
         // ✅ Update completion state
         pendingRow.dataset.completed = isCompleted.toString();
         pendingCheckbox.checked = isCompleted;
@@ -97,15 +97,21 @@ document.addEventListener('DOMContentLoaded', () => {
         });
     }
 
-    async function renderTypeLoad() {
+    // Responses carry both metrics, so toggling the metric reuses the last fetch
+    let typeLoadCache = { timeWindow: null, data: null };
+
+    async function renderTypeLoad({ refresh = false } = {}) {
         if (!typeCanvas) return;
         const metric = document.querySelector('.chart-toggle button.active')?.dataset?.metric || 'count';
         const time_window = typeTimeFilter?.value || 'all';
-        const res = await fetch(`/charts/assignments/type_load?metric=${metric}&time_window=${time_window}`);
-        if (!res.ok) return;
-        const data = await res.json();
+        if (refresh || typeLoadCache.timeWindow !== time_window || !typeLoadCache.data) {
+            const res = await fetch(`/charts/assignments/type_load?time_window=${time_window}`);
+            if (!res.ok) return;
+            typeLoadCache = { timeWindow: time_window, data: await res.json() };
+        }
+        const data = typeLoadCache.data;
         const labels = data.types || [];
-        const values = data.values || [];
+        const values = (metric === 'count' ? data.counts : data.study_minutes) || data.values || [];
         const colors = data.colors || labels.map(() => '#4f46e5');
 
         if (typeChart) typeChart.destroy();
@@ -151,14 +157,16 @@ document.addEventListener('DOMContentLoaded', () => {
         await renderTypeLoad();
     })();
 
-    // Auto-refresh every 15s
-    setInterval(() => {
-        renderDueTimeline();
-        renderTypeLoad();
-    }, 15000);
+    // Refresh when the tab comes back into view instead of polling
+    document.addEventListener('visibilitychange', () => {
+        if (document.visibilityState === 'visible') {
+            renderDueTimeline();
+            renderTypeLoad({ refresh: true });
+        }
+    });
 
     // Allow external trigger
-    window.refreshAssignmentCharts = () => { renderDueTimeline(); renderTypeLoad(); };
+    window.refreshAssignmentCharts = () => { renderDueTimeline(); renderTypeLoad({ refresh: true }); };
 
     // Also refresh when page receives custom event
     document.addEventListener('data-updated', () => { window.refreshAssignmentCharts(); });
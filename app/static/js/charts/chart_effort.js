@@ -37,8 +37,7 @@ document.addEventListener('DOMContentLoaded', async () => {
     const spentCtx = spentCanvas.getContext('2d');
     
     try {
-        const spentRes = await fetch('/charts/dashboard/spent_vs_expected_time');
-        const spentData = await spentRes.json();
+        const spentData = (await dashboardBundle).spent_vs_expected_time;
         
         if (spentData.empty) {
             showEmptyMessage(spentWrapper, spentData.message || 'Insufficient data');
@@ -108,8 +107,7 @@ document.addEventListener('DOMContentLoaded', async () => {
     const marginalCtx = marginalCanvas.getContext('2d');
     
     try {
-        const marginalRes = await fetch('/charts/dashboard/marginal_returns_curve');
-        const marginalData = await marginalRes.json();
+        const marginalData = (await dashboardBundle).marginal_returns_curve;
         
         if (marginalData.empty) {
         showEmptyMessage(marginalWrapper, marginalData.message || 'Insufficient data');
@@ -179,8 +177,7 @@ document.addEventListener('DOMContentLoaded', async () => {
     const allocationCtx = allocationCanvas.getContext('2d');
     
     try {
-        const allocationRes = await fetch('/charts/dashboard/effort_allocation');
-        const allocationData = await allocationRes.json();
+        const allocationData = (await dashboardBundle).effort_allocation;
     
         if (allocationData.empty) {
             showEmptyMessage(allocationWrapper, allocationData.message || 'Insufficient data');
@@ -231,8 +228,7 @@ document.addEventListener('DOMContentLoaded', async () => {
     const outcomeWrapper = outcomeCanvas.parentElement;
     const outcomeCtx = outcomeCanvas.getContext('2d');
     try {
-        const outcomeRes = await fetch('/charts/dashboard/outcome_contribution');
-        const outcomeData = await outcomeRes.json();
+        const outcomeData = (await dashboardBundle).outcome_contribution;
         if (outcomeData.empty) {
             showEmptyMessage(outcomeWrapper, outcomeData.message || 'Insufficient data');
         } else {
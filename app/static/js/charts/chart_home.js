@@ -83,14 +83,15 @@ document.addEventListener("DOMContentLoaded", async () => {
 
     const loadDailyBtn = document.getElementById("loadDailyBtn");
     const loadWeeklyBtn = document.getElementById("loadWeeklyBtn");
+    const loadTermBtn = document.getElementById("loadTermBtn");
 
     let assignmentChart;
 
-    async function loadAssignmentChart(mode = "daily") {
+    async function loadAssignmentChart(mode = "daily", weeks = 4) {
         const url =
             mode === "daily"
                 ? "/charts/home/assignment_load_daily"
-                : "/charts/home/assignment_load_weekly";
+                : `/charts/home/assignment_load_weekly?weeks=${weeks}`;
 
         const res = await fetch(url);
         const chartData = await res.json();
@@ -133,18 +134,27 @@ document.addEventListener("DOMContentLoaded", async () => {
     loadAssignmentChart("daily");
 
     /* Toggle handlers */
+    const loadButtons = [loadDailyBtn, loadWeeklyBtn, loadTermBtn].filter(Boolean);
+
+    function activateLoadButton(button) {
+        loadButtons.forEach(b => b.classList.toggle("active", b === button));
+    }
+
     loadDailyBtn.addEventListener("click", () => {
-        loadDailyBtn.classList.add("active");
-        loadWeeklyBtn.classList.remove("active");
+        activateLoadButton(loadDailyBtn);
         loadAssignmentChart("daily");
     });
 
     loadWeeklyBtn.addEventListener("click", () => {
-        loadWeeklyBtn.classList.add("active");
-        loadDailyBtn.classList.remove("active");
+        activateLoadButton(loadWeeklyBtn);
         loadAssignmentChart("weekly");
     });
 
+    loadTermBtn?.addEventListener("click", () => {
+        activateLoadButton(loadTermBtn);
+        loadAssignmentChart("weekly", Number(loadTermBtn.dataset.weeks) || 16);
+    });
+
 
 
 
@@ -34,8 +34,7 @@ document.addEventListener('DOMContentLoaded', async () => {
   const rollingCtx = rollingCanvas.getContext('2d');
   
   try {
-    const rollingRes = await fetch('/charts/dashboard/rolling_grade_trend');
-    const rollingData = await rollingRes.json();
+    const rollingData = (await dashboardBundle).rolling_grade_trend;
     
     if (rollingData.empty) {
       showEmptyMessage(rollingWrapper, rollingData.message || 'No data available');
@@ -102,8 +101,7 @@ document.addEventListener('DOMContentLoaded', async () => {
   const psiCtx = psiCanvas.getContext('2d');
   
   try {
-    const psiRes = await fetch('/charts/dashboard/performance_stability_index');
-    const psiData = await psiRes.json();
+    const psiData = (await dashboardBundle).performance_stability_index;
     
     if (psiData.empty) {
       showEmptyMessage(psiWrapper, psiData.message || 'No data available');
@@ -169,8 +167,7 @@ document.addEventListener('DOMContentLoaded', async () => {
   const effortCtx = effortCanvas.getContext('2d');
   
   try {
-    const effortRes = await fetch('/charts/dashboard/effort_outcome_timeline');
-    const effortData = await effortRes.json();
+    const effortData = (await dashboardBundle).effort_outcome_timeline;
     
     if (effortData.empty) {
       showEmptyMessage(effortWrapper, effortData.message || 'No data available');
@@ -264,8 +261,7 @@ document.addEventListener('DOMContentLoaded', async () => {
   const heatmapCtx = heatmapCanvas.getContext('2d');
   
   try {
-    const heatmapRes = await fetch('/charts/dashboard/lag_correlation_heatmap');
-    const heatmapData = await heatmapRes.json();
+    const heatmapData = (await dashboardBundle).lag_correlation_heatmap;
     
     if (heatmapData.empty) {
       showEmptyMessage(heatmapWrapper, heatmapData.message || 'No data available');
@@ -33,8 +33,7 @@ document.addEventListener('DOMContentLoaded', async () => {
   const deadlineCtx = deadlineCanvas.getContext('2d');
   
   try {
-    const deadlineRes = await fetch('/charts/dashboard/deadline_proximity_distribution');
-    const deadlineData = await deadlineRes.json();
+    const deadlineData = (await dashboardBundle).deadline_proximity_distribution;
     
     if (deadlineData.empty) {
       showEmptyMessage(deadlineWrapper, deadlineData.message || 'No upcoming deadlines');
@@ -105,8 +104,7 @@ document.addEventListener('DOMContentLoaded', async () => {
   const breakdownCtx = breakdownCanvas.getContext('2d');
   
   try {
-    const breakdownRes = await fetch('/charts/dashboard/assignment_risk_breakdown?mode=riskiest&limit=8');
-    const breakdownData = await breakdownRes.json();
+    const breakdownData = (await dashboardBundle).assignment_risk_breakdown;
     
     if (breakdownData.empty) {
       showEmptyMessage(breakdownWrapper, breakdownData.message || 'No assignments to analyze');
@@ -168,8 +166,7 @@ document.addEventListener('DOMContentLoaded', async () => {
   const compositionCtx = compositionCanvas.getContext('2d');
   
   try {
-    const compositionRes = await fetch('/charts/dashboard/risk_composition_evolution');
-    const compositionData = await compositionRes.json();
+    const compositionData = (await dashboardBundle).risk_composition_evolution;
     
     if (compositionData.empty) {
       showEmptyMessage(compositionWrapper, compositionData.message || 'Insufficient data');
@@ -179,6 +176,7 @@ document.addEventListener('DOMContentLoaded', async () => {
       new Chart(compositionCtx, {
         type: 'line',
         data: {
+          labels: compositionData.weeks,
           datasets: compositionData.datasets.map(ds => ({
             ...ds,
             fill: true,
@@ -242,8 +240,7 @@ document.addEventListener('DOMContentLoaded', async () => {
     let matrixData;
 
     try {
-    const matrixRes = await fetch('/charts/dashboard/urgency_risk_matrix');
-    matrixData = await matrixRes.json();
+    matrixData = (await dashboardBundle).urgency_risk_matrix;
     } catch (error) {
     showEmptyMessage(matrixWrapper, 'Error loading data');
     console.error('Urgency vs Risk Matrix error:', error);
@@ -0,0 +1,5 @@
+// static/js/charts/dashboard_bundle.js
+
+// One request for every dashboard chart; each chart script awaits its own key.
+const dashboardBundle = fetch('/charts/dashboard/bundle?mode=riskiest&limit=8')
+    .then(res => res.json());
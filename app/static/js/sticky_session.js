@@ -269,4 +269,27 @@ document.addEventListener("DOMContentLoaded", () => {
     });
 
   }
+
+  // ================= SESSION STATE STREAM =================
+  // The server pushes the active/due session state when it changes; reload
+  // only if it no longer matches what this page was rendered with.
+  const stateEl = document.getElementById("session-state");
+
+  if (stateEl && window.EventSource) {
+    const renderedState = `${stateEl.dataset.activeSessionId}:${stateEl.dataset.dueSessionId}`;
+    const source = new EventSource("/study/state/stream");
+
+    source.addEventListener("session_state", (event) => {
+      const state = JSON.parse(event.data);
+      const activeId = state.active_session ? state.active_session.session_id : "";
+      const dueId = state.due_session ? state.due_session.session_id : "";
+
+      if (`${activeId}:${dueId}` !== renderedState) {
+        source.close();
+        window.location.reload();
+      }
+    });
+
+    window.addEventListener("beforeunload", () => source.close());
+  }
 });
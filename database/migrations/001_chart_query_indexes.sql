@@ -0,0 +1,41 @@
+-- Composite / partial indexes for the chart and session-state queries.
+-- Every chart filters by user (or class) first; without these each of them
+-- read all of assignments / study_sessions.
+--
+-- CONCURRENTLY avoids locking writes on large tables, so run this file
+-- outside a transaction:
+--   psql "$DATABASE_URL" -f database/migrations/001_chart_query_indexes.sql
+--
+-- tests/test_query_plans.py fails if a chart query falls back to a full scan.
+
+-- Completed sessions per user (dashboard frames, weekly study time, time per class)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_study_sessions_user_completed
+ON study_sessions (user_id, is_completed);
+
+-- Completed sessions per class (study efficiency, class stats)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_study_sessions_class_completed
+ON study_sessions (class_id, is_completed);
+
+-- Sessions of an assignment (in-progress EXISTS checks, per-assignment study time)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_study_sessions_assignment_id
+ON study_sessions (assignment_id);
+
+-- Active / due scheduled session lookup on every page
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_study_sessions_user_active_expected
+ON study_sessions (user_id, is_active, expected_started_at);
+
+-- Upcoming deadlines per user (due timeline, load charts, risk)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_assignments_user_due_at
+ON assignments (user_id, due_at);
+
+-- Graded history per user, in completion order (grade trends)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_assignments_user_graded_finished_at
+ON assignments (user_id, finished_at)
+WHERE grade IS NOT NULL;
+
+-- Assignments of a class (class health, class joins)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_assignments_class_id
+ON assignments (class_id);
+
+ANALYZE assignments;
+ANALYZE study_sessions;
@@ -0,0 +1,40 @@
+-- one_active_session_per_user was declared WHERE is_active IS NULL, but
+-- is_active is NOT NULL, so the index covered no rows: it neither enforced
+-- one active session per user nor served active-session lookups.
+-- Replace it with a partial unique index on the active rows.
+--
+-- Uses CONCURRENTLY, so run this file outside a transaction:
+--   psql "$DATABASE_URL" -f database/migrations/002_fix_one_active_session_index.sql
+
+-- 1. The rule was never enforced: cancel all but the most recently started
+--    active session of each user so the unique index can be built.
+--    Cancelled, not completed: these are usually abandoned sessions, and
+--    completing them would count everything since started_at as study time.
+WITH extra_active AS (
+    SELECT session_id
+    FROM (
+        SELECT
+            session_id,
+            row_number() OVER (
+                PARTITION BY user_id
+                ORDER BY started_at DESC NULLS LAST, session_id DESC
+            ) AS rank
+        FROM study_sessions
+        WHERE is_active
+    ) ranked
+    WHERE rank > 1
+)
+UPDATE study_sessions s
+SET is_active = FALSE,
+    cancelled_at = now()
+FROM extra_active
+WHERE s.session_id = extra_active.session_id;
+
+-- 2. Build the working index, then swap it in under the old name
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS one_active_session_per_user_new
+ON study_sessions (user_id)
+WHERE is_active;
+
+DROP INDEX CONCURRENTLY IF EXISTS one_active_session_per_user;
+
+ALTER INDEX one_active_session_per_user_new RENAME TO one_active_session_per_user;
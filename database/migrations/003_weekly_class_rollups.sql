@@ -0,0 +1,25 @@
+-- Weekly per-class totals read by the dashboard charts (rolling grade trend,
+-- effort vs outcome timeline, lag correlation heatmap), so their cost depends
+-- on the number of weeks rather than the number of sessions and assignments.
+--
+-- Rows are kept current by the app on every commit that touches
+-- study_sessions or assignments. After creating the table, fill it once:
+--   psql "$DATABASE_URL" -f database/migrations/003_weekly_class_rollups.sql
+--   flask backfill-rollups
+
+CREATE TABLE IF NOT EXISTS weekly_class_rollups (
+    user_id INT NOT NULL,
+    class_id INT NOT NULL,
+    week_start DATE NOT NULL,
+
+    study_minutes INT NOT NULL DEFAULT 0,
+    session_count INT NOT NULL DEFAULT 0,
+    grade_sum NUMERIC(10,2) NOT NULL DEFAULT 0,
+    grade_count INT NOT NULL DEFAULT 0,
+    completed_count INT NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (user_id, class_id, week_start),
+
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+    FOREIGN KEY (class_id) REFERENCES classes(class_id) ON DELETE CASCADE
+);
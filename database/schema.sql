@@ -153,7 +153,7 @@ CREATE TABLE study_sessions (
 
 CREATE UNIQUE INDEX one_active_session_per_user
 ON study_sessions(user_id)
-WHERE is_active IS NULL;
+WHERE is_active;
 
 CREATE TABLE class_expected_grades (
     id SERIAL PRIMARY KEY,
@@ -337,6 +337,36 @@ CREATE TABLE assignment_view_preferences (
         ON DELETE CASCADE
 );
 
+-- CHART QUERY INDEXES (see database/migrations/001_chart_query_indexes.sql)
+CREATE INDEX ix_study_sessions_user_completed ON study_sessions (user_id, is_completed);
+CREATE INDEX ix_study_sessions_class_completed ON study_sessions (class_id, is_completed);
+CREATE INDEX ix_study_sessions_assignment_id ON study_sessions (assignment_id);
+CREATE INDEX ix_study_sessions_user_active_expected ON study_sessions (user_id, is_active, expected_started_at);
+
+CREATE INDEX ix_assignments_user_due_at ON assignments (user_id, due_at);
+CREATE INDEX ix_assignments_user_graded_finished_at ON assignments (user_id, finished_at)
+WHERE grade IS NOT NULL;
+CREATE INDEX ix_assignments_class_id ON assignments (class_id);
+
+-- WEEKLY CLASS ROLLUPS (see database/migrations/003_weekly_class_rollups.sql)
+-- Per user / class / week totals for the dashboard charts; weeks start Monday (UTC)
+CREATE TABLE weekly_class_rollups (
+    user_id INT NOT NULL,
+    class_id INT NOT NULL,
+    week_start DATE NOT NULL,
+
+    study_minutes INT NOT NULL DEFAULT 0,
+    session_count INT NOT NULL DEFAULT 0,
+    grade_sum NUMERIC(10,2) NOT NULL DEFAULT 0,
+    grade_count INT NOT NULL DEFAULT 0,
+    completed_count INT NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (user_id, class_id, week_start),
+
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+    FOREIGN KEY (class_id) REFERENCES classes(class_id) ON DELETE CASCADE
+);
+
 
 
 
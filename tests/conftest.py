@@ -0,0 +1,56 @@
+import os
+
+import pytest
+from sqlalchemy import event
+
+# Never run tests against the configured development database
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ["ANALYTICS_CACHE_ENABLED"] = "false"
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def user(app):
+    user = User(username="student", email="student@example.com")
+    user.set_password("password")
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def client(app, user):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user.user_id)
+        session["_fresh"] = True
+    return client
+
+
+@pytest.fixture
+def query_log(app):
+    """List of SQL statements executed while the test runs."""
+    statements = []
+
+    def log(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", log)
+    yield statements
+    event.remove(db.engine, "before_cursor_execute", log)
@@ -0,0 +1,128 @@
+"""
+Index audit: run every chart route against a seeded database, EXPLAIN each
+SELECT it issued and fail if assignments or study_sessions is read with a
+full table scan.
+
+Runs on SQLite by default and on Postgres when TEST_DATABASE_URL points to one
+(sequential scans are disabled there so any remaining one means no usable index).
+"""
+import re
+
+import pytest
+from sqlalchemy import event, text
+
+from app.extensions import db
+from app.models.user import User
+from tests.test_routes import add_classes
+
+
+LARGE_TABLES = ("assignments", "study_sessions")
+
+# Query-param variants that take a different query path than the defaults,
+# plus JSON endpoints outside the charts blueprint
+EXTRA_URLS = [
+    "/charts/assignments/type_load?metric=study_time&time_window=last_30_days",
+    "/charts/classes/class_health?time_window=last_7_days",
+    "/charts/classes/class_health_summary?class_id=1&time_window=last_30_days",
+    "/charts/dashboard/assignment_risk_breakdown?mode=latest",
+    "/charts/dashboard/deadline_proximity_distribution?edges=1,3,7,14",
+    "/api/assignments?sort_by=due_date_soonest&limit=20",
+]
+
+
+def chart_urls(app):
+    urls = sorted(
+        rule.rule for rule in app.url_map.iter_rules()
+        if rule.endpoint.startswith("charts.") and "GET" in rule.methods and not rule.arguments
+    )
+    return urls + EXTRA_URLS
+
+
+# SQLite reports scans by alias when the query aliases the table ("SCAN a1")
+SQLITE_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?( USING (?:COVERING )?INDEX)?")
+POSTGRES_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+# "FROM/JOIN <table> [AS] <alias>"; the lookahead keeps the next JOIN matchable
+TABLE_ALIAS = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)(?=(?:\s+AS)?\s+(\w+))", re.IGNORECASE)
+NOT_ALIASES = {
+    "WHERE", "JOIN", "LEFT", "RIGHT", "INNER", "OUTER", "CROSS", "FULL", "NATURAL", "ON",
+    "USING", "GROUP", "ORDER", "HAVING", "LIMIT", "OFFSET", "UNION", "EXCEPT", "INTERSECT", "WINDOW"
+}
+
+
+def table_aliases(statement):
+    """alias -> table for every aliased table in the statement."""
+    return {
+        alias: table for table, alias in TABLE_ALIAS.findall(statement)
+        if alias.upper() not in NOT_ALIASES
+    }
+
+
+def full_scans(connection, statement, parameters):
+    """Large tables the statement reads without an index."""
+    scanned = set()
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("SET enable_seqscan = off")
+        plan = connection.exec_driver_sql("EXPLAIN " + statement, parameters).fetchall()
+        for row in plan:
+            match = POSTGRES_SCAN.search(row[-1])
+            if match:
+                scanned.add(match.group(1))
+    else:
+        plan = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+        for row in plan:
+            match = SQLITE_SCAN.search(row[-1])
+            if match and not match.group(2):
+                scanned.add(match.group(1))
+
+    aliases = table_aliases(statement)
+    return {aliases.get(name, name) for name in scanned} & set(LARGE_TABLES)
+
+
+def test_aliased_full_scans_are_reported(app):
+    assert table_aliases(
+        "SELECT 1 FROM assignments AS a1 JOIN classes c ON c.class_id = a1.class_id WHERE a1.grade > 0"
+    ) == {"a1": "assignments", "c": "classes"}
+
+    statement = "SELECT a1.assignment_id FROM assignments AS a1 WHERE a1.title = 'x'"
+    with db.engine.connect() as connection:
+        assert full_scans(connection, statement, ()) == {"assignments"}
+
+
+@pytest.fixture
+def seeded(user):
+    # Enough users that filtering by user is selective, then refresh planner stats
+    add_classes(user, 5)
+    for i in range(30):
+        other = User(username=f"other{i}", email=f"other{i}@example.com", password_hash="x")
+        db.session.add(other)
+        db.session.flush()
+        add_classes(other, 5)
+
+    db.session.execute(text("ANALYZE"))
+    db.session.commit()
+
+
+def test_chart_queries_use_indexes(app, client, seeded):
+    statements = []
+
+    def log(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    failures = []
+    for url in chart_urls(app):
+        statements.clear()
+        event.listen(db.engine, "before_cursor_execute", log)
+        try:
+            assert client.get(url).status_code == 200, url
+        finally:
+            event.remove(db.engine, "before_cursor_execute", log)
+
+        with db.engine.connect() as connection:
+            for statement, parameters in statements:
+                tables = full_scans(connection, statement, parameters)
+                if tables:
+                    failures.append(f"{url}: full scan of {', '.join(sorted(tables))}\n{statement}")
+
+    assert not failures, "\n\n".join(failures)
@@ -0,0 +1,862 @@
+import base64
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+from app.extensions import db
+from app.models.course import Class, load_class_stats
+from app.models.assignment import Assignment
+from app.models.study_session import StudySession
+from app.models.user import AssignmentViewPreferences, UserAssignmentTypeColor
+from app.models.weekly_rollup import WeeklyClassRollup
+from app.routes.charts.risk_routes import build_deadline_proximity_distribution
+from app.services.dashboard_frames import load_dashboard_frames
+from app.services.weekly_rollups import backfill_rollups, refresh_rollup, week_of
+
+
+def add_classes(user, count, start=0):
+    """Create `count` classes, each with a graded, an open and a studied assignment."""
+    now = datetime.now(timezone.utc)
+
+    for i in range(start, start + count):
+        cls = Class(
+            user_id=user.user_id,
+            class_name=f"Class {i}",
+            class_code=f"C{i}",
+            class_type="math",
+            color="#000000",
+            importance="medium",
+            difficulty=5
+        )
+        db.session.add(cls)
+        db.session.flush()
+
+        graded = Assignment(
+            user_id=user.user_id,
+            class_id=cls.class_id,
+            title="Graded",
+            assignment_type="quiz",
+            is_graded=True,
+            is_completed=True,
+            finished_at=now,
+            grade=80
+        )
+        studied = Assignment(
+            user_id=user.user_id,
+            class_id=cls.class_id,
+            title="Studied",
+            assignment_type="homework",
+            is_graded=False,
+            due_at=now + timedelta(days=3)
+        )
+        untouched = Assignment(
+            user_id=user.user_id,
+            class_id=cls.class_id,
+            title="Untouched",
+            assignment_type="reading",
+            is_graded=False
+        )
+        db.session.add_all([graded, studied, untouched])
+        db.session.flush()
+
+        db.session.add(StudySession(
+            user_id=user.user_id,
+            class_id=cls.class_id,
+            assignment_id=studied.assignment_id,
+            title="Session",
+            session_type="homework",
+            started_at=now - timedelta(hours=1),
+            session_end=now,
+            duration_minutes=60,
+            is_completed=True
+        ))
+
+    db.session.commit()
+
+
+def count_queries(client, query_log, url):
+    query_log.clear()
+    response = client.get(url)
+    assert response.status_code == 200
+    return len(query_log), response.get_json()
+
+
+def count_page_queries(client, query_log, url):
+    db.session.expire_all()
+    query_log.clear()
+    response = client.get(url)
+    assert response.status_code == 200
+    return len(query_log), response.get_data(as_text=True)
+
+
+# =================== HOME CHARTS ===================
+
+def test_study_efficiency_by_class_query_count_is_constant(client, user, query_log):
+    add_classes(user, 2)
+    small_count, small = count_queries(client, query_log, "/charts/home/study_efficiency_by_class")
+
+    add_classes(user, 10, start=2)
+    large_count, large = count_queries(client, query_log, "/charts/home/study_efficiency_by_class")
+
+    assert len(small["datasets"]) == 2
+    assert len(large["datasets"]) == 12
+    assert large_count == small_count
+
+
+def test_assignment_load_weekly_horizon(client, user, query_log):
+    add_classes(user, 1)
+    today = add_due_assignments(user, [7, 14, 13.99, 60, 120])
+    monday = today - timedelta(days=today.weekday())
+
+    client.get("/charts/home/assignment_load_weekly")
+    short_count, short = count_queries(client, query_log, "/charts/home/assignment_load_weekly")
+    term_count, term = count_queries(client, query_log, "/charts/home/assignment_load_weekly?weeks=16")
+
+    expected = [0] * 16
+    for a in Assignment.query.filter(Assignment.due_at.isnot(None)).all():
+        week = (a.due_at.replace(tzinfo=timezone.utc) - monday).days // 7
+        if week < 16:
+            expected[week] += 1
+
+    assert term["data"] == expected
+    assert short["data"] == expected[:4]
+    assert len(term["labels"]) == 16
+    assert term_count == short_count
+
+
+def test_study_efficiency_by_class_values(client, user):
+    add_classes(user, 1)
+    data = client.get("/charts/home/study_efficiency_by_class").get_json()
+
+    raw = data["datasets"][0]["raw"]
+    assert raw["avg_grade"] == 80
+    assert round(raw["completion_rate"], 1) == 33.3
+    assert raw["study_minutes"] == 60
+
+
+# =================== ASSIGNMENT CHARTS ===================
+
+def add_due_assignments(user, offsets_days):
+    """One open assignment per offset, due that many days after today's midnight (UTC)."""
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    class_id = Class.query.filter_by(user_id=user.user_id).first().class_id
+    for offset in offsets_days:
+        db.session.add(Assignment(
+            user_id=user.user_id,
+            class_id=class_id,
+            title=f"Due +{offset}",
+            assignment_type="homework",
+            due_at=today + timedelta(days=offset)
+        ))
+    db.session.commit()
+    return today
+
+
+def test_due_timeline_weeks_horizon(client, user, query_log):
+    add_classes(user, 2)
+    today = add_due_assignments(user, [7, 7.5, 13.99, 14, 100, 200])
+    monday = today - timedelta(days=today.weekday())
+
+    client.get("/charts/assignments/due_timeline")
+    count, payload = count_queries(client, query_log, "/charts/assignments/due_timeline?mode=weeks&horizon=26")
+    assert len(payload["labels"]) == 26
+
+    expected = [0] * 26
+    for a in Assignment.query.filter(Assignment.due_at.isnot(None)).all():
+        week = (a.due_at.replace(tzinfo=timezone.utc) - monday).days // 7
+        if week < 26:
+            expected[week] += 1
+    assert sum(expected) == 7
+    assert payload["total"]["data"] == expected
+
+    short_count, short = count_queries(client, query_log, "/charts/assignments/due_timeline?mode=weeks")
+    assert short["total"]["data"] == expected[:4]
+    assert count == short_count
+
+
+def test_due_timeline_days_buckets_by_calendar_day(client, user):
+    add_classes(user, 1)
+    add_due_assignments(user, [1, 1.5, 2, 6.99, 7])
+
+    payload = client.get("/charts/assignments/due_timeline?mode=days").get_json()
+    # add_classes' "Studied" assignment is due in 3 days
+    assert payload["total"]["data"] == [0, 2, 1, 1, 0, 0, 1]
+    assert payload["datasets"][0]["data"] == [0, 2, 1, 1, 0, 0, 1]
+
+
+def test_type_load_returns_both_metrics_in_one_query(client, user, query_log):
+    add_classes(user, 3)
+    db.session.add(UserAssignmentTypeColor(user_id=user.user_id, assignment_type="reading", color="#123456"))
+    db.session.commit()
+
+    client.get("/charts/assignments/type_load")
+    count, payload = count_queries(client, query_log, "/charts/assignments/type_load?metric=study_time")
+    assert count == 1
+
+    by_type = dict(zip(payload["types"], zip(payload["counts"], payload["study_minutes"], payload["colors"])))
+    assert by_type["homework"] == (3, 180, "#4f46e5")
+    assert by_type["reading"] == (3, 0, "#123456")
+    assert by_type["quiz"] == (0, 0, "#4f46e5")
+    assert payload["values"] == payload["study_minutes"]
+
+
+# =================== DASHBOARD CHARTS ===================
+
+def add_graded_history(user, weeks=8):
+    """A graded, studied assignment per class in each of the past `weeks` weeks."""
+    now = datetime.now(timezone.utc)
+
+    for cls in Class.query.filter_by(user_id=user.user_id).all():
+        for week in range(1, weeks + 1):
+            finished = now - timedelta(weeks=week)
+            done = Assignment(
+                user_id=user.user_id,
+                class_id=cls.class_id,
+                title=f"Week {week}",
+                assignment_type="quiz",
+                is_graded=True,
+                is_completed=True,
+                finished_at=finished,
+                due_at=finished + timedelta(hours=(week % 3) * 12 - 6),
+                grade=60 + (week * 7 + cls.class_id * 3) % 40,
+                estimated_minutes=30 + week * 5
+            )
+            db.session.add(done)
+            db.session.flush()
+            db.session.add(StudySession(
+                user_id=user.user_id,
+                class_id=cls.class_id,
+                assignment_id=done.assignment_id,
+                title="Session",
+                session_type="homework",
+                started_at=finished - timedelta(minutes=20 + week * 10),
+                session_end=finished,
+                duration_minutes=20 + week * 10,
+                is_completed=True
+            ))
+    db.session.commit()
+
+
+def test_dashboard_bundle_matches_the_individual_charts(client, user):
+    add_classes(user, 3)
+    add_graded_history(user)
+
+    bundle = client.get("/charts/dashboard/bundle").get_json()
+    assert len(bundle) == 12
+    assert not any(payload["empty"] for payload in bundle.values())
+    for name, payload in bundle.items():
+        assert client.get(f"/charts/dashboard/{name}").get_json() == payload, name
+
+
+def test_dashboard_limit_falls_back_on_bad_values(client, user):
+    add_classes(user, 1)
+    for url in ("/charts/dashboard/bundle?limit=abc", "/charts/dashboard/assignment_risk_breakdown?limit=abc"):
+        assert client.get(url).status_code == 200, url
+
+
+def test_performance_stability_index_by_class(client, user):
+    add_classes(user, 3)
+    payload = client.get("/charts/dashboard/performance_stability_index?by_class=true").get_json()
+
+    assert payload["empty"] is False
+    assert len(payload["data"]) == 1
+    assert [series["class_name"] for series in payload["by_class"]] == ["Class 0", "Class 1", "Class 2"]
+    for series in payload["by_class"]:
+        assert [point["x"] for point in series["data"]] == [point["x"] for point in payload["data"]]
+
+    assert "by_class" not in client.get("/charts/dashboard/performance_stability_index").get_json()
+
+
+def test_deadline_proximity_buckets_in_sql_match_frames(client, user):
+    add_classes(user, 1)  # "Studied" is due in 3 days
+    add_due_assignments(user, [-3, 4, 20])
+
+    payload = client.get("/charts/dashboard/deadline_proximity_distribution").get_json()
+    assert payload["labels"] == ["Overdue", "0-2 days", "3-5 days", "6-10 days", "10+ days"]
+    assert payload["counts"] == [1, 0, 2, 0, 1]
+    assert payload["minutes"] == [60, 0, 120, 0, 60]
+
+    custom = client.get("/charts/dashboard/deadline_proximity_distribution?edges=3,1").get_json()
+    assert custom["labels"] == ["Overdue", "0-1 days", "2-3 days", "3+ days"]
+    assert custom["counts"] == [1, 0, 1, 2]
+    assert custom == build_deadline_proximity_distribution(load_dashboard_frames(user.user_id), (1, 3))
+
+    invalid = client.get("/charts/dashboard/deadline_proximity_distribution?edges=soon").get_json()
+    assert invalid["labels"] == payload["labels"]
+
+
+def test_risk_composition_evolution_by_class(client, user):
+    add_classes(user, 3)
+    payload = client.get("/charts/dashboard/risk_composition_evolution?by_class=true").get_json()
+
+    assert payload["empty"] is False
+    assert len(payload["weeks"]) == 1
+    by_label = {ds["label"]: ds["data"] for ds in payload["datasets"]}
+    assert by_label["Difficulty"] == [0.125]
+    assert by_label["Workload Overlap"] == [0.2]
+    assert by_label["Historical Risk"] == [0.08]
+    # Only the "Studied" assignments have a due date (in 3 days)
+    assert 0.2 < by_label["Time Pressure"][0] < 0.25
+
+    # Every class has the same mix, so each class series matches the overall one
+    assert [series["class_name"] for series in payload["by_class"]] == ["Class 0", "Class 1", "Class 2"]
+    for series in payload["by_class"]:
+        assert series["weeks"] == payload["weeks"]
+        assert series["datasets"] == payload["datasets"]
+
+    assert "by_class" not in client.get("/charts/dashboard/risk_composition_evolution").get_json()
+
+
+def add_completed_work(user, estimated_minutes=50, session_minutes=30):
+    """One completed, studied assignment per class (unestimated when estimated_minutes is None)."""
+    finished = datetime.now(timezone.utc) - timedelta(days=1)
+
+    for cls in Class.query.filter_by(user_id=user.user_id).all():
+        done = Assignment(
+            user_id=user.user_id,
+            class_id=cls.class_id,
+            title="Done",
+            assignment_type="homework",
+            is_completed=True,
+            finished_at=finished,
+            estimated_minutes=estimated_minutes
+        )
+        db.session.add(done)
+        db.session.flush()
+        db.session.add(StudySession(
+            user_id=user.user_id,
+            class_id=cls.class_id,
+            assignment_id=done.assignment_id,
+            title="Session",
+            session_type="homework",
+            started_at=finished - timedelta(minutes=session_minutes),
+            session_end=finished,
+            duration_minutes=session_minutes,
+            is_completed=True
+        ))
+    db.session.commit()
+
+
+def test_spent_vs_expected_time_query_count_is_constant(client, user, query_log):
+    add_classes(user, 10)
+    add_completed_work(user)
+    small_count, small = count_queries(client, query_log, "/charts/dashboard/spent_vs_expected_time")
+
+    add_classes(user, 10, start=10)
+    add_completed_work(user, estimated_minutes=None)
+    large_count, large = count_queries(client, query_log, "/charts/dashboard/spent_vs_expected_time")
+
+    assert small["actual"] == [90] * 10
+    assert small["expected"] == [50] * 10
+    assert len(large["labels"]) == 20
+    assert large["actual"][:10] == [120] * 10
+    # The unestimated assignments get an estimate from the studied history
+    assert all(expected > 50 for expected in large["expected"][:10])
+    assert large_count == small_count
+
+
+# =================== CLASS CHARTS ===================
+
+def test_classes_page_query_count_is_constant(client, user, query_log):
+    add_classes(user, 2)
+    client.get("/classes")
+    small_count, _ = count_page_queries(client, query_log, "/classes")
+
+    add_classes(user, 10, start=2)
+    large_count, page = count_page_queries(client, query_log, "/classes")
+
+    assert page.count('data-assignments="3"') == 12
+    assert page.count('data-sessions="1"') == 12
+    assert large_count == small_count
+
+
+def test_class_stats_loader_matches_properties(user):
+    add_classes(user, 3)
+    add_completed_work(user)
+
+    expected = [
+        (c.total_assignments, c.completed_assignments, c.total_study_sessions, c.total_study_time)
+        for c in Class.query.order_by(Class.class_id).all()
+    ]
+    assert expected[0] == (4, 2, 2, "90 min")
+
+    db.session.expire_all()
+    loaded = load_class_stats(Class.query.order_by(Class.class_id).all())
+    assert [
+        (c.total_assignments, c.completed_assignments, c.total_study_sessions, c.total_study_time)
+        for c in loaded
+    ] == expected
+
+
+def test_class_health_counts(client, user):
+    add_classes(user, 3)
+    payload = client.get("/charts/classes/class_health?time_window=all").get_json()
+
+    assert len(payload) == 3
+    for row in payload:
+        assert row["total_assignments"] == 3
+        assert row["completed_count"] == 1
+        assert row["in_progress_count"] == 1
+        assert row["not_started_count"] == 1
+
+
+def test_class_health_query_count_is_constant(client, user, query_log):
+    add_classes(user, 2)
+    small_count, _ = count_queries(client, query_log, "/charts/classes/class_health?time_window=last_7_days")
+
+    add_classes(user, 10, start=2)
+    large_count, payload = count_queries(client, query_log, "/charts/classes/class_health?time_window=last_7_days")
+
+    assert len(payload) == 12
+    assert large_count == small_count
+
+
+def test_class_health_summary(client, user):
+    add_classes(user, 2)
+    summary = client.get("/charts/classes/class_health_summary?class_id=all&time_window=all").get_json()
+
+    assert summary["empty"] is False
+    assert summary["class_name"] == "All classes"
+    assert summary["total"] == 6
+    assert summary["in_progress_count"] == 2
+
+    class_id = Class.query.filter_by(class_code="C1").one().class_id
+    single = client.get(f"/charts/classes/class_health_summary?class_id={class_id}&time_window=all").get_json()
+    assert single["class_name"] == "Class 1"
+    assert single["total"] == 3
+
+    assert client.get("/charts/classes/class_health_summary?class_id=abc").status_code == 400
+
+
+# =================== ASSIGNMENTS API ===================
+
+def add_assignment_mix(user, count=23):
+    """Assignments with repeated and missing values in every sortable column."""
+    add_classes(user, 1)
+    class_id = Class.query.one().class_id
+    now = datetime.now(timezone.utc)
+
+    for i in range(count):
+        db.session.add(Assignment(
+            user_id=user.user_id,
+            class_id=class_id,
+            title=f"Task {i % 5}",
+            assignment_type=("quiz", "homework", "reading")[i % 3],
+            is_graded=i % 4 == 0,
+            difficulty=None if i % 3 == 0 else i % 4,
+            estimated_minutes=None if i % 5 == 0 else (i % 3) * 30,
+            due_at=None if i % 6 == 0 else now + timedelta(days=i % 7 - 3)
+        ))
+    db.session.commit()
+
+
+def all_pages(client, query, limit=4):
+    ids, cursor = [], None
+    while True:
+        url = f"/api/assignments?limit={limit}&{query}" + (f"&cursor={cursor}" if cursor else "")
+        payload = client.get(url).get_json()
+        ids.extend(row["assignment_id"] for row in payload["assignments"])
+        cursor = payload["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+def test_assignments_api_pages_match_a_single_page(client, user):
+    add_assignment_mix(user)
+
+    for sort_by in ("name_desc", "difficulty_high_low", "difficulty_low_high",
+                    "due_date_soonest", "due_date_latest", "estimated_minutes_low_high"):
+        paged = all_pages(client, f"sort_by={sort_by}")
+        whole = all_pages(client, f"sort_by={sort_by}", limit=200)
+        assert paged == whole
+        assert sorted(paged) == sorted(a.assignment_id for a in Assignment.query.all())
+
+    ordered = [
+        db.session.get(Assignment, i).difficulty
+        for i in all_pages(client, "sort_by=difficulty_high_low")
+    ]
+    assert ordered == sorted(ordered, key=lambda d: -1 if d is None else d, reverse=True)
+
+
+def test_assignments_api_applies_saved_preferences(client, user):
+    add_assignment_mix(user)
+    db.session.add(AssignmentViewPreferences(
+        user_id=user.user_id,
+        graded_filter="graded",
+        due_status_filter="not_due",
+        filter_assignment_types=["quiz"],
+        sort_by="due_date_soonest"
+    ))
+    db.session.commit()
+
+    now = datetime.now()
+    expected = [
+        a for a in Assignment.query.all()
+        if a.is_graded and a.assignment_type == "quiz" and (a.due_at is None or a.due_at >= now)
+    ]
+    payload = client.get("/api/assignments").get_json()
+    assert payload["options"]["sort_by"] == "due_date_soonest"
+    assert sorted(row["assignment_id"] for row in payload["assignments"]) == sorted(a.assignment_id for a in expected)
+
+    # Query parameters override the saved preferences
+    overridden = client.get("/api/assignments?graded_filter=all&filter_assignment_types=").get_json()
+    assert len(overridden["assignments"]) > len(payload["assignments"])
+
+    assert client.get("/api/assignments?sort_by=bogus").status_code == 400
+    assert client.get("/api/assignments?cursor=not-a-cursor").status_code == 400
+
+    # A well-formed cursor whose value doesn't fit the sort column
+    tampered = base64.urlsafe_b64encode(json.dumps([0, "abc", 1]).encode()).decode()
+    assert client.get(f"/api/assignments?sort_by=grade_high_low&cursor={tampered}").status_code == 400
+
+
+def test_assignments_api_study_minutes(client, user):
+    add_classes(user, 2)
+    rows = client.get("/api/assignments?sort_by=name_asc").get_json()["assignments"]
+    assert {row["title"]: row["study_minutes"] for row in rows} == {"Graded": 0, "Studied": 60, "Untouched": 0}
+
+
+def test_assignment_summary_uses_one_query(client, user, query_log):
+    add_classes(user, 1)
+    studied = Assignment.query.filter_by(title="Studied").one()
+    db.session.add(StudySession(
+        user_id=user.user_id,
+        class_id=studied.class_id,
+        assignment_id=studied.assignment_id,
+        title="Another",
+        session_type="homework",
+        started_at=datetime.now(timezone.utc) - timedelta(hours=3),
+        session_end=datetime.now(timezone.utc) - timedelta(hours=2),
+        duration_minutes=45,
+        is_completed=True
+    ))
+    db.session.commit()
+    studied_id = studied.assignment_id
+    db.session.expunge_all()
+
+    count, summary = count_queries(client, query_log, f"/assignments/{studied_id}/summary")
+    assert summary["study_session_count"] == 2
+    assert summary["study_minutes"] == 105
+    assert not any("FROM study_sessions" in q and "GROUP BY" not in q for q in query_log)
+
+    untouched = Assignment.query.filter_by(title="Untouched").one()
+    summary = client.get(f"/assignments/{untouched.assignment_id}/summary").get_json()
+    assert summary["study_session_count"] == 0
+    assert summary["study_minutes"] == 0
+
+
+def test_assignments_page_query_count_is_constant(client, user, query_log):
+    add_classes(user, 2)
+    client.get("/assignments")  # the session state shared by every page stays on g in tests
+    small_count, _ = count_page_queries(client, query_log, "/assignments")
+
+    add_classes(user, 10, start=2)
+    large_count, page = count_page_queries(client, query_log, "/assignments")
+
+    assert page.count('data-title="Studied"') >= 12
+    assert large_count == small_count
+
+
+# =================== BULK IMPORT ===================
+
+def test_bulk_import_json(client, user):
+    add_classes(user, 1)
+    finished = (datetime.now(timezone.utc) - timedelta(days=21)).isoformat()
+
+    response = client.post("/assignments/import", json={"assignments": [
+        {"title": "Essay", "assignment_type": "Writing", "class_code": "C0", "due_at": "2026-12-01",
+         "estimated_minutes": "90", "is_graded": "yes", "ponderation": 3},
+        {"title": "Old quiz", "assignment_type": "quiz", "class_code": "C0", "is_graded": True,
+         "is_completed": True, "finished_at": finished, "grade": 72.5},
+    ]})
+    assert response.status_code == 201
+    assert response.get_json()["imported"] == 2
+
+    essay = Assignment.query.filter_by(title="Essay").one()
+    assert (essay.assignment_type, essay.estimated_minutes, essay.ponderation) == ("writing", 90, 3)
+
+    # The bulk insert still updates the weekly rollups
+    week = week_of(datetime.fromisoformat(finished))
+    assert WeeklyClassRollup.query.filter_by(week_start=week).one().grade_count == 1
+
+
+def test_bulk_import_rejects_invalid_rows(client, user):
+    add_classes(user, 1)
+    csv_text = (
+        "title,assignment_type,class_code,is_graded,grade,difficulty\n"
+        "Fine,homework,C0,no,,3\n"
+        "Ungraded grade,homework,C0,no,90,\n"
+        ",dance,C9,maybe,,11\n"
+    )
+    response = client.post("/assignments/import", data={
+        "file": (io.BytesIO(csv_text.encode()), "syllabus.csv")
+    })
+    assert response.status_code == 400
+
+    errors = {e["row"]: e["errors"] for e in response.get_json()["errors"]}
+    assert set(errors) == {2, 3}
+    assert errors[2] == ["Cannot set grade if assignment is not marked as graded"]
+    assert len(errors[3]) == 5
+    assert Assignment.query.count() == 3  # nothing from the file
+
+
+def test_bulk_import_rejects_unreadable_files_and_non_finite_numbers(client, user):
+    add_classes(user, 1)
+    response = client.post("/assignments/import", data={
+        "file": (io.BytesIO("title\nÉtude\n".encode("latin-1")), "syllabus.csv")
+    })
+    assert response.status_code == 400
+
+    response = client.post("/assignments/import", json=[
+        {"title": "Quiz", "assignment_type": "quiz", "class_code": "C0", "is_graded": True,
+         "is_completed": True, "finished_at": "2026-01-05T10:00:00", "grade": "nan"},
+        {"title": "Test", "assignment_type": "test", "class_code": "C0", "is_graded": True,
+         "expected_grade": "inf"},
+    ])
+    assert response.status_code == 400
+    assert [e["row"] for e in response.get_json()["errors"]] == [1, 2]
+    assert Assignment.query.count() == 3
+
+
+def test_bulk_import_benchmark_5000_rows(client, user, query_log):
+    add_classes(user, 5)
+    rows = [
+        {"title": f"Item {i}", "assignment_type": "reading", "class_code": f"C{i % 5}",
+         "due_at": f"2027-01-{i % 28 + 1:02d}", "estimated_minutes": 30 + i % 60, "difficulty": i % 10 + 1}
+        for i in range(5000)
+    ]
+
+    query_log.clear()
+    response = client.post("/assignments/import", json=rows)
+    result = response.get_json()
+
+    assert response.status_code == 201
+    assert result["imported"] == 5000
+    assert result["rows_per_second"] > 0
+    assert Assignment.query.count() == 5000 + 15
+    assert sum("INSERT INTO assignments" in q for q in query_log) == 1
+
+
+# =================== STUDY SESSION STATE ===================
+
+class RecordingBroker:
+    """Stand-in for the in-process session event broker."""
+
+    def __init__(self):
+        self.published = []
+
+    def publish(self, user_id):
+        self.published.append(user_id)
+
+
+def test_session_state_stream_sends_current_state(app, client, user):
+    add_classes(user, 1)
+    app.config["SESSION_EVENTS_STREAM_SECONDS"] = 0
+    due = Assignment.query.filter_by(title="Studied").one()
+    db.session.add(StudySession(
+        user_id=user.user_id,
+        class_id=due.class_id,
+        title="Scheduled",
+        session_type="homework",
+        expected_started_at=datetime.now(timezone.utc) - timedelta(minutes=5)
+    ))
+    db.session.commit()
+
+    response = client.get("/study/state/stream")
+    assert response.mimetype == "text/event-stream"
+
+    event, data = response.get_data(as_text=True).strip().split("\n")
+    assert event == "event: session_state"
+
+    state = json.loads(data.removeprefix("data: "))
+    assert state["active_session"] is None
+    assert state["due_session"]["title"] == "Scheduled"
+    assert state["due_session"]["class_name"] == "Class 0"
+    assert state == client.get("/study/state").get_json()
+
+
+class ScriptedSubscription:
+    """Subscription whose waits return the given results, in order."""
+
+    def __init__(self, results):
+        self.results = list(results)
+
+    def wait(self, timeout=None):
+        return self.results.pop(0)
+
+
+class ScriptedBroker:
+    def __init__(self, results):
+        self.subscription = ScriptedSubscription(results)
+
+    def subscribe(self, user_id):
+        return self.subscription
+
+    def unsubscribe(self, subscription):
+        pass
+
+
+def test_session_state_stream_queries_only_on_change(app, client, user, query_log):
+    add_classes(user, 1)
+    app.extensions["session_events"] = ScriptedBroker([False, False, True])
+
+    response = client.get("/study/state/stream", buffered=False)
+    chunks = iter(response.response)
+
+    def next_chunk():
+        query_log.clear()
+        return next(chunks), len(query_log)
+
+    first, _ = next_chunk()
+    assert first.startswith(b"event: session_state")
+
+    # Keepalive timeouts don't touch the database
+    assert next_chunk() == (b": keepalive\n\n", 0)
+    assert next_chunk() == (b": keepalive\n\n", 0)
+
+    # A notification re-reads the state; unchanged state is not sent again
+    chunk, queries = next_chunk()
+    assert chunk == b": keepalive\n\n" and queries > 0
+    response.close()
+
+
+def test_only_live_pages_open_the_session_stream(client, user):
+    assert b'id="session-state"' in client.get("/assignments").data
+    assert b'id="session-state"' not in client.get("/classes").data
+
+
+def test_study_session_commits_are_published(app, user):
+    broker = RecordingBroker()
+    app.extensions["session_events"] = broker
+
+    add_classes(user, 2)
+    assert broker.published == [user.user_id]
+
+    broker.published.clear()
+    Class.query.filter_by(class_code="C0").one().class_name = "Renamed"
+    db.session.commit()
+    assert broker.published == []
+
+
+def start_now(client, class_id, title):
+    return client.post("/study/new", data={
+        "class_id": class_id,
+        "title": title,
+        "session_type": "homework",
+        "start_option": "now"
+    })
+
+
+def test_second_active_session_is_rejected_by_index(client, user):
+    add_classes(user, 1)
+    class_id = Class.query.one().class_id
+
+    assert start_now(client, class_id, "First").status_code == 302
+    assert start_now(client, class_id, "Second").status_code == 400
+    assert StudySession.query.filter_by(is_active=True).count() == 1
+
+    # Scheduling a later session is still allowed, but starting it is not
+    response = client.post("/study/new", data={
+        "class_id": class_id,
+        "title": "Later",
+        "session_type": "homework",
+        "start_option": "later",
+        "started_at": (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat()
+    })
+    assert response.status_code == 302
+
+    later = StudySession.query.filter_by(title="Later").one()
+    later.expected_started_at = None  # SQLite returns naive datetimes; skip the due-time check
+    db.session.commit()
+
+    response = client.post(f"/study/{later.session_id}/start", json={})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Active session already exists"
+    assert StudySession.query.filter_by(is_active=True).one().title == "First"
+
+
+# =================== WEEKLY ROLLUPS ===================
+
+def rollup_rows():
+    return sorted(
+        (r.class_id, r.week_start, r.study_minutes, r.session_count, float(r.grade_sum), r.grade_count, r.completed_count)
+        for r in WeeklyClassRollup.query.all()
+    )
+
+
+def test_weekly_rollups_follow_writes_and_match_backfill(client, user):
+    add_classes(user, 2)
+    assert sum(row[3] for row in rollup_rows()) == 2
+    assert sum(row[5] for row in rollup_rows()) == 2
+
+    # End an active session that started alongside the seeded one
+    class_id = Class.query.filter_by(class_code="C0").one().class_id
+    started_at = StudySession.query.filter_by(class_id=class_id).one().started_at
+    week = week_of(started_at)
+    active = StudySession(
+        user_id=user.user_id,
+        class_id=class_id,
+        title="Active",
+        session_type="homework",
+        started_at=started_at,
+        is_active=True
+    )
+    db.session.add(active)
+    db.session.commit()
+    active.session_end = active.started_at + timedelta(minutes=30)
+    active.duration_minutes = 30
+    active.is_active = False
+    active.is_completed = True
+    db.session.commit()
+
+    # Regrade into an earlier week, then reopen another assignment
+    graded = Assignment.query.filter_by(title="Graded", class_id=class_id).one()
+    earlier = (datetime.now(timezone.utc) - timedelta(days=14)).isoformat()
+    assert client.patch(f"/assignments/{graded.assignment_id}/grade",
+                        data={"grade": "91.5", "finished_at": earlier}).status_code == 200
+
+    other = Assignment.query.filter(Assignment.title == "Graded", Assignment.class_id != class_id).one()
+    assert client.patch(f"/assignments/{other.assignment_id}/completion",
+                        json={"is_completed": False}).status_code == 200
+
+    incremental = rollup_rows()
+    assert (class_id, week, 90, 2, 0.0, 0, 0) in incremental
+    assert (class_id, week_of(datetime.fromisoformat(earlier)), 0, 0, 91.5, 1, 1) in incremental
+
+    backfill_rollups()
+    assert rollup_rows() == incremental
+
+
+def test_refresh_rollup_upserts_over_an_existing_row(app, user):
+    add_classes(user, 1)
+    class_id = Class.query.filter_by(class_code="C0").one().class_id
+    week = week_of(datetime.now(timezone.utc))
+    expected = rollup_rows()
+
+    # A row another transaction wrote for the same week, with stale counts
+    row = WeeklyClassRollup.query.filter_by(week_start=week).one()
+    row.study_minutes, row.grade_count = 999, 9
+    db.session.commit()
+
+    refresh_rollup(db.session, user.user_id, class_id, week)
+    db.session.commit()
+    assert rollup_rows() == expected
+
+    # Nothing left in the week: the row goes away
+    StudySession.query.delete()
+    Assignment.query.filter(Assignment.finished_at.isnot(None)).delete()
+    refresh_rollup(db.session, user.user_id, class_id, week)
+    db.session.commit()
+    assert WeeklyClassRollup.query.filter_by(week_start=week).count() == 0
+
+
+def test_rollup_charts_query_count_is_constant(client, user, query_log):
+    add_classes(user, 2)
+    small_count, small = count_queries(client, query_log, "/charts/dashboard/effort_outcome_timeline")
+
+    add_classes(user, 10, start=2)
+    large_count, large = count_queries(client, query_log, "/charts/dashboard/effort_outcome_timeline")
+
+    assert small["effort_data"][0]["y"] == large["effort_data"][0]["y"] == 60
+    assert large["grade_data"][0]["y"] == 80
+    assert large_count == small_count
@@ -0,0 +1,425 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.effort_utils import (
+    trailing_mean,
+    marginal_returns_arrays,
+    cumulative_effort_outcome,
+    smooth_marginal_returns,
+    lagged_correlations
+)
+from app.services.expected_utils import (
+    CLASS_TYPE_COORDINATES,
+    DEFAULT_ASSIGNMENT_TYPES,
+    estimate_expected_minutes,
+    estimate_expected_difficulty,
+    estimate_expected_minutes_batch,
+    estimate_expected_difficulty_batch
+)
+from app.services.risk_utils import (
+    compute_days_until_due,
+    deadline_proximity_bucket,
+    deadline_bucket_labels,
+    deadline_bucket_array,
+    urgency_score,
+    historical_risk,
+    compute_assignment_risk,
+    compute_days_until_due_array,
+    urgency_score_array,
+    historical_risk_array,
+    compute_assignment_risk_array
+)
+from app.services.time_utils import week_start
+from app.services.study_session_services import get_session_state
+from app.services.analytics_cache import AnalyticsCache
+from app.services.session_events import Subscription
+from app.extensions import db, analytics_cache
+from app.models.assignment import Assignment
+from app.models.course import Class
+from app.models.study_session import StudySession
+from app.models.user import User, UserAssignmentTypeColor, UserClassTypeColor
+
+
+# =================== EFFORT UTILS ===================
+
+def test_trailing_mean_matches_pandas_rolling():
+    values = np.random.default_rng(0).uniform(0, 100, 250)
+    expected = pd.Series(values).rolling(window=3, min_periods=1).mean().to_numpy()
+
+    assert np.allclose(trailing_mean(values, window=3), expected)
+
+
+def test_marginal_returns_arrays():
+    effort, outcome = marginal_returns_arrays([30, 60, 90, 20], [50, 60, 70, 80], window=3)
+
+    assert effort.tolist() == [30, 90, 180, 200]
+    assert outcome.tolist() == [50.0, 55.0, 60.0, 70.0]
+
+
+def test_dict_helpers_match_arrays():
+    assignments = [
+        {"finished_at": day, "actual_minutes": 10 * (day + 1), "grade": grade}
+        for day, grade in enumerate([72, 64, 91, 85, 77])
+    ]
+    points = smooth_marginal_returns(cumulative_effort_outcome(assignments), window=3)
+    effort, outcome = marginal_returns_arrays([10, 20, 30, 40, 50], [72, 64, 91, 85, 77], window=3)
+
+    assert [p["effort"] for p in points] == effort.tolist()
+    assert [p["outcome"] for p in points] == outcome.tolist()
+
+
+
+def test_lagged_correlations_match_pandas():
+    rng = np.random.default_rng(4)
+    effort = rng.uniform(0, 300, (30, 3))
+    outcome = rng.uniform(50, 100, (30, 3))
+    effort[rng.random(effort.shape) < 0.3] = np.nan
+    outcome[rng.random(outcome.shape) < 0.3] = np.nan
+    outcome[:, 2] = np.where(np.isnan(outcome[:, 2]), np.nan, 75)  # constant -> no correlation
+
+    result = lagged_correlations(effort, outcome, max_lag=12)
+
+    assert result.shape == (3, 13)
+    for c in range(3):
+        for lag in range(13):
+            aligned = pd.DataFrame({"e": pd.Series(effort[:, c]).shift(lag), "g": outcome[:, c]}).dropna()
+            expected = aligned["e"].corr(aligned["g"]) if len(aligned) >= 4 else np.nan
+            if np.isnan(expected):
+                assert np.isnan(result[c, lag])
+            else:
+                assert np.isclose(result[c, lag], expected)
+
+
+# =================== EXPECTED UTILS ===================
+
+def random_assignments(rng, count):
+    class_types = list(CLASS_TYPE_COORDINATES) + ["unlisted"]
+    assignment_types = DEFAULT_ASSIGNMENT_TYPES + ["unlisted"]
+    return pd.DataFrame({
+        "class_type": rng.choice(class_types, count),
+        "assignment_type": rng.choice(assignment_types, count),
+        "class_id": rng.integers(1, 6, count),
+        "actual_minutes": rng.integers(5, 400, count),
+        "difficulty": rng.integers(1, 11, count)
+    })
+
+
+def test_batch_estimators_match_scalar_versions():
+    rng = np.random.default_rng(2)
+    targets = random_assignments(rng, 40)
+    history = random_assignments(rng, 60)
+    past = history.to_dict("records")
+
+    minutes = estimate_expected_minutes_batch(targets, history)
+    difficulty = estimate_expected_difficulty_batch(targets, history)
+
+    for i, t in enumerate(targets.itertuples()):
+        args = (t.class_type, t.assignment_type, t.class_id, past)
+        assert minutes[i] == estimate_expected_minutes(*args)
+        assert difficulty[i] == estimate_expected_difficulty(*args)
+
+
+def test_batch_estimators_fall_back_to_base_without_history():
+    targets = pd.DataFrame({"class_type": ["math"], "assignment_type": ["exam"], "class_id": [1]})
+
+    assert estimate_expected_minutes_batch(targets, []).tolist() == [360]
+    assert estimate_expected_difficulty_batch(targets, []).tolist() == [9]
+
+
+# =================== RISK UTILS ===================
+
+def test_risk_arrays_match_scalar_versions():
+    now = datetime(2026, 1, 15, 12, tzinfo=timezone.utc)
+    due_dates = [now + timedelta(days=d) for d in (-2, 0.5, 3, 10, 40)] + [None]
+    grades = [45, 62.5, None, 88, 100, None]
+
+    days = compute_days_until_due_array(due_dates, now)
+    scalar_days = [compute_days_until_due(d, now) for d in due_dates]
+    assert np.allclose(days[:-1], scalar_days[:-1])
+    assert np.isnan(days[-1])
+
+    assert np.allclose(urgency_score_array(days), [urgency_score(d) for d in scalar_days])
+    assert np.allclose(
+        historical_risk_array(np.array(grades, dtype=float)),
+        [historical_risk(g) if g is not None else 0.0 for g in grades]
+    )
+
+
+def test_deadline_bucket_array_matches_scalar_buckets():
+    days = np.array([-0.1, 0, 1.5, 2, 2.01, 5, 7, 10, 10.5, 90, np.nan])
+
+    buckets = deadline_bucket_array(days)
+    labels = deadline_bucket_labels()
+    assert [labels[b] for b in buckets[:-1]] == [deadline_proximity_bucket(d) for d in days[:-1]]
+    assert buckets[-1] == -1
+
+    assert deadline_bucket_labels((1, 7)) == ["Overdue", "0-1 days", "2-7 days", "7+ days"]
+    assert deadline_bucket_array([-1, 0.5, 3, 8], (1, 7)).tolist() == [0, 1, 2, 3]
+
+
+def test_compute_assignment_risk_array_matches_scalar():
+    rng = np.random.default_rng(1)
+    components = pd.DataFrame(
+        rng.uniform(0, 1, (20, 5)),
+        columns=["time_pressure", "deadline_proximity", "difficulty", "overlap", "history"]
+    )
+    components.iloc[3, 0] = np.nan
+
+    breakdown, total = compute_assignment_risk_array(components)
+
+    for i, row in components.iterrows():
+        expected = compute_assignment_risk(
+            {k: (None if pd.isna(v) else v) for k, v in row.items()}
+        )
+        assert total[i] == expected["total_risk"]
+        assert breakdown.loc[i].to_dict() == expected["breakdown"]
+
+
+# =================== TIME UTILS ===================
+
+def test_week_start_matches_period_buckets():
+    rng = np.random.default_rng(3)
+    seconds = rng.integers(-5 * 365 * 86400, 5 * 365 * 86400, 5000)
+    seconds[:2] = [1767571199, 1767571200]  # Sunday 23:59:59 / Monday 00:00 UTC
+    timestamps = pd.Series(pd.to_datetime(seconds, unit="s", utc=True)).astype("datetime64[us, UTC]")
+
+    expected = timestamps.dt.tz_localize(None).dt.to_period("W").apply(lambda p: p.start_time)
+
+    pd.testing.assert_series_equal(week_start(timestamps), expected)
+
+    local = timestamps.dt.tz_convert("America/Toronto")
+    expected = local.dt.tz_localize(None).dt.to_period("W").apply(lambda p: p.start_time)
+    pd.testing.assert_series_equal(week_start(local), expected)
+
+
+def test_week_start_keeps_missing_values():
+    result = week_start(pd.to_datetime(pd.Series(["2026-01-07", None])))
+
+    assert result[0] == pd.Timestamp("2026-01-05")
+    assert pd.isna(result[1])
+
+
+# =================== STUDY SESSION SERVICES ===================
+
+def add_sessions(user):
+    now = datetime.now(timezone.utc)
+    cls = Class(user_id=user.user_id, class_name="Physics", class_code="PHY", class_type="science",
+                color="#000000", importance="medium", difficulty=5)
+    db.session.add(cls)
+    db.session.flush()
+
+    def session(title, **fields):
+        s = StudySession(user_id=user.user_id, class_id=cls.class_id, title=title, session_type="homework", **fields)
+        db.session.add(s)
+        return s
+
+    session("Active", is_active=True, started_at=now - timedelta(minutes=20))
+    session("Due later", expected_started_at=now - timedelta(minutes=5))
+    session("Due first", expected_started_at=now - timedelta(hours=1))
+    session("Future", expected_started_at=now + timedelta(hours=1))
+    session("Cancelled", expected_started_at=now - timedelta(hours=2), cancelled_at=now)
+    db.session.commit()
+
+
+def test_session_state_single_query_per_request(app, user, query_log):
+    add_sessions(user)
+    user_id = user.user_id
+
+    with app.app_context(), app.test_request_context():
+        query_log.clear()
+        active, due = get_session_state(user_id)
+        assert active.title == "Active"
+        assert due.title == "Due first"
+        assert due.class_.class_name == "Physics"
+
+        get_session_state(user_id)
+        assert len(query_log) == 1
+
+    with app.app_context(), app.test_request_context():
+        get_session_state(user_id)
+        assert len(query_log) == 2
+
+
+def test_session_state_ttl_cache_is_dropped_on_write(app, user, query_log):
+    app.config["SESSION_STATE_CACHE_TTL_SECONDS"] = 60
+    add_sessions(user)
+    user_id = user.user_id
+
+    with app.app_context(), app.test_request_context():
+        get_session_state(user_id)
+
+    with app.app_context(), app.test_request_context():
+        query_log.clear()
+        active, _ = get_session_state(user_id)
+        assert active.class_.class_name == "Physics"
+        assert query_log == []
+
+    ended = StudySession.query.filter_by(title="Active").one()
+    ended.is_active = False
+    ended.is_completed = True
+    db.session.commit()
+
+    with app.app_context(), app.test_request_context():
+        active, _ = get_session_state(user_id)
+        assert active is None
+
+
+def test_subscription_keeps_a_notify_that_lands_after_a_timeout():
+    subscription = Subscription(1)
+    event_wait = subscription._changed.wait
+
+    def wait_then_notify(timeout):
+        changed = event_wait(timeout)
+        subscription.notify()  # arrives between the timeout and wait() returning
+        return changed
+
+    subscription._changed.wait = wait_then_notify
+    assert subscription.wait(0) is False
+
+    subscription._changed.wait = event_wait
+    assert subscription.wait(0) is True
+    assert subscription.wait(0) is False
+
+
+# =================== ANALYTICS CACHE ===================
+
+@pytest.fixture
+def cache(app):
+    """The app's analytics cache, switched on (the suite runs with it off)."""
+    analytics_cache.clear()
+    analytics_cache.enabled = True
+    yield analytics_cache
+    analytics_cache.enabled = False
+    analytics_cache.clear()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic() for the analytics cache module."""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(
+        "app.services.analytics_cache.time", SimpleNamespace(monotonic=lambda: now.value)
+    )
+    return now
+
+
+def test_analytics_cache_counts_hits_and_misses(cache, client, query_log):
+    url = "/charts/dashboard/deadline_proximity_distribution"
+    hits, misses = cache.hits, cache.misses
+
+    first = client.get(url)
+    query_log.clear()
+    second = client.get(url)
+
+    assert (cache.hits - hits, cache.misses - misses) == (1, 1)
+    assert second.get_data() == first.get_data()
+    assert not any("FROM assignments" in q for q in query_log)
+
+
+def add_cache_fixtures(user):
+    cls = Class(user_id=user.user_id, class_name="Physics", class_code="PHY", class_type="science",
+                color="#000000", importance="medium", difficulty=5)
+    db.session.add(cls)
+    db.session.flush()
+    assignment = Assignment(user_id=user.user_id, class_id=cls.class_id, title="Lab",
+                            assignment_type="lab_report", is_graded=False)
+    db.session.add(assignment)
+    db.session.commit()
+    return cls, assignment
+
+
+def test_analytics_cache_invalidates_only_the_writing_user(cache, user):
+    other = User(username="other", email="other@example.com", password_hash="x")
+    db.session.add(other)
+    db.session.commit()
+    cls, assignment = add_cache_fixtures(user)
+
+    def write_class():
+        cls.class_name = "Physics II"
+
+    def write_assignment():
+        assignment.title = "Lab 2"
+
+    def write_study_session():
+        db.session.add(StudySession(user_id=user.user_id, class_id=cls.class_id, title="Review",
+                                    session_type="homework", expected_started_at=datetime.now(timezone.utc)))
+
+    def write_assignment_type_color():
+        db.session.add(UserAssignmentTypeColor(user_id=user.user_id, assignment_type="quiz", color="#ff0000"))
+
+    def write_class_type_color():
+        db.session.add(UserClassTypeColor(user_id=user.user_id, class_type="science", color="#00ff00"))
+
+    for write in (write_class, write_assignment, write_study_session,
+                  write_assignment_type_color, write_class_type_color):
+        mine, theirs = (user.user_id, "chart", ()), (other.user_id, "chart", ())
+        cache.put(mine, cache.version(user.user_id), b"mine", "application/json")
+        cache.put(theirs, cache.version(other.user_id), b"theirs", "application/json")
+        version, other_version = cache.version(user.user_id), cache.version(other.user_id)
+
+        write()
+        db.session.commit()
+
+        assert cache.version(user.user_id) == version + 1, write.__name__
+        assert cache.get(mine, cache.version(user.user_id)) is None, write.__name__
+        assert cache.version(other.user_id) == other_version
+        assert cache.get(theirs, other_version) == (b"theirs", "application/json")
+
+
+def test_analytics_cache_keeps_version_after_rollback(cache, user):
+    _, assignment = add_cache_fixtures(user)
+    version = cache.version(user.user_id)
+
+    assignment.title = "Never saved"
+    db.session.flush()
+    db.session.rollback()
+    db.session.commit()
+
+    assert cache.version(user.user_id) == version
+
+
+def test_analytics_cache_entries_expire_after_ttl(clock):
+    cache = AnalyticsCache(ttl_seconds=60)
+    cache.put((1, "chart", ()), 0, b"body", "application/json")
+
+    clock.value += 60
+    assert cache.get((1, "chart", ()), 0) == (b"body", "application/json")
+
+    clock.value += 1
+    assert cache.get((1, "chart", ()), 0) is None
+    assert cache.current_bytes == 0
+
+
+def test_analytics_cache_evicts_least_recently_used_at_byte_cap():
+    cache = AnalyticsCache(max_bytes=30)
+    for name in ("a", "b", "c"):
+        cache.put((1, name, ()), 0, b"x" * 10, "application/json")
+
+    cache.get((1, "a", ()), 0)  # "b" is now the least recently used
+    cache.put((1, "d", ()), 0, b"x" * 10, "application/json")
+
+    assert cache.evictions == 1
+    assert cache.current_bytes == 30
+    assert cache.get((1, "b", ()), 0) is None
+    assert all(cache.get((1, name, ()), 0) is not None for name in ("a", "c", "d"))
+
+    # A body larger than the whole cache is never stored
+    cache.put((1, "huge", ()), 0, b"x" * 31, "application/json")
+    assert cache.get((1, "huge", ()), 0) is None
+    assert cache.current_bytes == 30
+
+
+def test_analytics_cache_put_after_version_bump_is_dropped():
+    cache = AnalyticsCache()
+    version = cache.version(1)  # read when the response computation starts
+
+    cache.bump(1)  # a write commits while the response is being computed
+    cache.put((1, "chart", ()), version, b"stale", "application/json")
+
+    assert cache.get((1, "chart", ()), version) is None
+    assert cache.get((1, "chart", ()), cache.version(1)) is None
+    assert cache.current_bytes == 0